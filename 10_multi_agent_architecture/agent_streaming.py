@@ -0,0 +1,66 @@
+"""Token streaming for the supervisor workflow, tagged with the agent that speaks.
+
+The specialist nodes call ``llm.invoke`` / ``agent.invoke`` inside the parent
+graph. Those nested runs inherit the parent's callbacks, so once the parent
+is consumed with ``stream_mode="messages"`` every chat model in them streams
+tokens straight to the caller, including the models inside the
+``create_react_agent`` subgraphs. Two configs make that stream usable:
+
+* ``agent_config("researcher")`` tags a node's inner runs with ``metadata["agent"]``.
+* ``ROUTING_CONFIG`` keeps the supervisor's and validator's structured-output
+  calls (routing JSON, not text for the user) out of the stream.
+
+    for agent, text in stream_agent_tokens(app, inputs):
+        print(text, end="", flush=True)
+"""
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from langchain_core.messages import AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+
+AGENT_KEY = "agent"
+
+ROUTING_CONFIG: RunnableConfig = {"tags": [TAG_NOSTREAM]}
+
+
+def agent_config(agent: str) -> RunnableConfig:
+    """Config for a specialist's inner runs; its tokens come out tagged ``agent``."""
+    return {"metadata": {AGENT_KEY: agent}}
+
+
+def _agent_token(chunk: Tuple[Any, Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+    message, metadata = chunk
+    if not isinstance(message, AIMessageChunk) or not isinstance(message.content, str) or not message.content:
+        return None  # tool-call argument chunks, tool results and full node outputs
+    agent = metadata.get(AGENT_KEY)
+    if agent is None:  # untagged run: fall back to the parent graph node it runs under
+        agent = metadata.get("langgraph_checkpoint_ns", "").split("|")[0].split(":")[0] \
+            or metadata.get("langgraph_node", "")
+    return agent, message.content
+
+
+def stream_agent_tokens(app, inputs, config: Optional[RunnableConfig] = None) -> Iterator[Tuple[str, str]]:
+    """Yield ``(agent, text)`` for every token any agent in ``app`` generates."""
+    for chunk in app.stream(inputs, config, stream_mode="messages"):
+        token = _agent_token(chunk)
+        if token is not None:
+            yield token
+
+
+async def astream_agent_tokens(app, inputs, config: Optional[RunnableConfig] = None) -> AsyncIterator[Tuple[str, str]]:
+    async for chunk in app.astream(inputs, config, stream_mode="messages"):
+        token = _agent_token(chunk)
+        if token is not None:
+            yield token
+
+
+def print_agent_stream(app, inputs, config: Optional[RunnableConfig] = None) -> None:
+    """Print tokens as they arrive, with a header whenever another agent starts talking."""
+    current = None
+    for agent, text in stream_agent_tokens(app, inputs, config):
+        if agent != current:
+            print(f"\n\n[{agent}] ", end="")
+            current = agent
+        print(text, end="", flush=True)
+    print()
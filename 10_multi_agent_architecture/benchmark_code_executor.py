@@ -0,0 +1,136 @@
+"""Cold vs warm Python execution for the coder agent, and throughput under concurrent requests.
+
+Strategies for running one snippet:
+
+* in-process:     ``exec`` in the serving process (no isolation, no limits; lower bound)
+* fork per run:   a forked child per snippet, which is what ``PythonREPL`` in
+  langchain_experimental does for its timeout (state does not survive the child)
+* spawn per run:  a fresh interpreter per snippet, i.e. a one-worker
+  CodeExecutorPool created and closed around every call
+* warm pool:      code_executor.CodeExecutorPool, workers started once
+
+Latency is measured on a trivial snippet and on one importing ``statistics``
+and ``json`` (already preloaded in the pool). Throughput is measured with N
+threads each sending coder requests that mix a little CPU work with a short
+sleep standing in for I/O. The limit checks at the end confirm that runaway,
+memory-hungry and crashing snippets come back as results instead of hanging
+or killing the caller.
+
+    python benchmark_code_executor.py --workers 4 --concurrency 1 4 16
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from code_executor import CodeExecutorPool
+
+TRIVIAL = "print(6 * 7)"
+IMPORTS = "import statistics, json\nprint(json.dumps(statistics.mean([1, 2, 3])))"
+REQUEST = ("import time\n"
+           "total = sum(i * i for i in range({n}))\n"
+           "time.sleep({sleep})\n"
+           "print(total)")
+LIMIT_CHECKS = [
+    ("infinite loop", "while True: pass"),
+    ("sleep past timeout", "import time; time.sleep(60)"),
+    ("allocate 4 GB", "data = bytearray(4 * 1024 ** 3)"),
+    ("hard crash", "import os; os._exit(1)"),
+]
+
+_stdout_lock = threading.Lock()
+
+
+def run_in_process(code: str) -> str:
+    output = io.StringIO()
+    with _stdout_lock, contextlib.redirect_stdout(output):  # one process-wide sys.stdout
+        exec(code, {"__name__": "__main__"})
+    return output.getvalue()
+
+
+def _child(code, queue):
+    queue.put(run_in_process(code))
+
+
+def run_fork_per_run(code: str, timeout: float = 30.0) -> str:
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(code, queue))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.kill()
+        return "timeout"
+    return queue.get()
+
+
+def run_spawn_per_run(code: str) -> str:
+    with CodeExecutorPool(size=1, preload=()) as pool:
+        return pool.run(code).output
+
+
+def latency(run, code: str, repeat: int) -> float:
+    run(code)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(code)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def throughput(run, concurrency: int, requests: int, code: str) -> float:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        list(executor.map(lambda _: run(code), range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="warm pool size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="concurrent coder requests")
+    parser.add_argument("--requests", type=int, default=32, help="requests per throughput run")
+    parser.add_argument("--cpu-work", type=int, default=20000, help="loop length of each request's CPU part")
+    parser.add_argument("--io-seconds", type=float, default=0.05, help="sleep in each request")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pool = CodeExecutorPool(size=args.workers, timeout=3, cpu_seconds=2, memory_mb=1024)
+    strategies = {
+        "in-process": run_in_process,
+        "fork per run": run_fork_per_run,
+        "spawn per run": run_spawn_per_run,
+        "warm pool": lambda code: pool.run(code).output,
+    }
+    try:
+        print(f"latency (median of {args.repeat})")
+        print(f"{'strategy':<15} {'trivial ms':>11} {'imports ms':>11}")
+        for name, run in strategies.items():
+            repeat = max(args.repeat // 3, 3) if name == "spawn per run" else args.repeat
+            print(f"{name:<15} {latency(run, TRIVIAL, repeat) * 1000:>11.2f} "
+                  f"{latency(run, IMPORTS, repeat) * 1000:>11.2f}")
+
+        code = REQUEST.format(n=args.cpu_work, sleep=args.io_seconds)
+        print(f"\nthroughput, requests/s ({args.requests} requests: {args.cpu_work}-step loop + "
+              f"{args.io_seconds}s sleep; pool of {args.workers}; {multiprocessing.cpu_count()} CPU)")
+        print(f"{'strategy':<15}" + "".join(f" {f'N={n}':>8}" for n in args.concurrency))
+        for name in ("in-process", "fork per run", "warm pool"):
+            rates = [throughput(strategies[name], n, args.requests, code) for n in args.concurrency]
+            print(f"{name:<15}" + "".join(f" {rate:>8.1f}" for rate in rates))
+
+        print("\nlimits (timeout 3s, 2 CPU s, 1024 MB)")
+        for label, snippet in LIMIT_CHECKS:
+            result = pool.run(snippet)
+            print(f"{label:<20} {result.status:<13} {result.seconds:>6.2f}s  {result.output}")
+        print(f"after limits: {pool.run(TRIVIAL).output.strip()} ({pool.stats()})")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
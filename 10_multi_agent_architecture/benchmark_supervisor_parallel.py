@@ -0,0 +1,205 @@
+"""Hop latency and wall time of the supervisor workflow: per-hop rebuild vs compile-once vs parallel fan-out.
+
+Mirrors 2_supervisor_multiagent_workflow.ipynb on the fakes from
+benchmarks/fakes.py, for a request that needs both the researcher and the
+coder ("Find the population of Chennai, and separately give me the 20th
+fibonacci number"):
+
+* rebuilt per hop:  the original nodes, calling ``create_react_agent`` on every visit
+* compiled once:    the agents built once and reused, same sequential route
+  (supervisor -> enhancer -> supervisor -> researcher -> validator -> supervisor -> coder -> validator)
+* parallel:         compiled once, supervisor answers ``researcher_and_coder``
+  (supervisor -> enhancer -> supervisor -> researcher + coder -> validator)
+
+Hop latency is the wall time of the researcher / coder node runs, recorded with
+shared/graph_metrics.py. It is measured with zero fake latency (pure framework
+and rebuild cost) and with ``--latency``.
+
+    python benchmark_supervisor_parallel.py --latency 0.3 --tool-latency 0.3
+"""
+import argparse
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import List, Literal, Sequence, Union
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.extend([str(ROOT / "benchmarks"), str(ROOT / "shared")])
+
+from langchain_core.messages import BaseMessage, HumanMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+from langgraph.graph import END, START, MessagesState, StateGraph  # noqa: E402
+from langgraph.prebuilt import create_react_agent  # noqa: E402
+from langgraph.types import Command  # noqa: E402
+from pydantic import BaseModel, Field  # noqa: E402
+
+from agent_streaming import ROUTING_CONFIG, agent_config  # noqa: E402
+from fakes import FakeSearchTool, ScriptedChatModel  # noqa: E402
+from graph_metrics import GraphMetrics, instrument  # noqa: E402
+
+QUESTION = "Find the population of Chennai, and separately give me the 20th fibonacci number"
+VARIANTS = {
+    "rebuilt per hop": dict(compile_once=False, parallel=False),
+    "compiled once": dict(compile_once=True, parallel=False),
+    "parallel": dict(compile_once=True, parallel=True),
+}
+
+
+class Supervisor(BaseModel):
+    next: Literal["enhancer", "researcher", "coder", "researcher_and_coder"] = Field(
+        description="Which specialist to activate next; 'researcher_and_coder' runs both in parallel.")
+    reason: str = Field(description="Justification for the routing decision.")
+
+
+class Validator(BaseModel):
+    next: Literal["supervisor", "FINISH"] = Field(description="'supervisor' to continue or 'FINISH' to terminate.")
+    reason: str = Field(description="The reason for the decision.")
+
+
+def _names(messages: Sequence[BaseMessage]):
+    return {getattr(message, "name", None) for message in messages}
+
+
+def sequential_route(messages: Sequence[BaseMessage]) -> str:
+    names = _names(messages)
+    if "enhancer" not in names:
+        return "enhancer"
+    return "researcher" if "researcher" not in names else "coder"
+
+
+def parallel_route(messages: Sequence[BaseMessage]) -> str:
+    return "enhancer" if "enhancer" not in _names(messages) else "researcher_and_coder"
+
+
+def validate(messages: Sequence[BaseMessage]) -> str:
+    """FINISH once the reviewed answer covers both the research and the computation."""
+    answer = str(messages[-1].content)
+    return "FINISH" if "researcher:" in answer and "coder:" in answer else "supervisor"
+
+
+@tool
+def python_repl(command: str) -> str:
+    """A Python shell. Use this to execute python commands."""
+    return "6765\n"
+
+
+def specialist_answer(messages: Sequence[BaseMessage]) -> str:
+    """Every specialist answer so far, so the scripted validator can tell when both parts are covered.
+
+    (The notebook's validator reviews the latest answer, or both after a parallel hop; a real
+    model would bounce a research-only answer to this question back to the supervisor.)
+    """
+    return "\n\n".join(f"{message.name}: {message.content}" for message in messages
+                        if getattr(message, "name", None) in ("researcher", "coder"))
+
+
+def _constant(value):
+    return lambda: value
+
+
+def build_app(llm, search_tool, compile_once: bool):
+    def research_agent():
+        return create_react_agent(llm, tools=[search_tool], prompt="You are an Information Specialist.")
+
+    def code_agent():
+        return create_react_agent(llm, tools=[python_repl], prompt="You are a coder and analyst.")
+
+    if compile_once:
+        research_agent, code_agent = _constant(research_agent()), _constant(code_agent())
+
+    def supervisor_node(state: MessagesState) -> Union[
+        Command[Literal["enhancer", "researcher", "coder"]],
+        Command[List[Literal["researcher", "coder"]]],  # researcher_and_coder: both in parallel
+    ]:
+        messages = [{"role": "system", "content": "You are a workflow supervisor."}] + state["messages"]
+        response = llm.with_structured_output(Supervisor).invoke(messages, config=ROUTING_CONFIG)
+        goto = ["researcher", "coder"] if response.next == "researcher_and_coder" else response.next
+        return Command(update={"messages": [HumanMessage(content=response.reason, name="supervisor")]}, goto=goto)
+
+    def enhancer_node(state: MessagesState) -> Command[Literal["supervisor"]]:
+        messages = [{"role": "system", "content": "You are a Query Refinement Specialist."}] + state["messages"]
+        enhanced_query = llm.invoke(messages, config=agent_config("enhancer"))
+        return Command(update={"messages": [HumanMessage(content=enhanced_query.content, name="enhancer")]},
+                       goto="supervisor")
+
+    def research_node(state: MessagesState) -> Command[Literal["validator"]]:
+        result = research_agent().invoke(state, config=agent_config("researcher"))
+        return Command(update={"messages": [HumanMessage(content=result["messages"][-1].content, name="researcher")]},
+                       goto="validator")
+
+    def code_node(state: MessagesState) -> Command[Literal["validator"]]:
+        result = code_agent().invoke(state, config=agent_config("coder"))
+        return Command(update={"messages": [HumanMessage(content=result["messages"][-1].content, name="coder")]},
+                       goto="validator")
+
+    def validator_node(state: MessagesState) -> Command[Literal["supervisor", "__end__"]]:
+        messages = [{"role": "system", "content": "Your task is to ensure reasonable quality."},
+                    {"role": "user", "content": state["messages"][0].content},
+                    {"role": "assistant", "content": specialist_answer(state["messages"])}]
+        response = llm.with_structured_output(Validator).invoke(messages, config=ROUTING_CONFIG)
+        goto = END if response.next == "FINISH" else response.next
+        return Command(update={"messages": [HumanMessage(content=response.reason, name="validator")]}, goto=goto)
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("supervisor", supervisor_node)
+    graph.add_node("enhancer", enhancer_node)
+    graph.add_node("researcher", research_node)
+    graph.add_node("coder", code_node)
+    graph.add_node("validator", validator_node)
+    graph.add_edge(START, "supervisor")
+    return graph.compile()
+
+
+def run_variant(name: str, latency: float, tool_latency: float, repeat: int):
+    options = VARIANTS[name]
+    llm = ScriptedChatModel(latency=latency, choices={
+        "Supervisor.next": parallel_route if options["parallel"] else sequential_route,
+        "Validator.next": validate,
+    })
+    metrics = GraphMetrics(label_threads=False)
+    app = build_app(llm, FakeSearchTool(default_latency=tool_latency), options["compile_once"])
+    app = instrument(app, metrics, graph=name)
+    app.invoke({"messages": [("user", QUESTION)]})  # warm-up
+    metrics.reset()
+    calls_before = llm.calls
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = app.invoke({"messages": [("user", QUESTION)]})
+        walls.append(time.perf_counter() - start)
+    assert {"researcher", "coder"} <= _names(result["messages"]), "both specialists must have answered"
+
+    hops = [series for labels, series in metrics.node_duration.series.items()
+            if dict(labels)["node"] in ("researcher", "coder")]
+    hop_count = sum(series[-1] for series in hops)
+    steps = sum(series[-1] for series in metrics.node_duration.series.values())
+    return {
+        "wall": statistics.median(walls),
+        "hop": sum(series[-2] for series in hops) / hop_count,
+        "steps": steps / repeat,
+        "llm_calls": (llm.calls - calls_before) / repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM latency per call (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.3, help="fake search latency per query (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'variant':<17} {'node runs':>9} {'llm calls':>9} {'hop ms (0 lat)':>15} {'wall ms (0 lat)':>16} "
+          f"{'hop s':>7} {'wall s':>7}")
+    for name in VARIANTS:
+        fast = run_variant(name, 0.0, 0.0, max(args.repeat, 20))
+        slow = run_variant(name, args.latency, args.tool_latency, args.repeat)
+        print(f"{name:<17} {fast['steps']:>9.0f} {fast['llm_calls']:>9.0f} {fast['hop'] * 1000:>15.2f} "
+              f"{fast['wall'] * 1000:>16.2f} {slow['hop']:>7.2f} {slow['wall']:>7.2f}")
+    print(f"fake latency {args.latency}s per LLM call, {args.tool_latency}s per search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Time to first token of the supervisor workflow, before and after token streaming.
+
+Mirrors 2_supervisor_multiagent_workflow.ipynb node for node on the streaming
+fake model from benchmarks/fakes.py (``--latency`` before the first token,
+then ``--tokens-per-second``), so no API keys are needed.
+
+* before: the notebook's original consumption, ``app.stream(inputs)`` in
+  "updates" mode. The first text a client sees is the enhancer's whole answer,
+  and the real answer arrives only after the researcher's / coder's complete
+  ReAct loop.
+* after: ``stream_agent_tokens`` ("messages" mode) with the nodes tagged by
+  ``agent_config`` and the routing calls muted by ``ROUTING_CONFIG``.
+
+    python benchmark_supervisor_streaming.py --latency 0.3 --tokens-per-second 30
+"""
+import argparse
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Literal, Sequence
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from langchain_core.messages import BaseMessage, HumanMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+from langgraph.graph import END, START, MessagesState, StateGraph  # noqa: E402
+from langgraph.prebuilt import create_react_agent  # noqa: E402
+from langgraph.types import Command  # noqa: E402
+from pydantic import BaseModel, Field  # noqa: E402
+
+from agent_streaming import ROUTING_CONFIG, agent_config, stream_agent_tokens  # noqa: E402
+from fakes import FakeSearchTool, ScriptedChatModel  # noqa: E402
+
+SPECIALISTS = ("enhancer", "researcher", "coder")
+QUESTIONS = ["Weather in Chennai", "Give me the 20th fibonacci number"]
+
+
+class Supervisor(BaseModel):
+    next: Literal["enhancer", "researcher", "coder"] = Field(description="Which specialist to activate next.")
+    reason: str = Field(description="Justification for the routing decision.")
+
+
+class Validator(BaseModel):
+    next: Literal["supervisor", "FINISH"] = Field(description="'supervisor' to continue or 'FINISH' to terminate.")
+    reason: str = Field(description="The reason for the decision.")
+
+
+def route(messages: Sequence[BaseMessage]) -> str:
+    if not any(getattr(message, "name", None) == "enhancer" for message in messages):
+        return "enhancer"
+    question = next((str(m.content) for m in messages if isinstance(m, HumanMessage)), "")
+    return "coder" if "fibonacci" in question.lower() else "researcher"
+
+
+@tool
+def python_repl(command: str) -> str:
+    """A Python shell. Use this to execute python commands."""
+    return "6765\n"
+
+
+def build_app(llm, search_tool, streaming: bool):
+    def tagged(agent):
+        return agent_config(agent) if streaming else None
+
+    routing = ROUTING_CONFIG if streaming else None
+    research_agent = create_react_agent(llm, tools=[search_tool], prompt="You are an Information Specialist.")
+    code_agent = create_react_agent(llm, tools=[python_repl], prompt="You are a coder and analyst.")
+
+    def supervisor_node(state: MessagesState) -> Command[Literal["enhancer", "researcher", "coder"]]:
+        messages = [{"role": "system", "content": "You are a workflow supervisor."}] + state["messages"]
+        response = llm.with_structured_output(Supervisor).invoke(messages, config=routing)
+        return Command(update={"messages": [HumanMessage(content=response.reason, name="supervisor")]},
+                       goto=response.next)
+
+    def enhancer_node(state: MessagesState) -> Command[Literal["supervisor"]]:
+        messages = [{"role": "system", "content": "You are a Query Refinement Specialist."}] + state["messages"]
+        enhanced_query = llm.invoke(messages, config=tagged("enhancer"))
+        return Command(update={"messages": [HumanMessage(content=enhanced_query.content, name="enhancer")]},
+                       goto="supervisor")
+
+    def research_node(state: MessagesState) -> Command[Literal["validator"]]:
+        result = research_agent.invoke(state, config=tagged("researcher"))
+        return Command(update={"messages": [HumanMessage(content=result["messages"][-1].content, name="researcher")]},
+                       goto="validator")
+
+    def code_node(state: MessagesState) -> Command[Literal["validator"]]:
+        result = code_agent.invoke(state, config=tagged("coder"))
+        return Command(update={"messages": [HumanMessage(content=result["messages"][-1].content, name="coder")]},
+                       goto="validator")
+
+    def validator_node(state: MessagesState) -> Command[Literal["supervisor", "__end__"]]:
+        messages = [{"role": "system", "content": "Your task is to ensure reasonable quality."},
+                    {"role": "user", "content": state["messages"][0].content},
+                    {"role": "assistant", "content": state["messages"][-1].content}]
+        response = llm.with_structured_output(Validator).invoke(messages, config=routing)
+        goto = END if response.next == "FINISH" else response.next
+        return Command(update={"messages": [HumanMessage(content=response.reason, name="validator")]}, goto=goto)
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("supervisor", supervisor_node)
+    graph.add_node("enhancer", enhancer_node)
+    graph.add_node("researcher", research_node)
+    graph.add_node("coder", code_node)
+    graph.add_node("validator", validator_node)
+    graph.add_edge(START, "supervisor")
+    return graph.compile()
+
+
+def measure_updates(app, question: str):
+    """First specialist text and first answer text as the notebook's updates loop sees them."""
+    start = time.perf_counter()
+    first = answer = None
+    for event in app.stream({"messages": [("user", question)]}):
+        for node in event:
+            if node in SPECIALISTS and first is None:
+                first = time.perf_counter() - start
+            if node in ("researcher", "coder") and answer is None:
+                answer = time.perf_counter() - start
+    return first, answer, time.perf_counter() - start
+
+
+def measure_tokens(app, question: str):
+    start = time.perf_counter()
+    first = answer = None
+    agents = set()
+    for agent, _ in stream_agent_tokens(app, {"messages": [("user", question)]}):
+        agents.add(agent)
+        if first is None:
+            first = time.perf_counter() - start
+        if agent in ("researcher", "coder") and answer is None:
+            answer = time.perf_counter() - start
+    assert agents <= set(SPECIALISTS), f"untagged or routing tokens leaked into the stream: {agents}"
+    return first, answer, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM latency before the first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=30.0)
+    parser.add_argument("--tool-latency", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    llm = ScriptedChatModel(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                            choices={"Supervisor.next": route, "Validator.next": "FINISH"})
+    search_tool = FakeSearchTool(default_latency=args.tool_latency)
+    variants = [("before (updates)", build_app(llm, search_tool, streaming=False), measure_updates),
+                ("after (tokens)", build_app(llm, search_tool, streaming=True), measure_tokens)]
+
+    print(f"fake LLM: {args.latency}s to first token, {args.tokens_per_second:g} tokens/s; "
+          f"search {args.tool_latency}s; median of {args.repeat}")
+    print(f"{'question':<36} {'variant':<18} {'first text s':>13} {'first answer s':>15} {'total s':>8}")
+    for question in QUESTIONS:
+        for name, app, measure in variants:
+            runs = [measure(app, question) for _ in range(args.repeat)]
+            first, answer, total = (statistics.median(values) for values in zip(*runs))
+            print(f"{question:<36} {name:<18} {first:>13.2f} {answer:>15.2f} {total:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Pre-warmed, isolated worker processes for the coder agent's Python execution.
+
+``PythonREPLTool`` runs snippets on behalf of the serving process: a slow
+computation ties up the caller, concurrent runs share one interpreter's
+``sys.stdout`` and globals, and a runaway or crashing snippet takes the graph
+down with it. :class:`CodeExecutorPool` keeps ``size`` worker processes
+started (modules in ``preload`` already imported) and runs each snippet in one
+of them:
+
+* limits: CPU seconds per snippet (``RLIMIT_CPU``, checked by the kernel),
+  address space per worker (``RLIMIT_AS``) and a wall-clock ``timeout``
+  after which the worker is killed and replaced;
+* isolation: a crash, ``os._exit`` or ``MemoryError`` only costs that worker;
+* state: with a ``session`` (the graph's ``thread_id``) variables survive
+  between snippets; the session is pinned to one worker, which keeps up to
+  ``max_sessions_per_worker`` namespaces (least recently used dropped first);
+* concurrency: snippets on different workers run in parallel.
+
+    pool = CodeExecutorPool(size=4, preload=("math", "statistics"))
+    python_repl_tool = PooledPythonTool(pool=pool)   # drop-in for PythonREPLTool
+    ...
+    pool.close()
+"""
+import asyncio
+import contextlib
+import importlib
+import io
+import math
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+try:
+    import resource  # POSIX only; without it only the wall-clock timeout applies
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+@dataclass
+class ExecutionResult:
+    status: str  # "ok", "error", "timeout", "cpu_limit", "memory_limit" or "crashed"
+    output: str
+    seconds: float
+    worker_pid: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class _CpuLimitExceeded(BaseException):
+    """Raised inside a worker by SIGXCPU; a BaseException so snippets cannot swallow it with ``except Exception``."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _worker_main(conn, preload: Sequence[str], memory_mb: Optional[int], max_sessions: int) -> None:
+    for module in preload:
+        importlib.import_module(module)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        if memory_mb:
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    conn.send(("ready", os.getpid()))
+
+    sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+        session, code, cpu_seconds = request
+        if session is None:
+            namespace = {"__name__": "__main__"}
+        else:
+            namespace = sessions.pop(session, None) or {"__name__": "__main__"}
+            sessions[session] = namespace
+            while len(sessions) > max_sessions:
+                sessions.popitem(last=False)
+
+        output = io.StringIO()
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            if resource is not None and cpu_seconds:
+                # RLIMIT_CPU counts the worker's whole lifetime, so the limit moves with each snippet
+                soft = math.ceil(_cpu_used() + cpu_seconds)
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.RLIM_INFINITY))
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                exec(compile(code, "<snippet>", "exec"), namespace)
+        except _CpuLimitExceeded:
+            status = "cpu_limit"
+            output.write(f"CPU time limit of {cpu_seconds}s exceeded")
+        except MemoryError:
+            status = "memory_limit"
+            output.write(f"memory limit of {memory_mb} MB exceeded")
+        except BaseException as e:  # SystemExit and KeyboardInterrupt from the snippet included
+            status = "error"
+            output.write(repr(e))
+        finally:
+            if resource is not None and cpu_seconds:
+                resource.setrlimit(resource.RLIMIT_CPU, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))
+        try:
+            conn.send((status, output.getvalue(), time.perf_counter() - start))
+        except (BrokenPipeError, OSError):
+            break
+
+
+class _Worker:
+    def __init__(self, context, preload, memory_mb, max_sessions):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, tuple(preload), memory_mb, max_sessions),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.pid: Optional[int] = None
+        self.busy = False
+        self.sessions: set = set()
+
+    def wait_ready(self, timeout: float) -> None:
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"code worker did not start within {timeout}s")
+        _, self.pid = self.conn.recv()
+
+    def kill(self) -> None:
+        with contextlib.suppress(Exception):
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class CodeExecutorPool:
+    """Pool of pre-started Python worker processes with per-snippet limits.
+
+    Args:
+        size: worker processes, i.e. snippets that can run at the same time.
+        timeout: wall-clock seconds per snippet before the worker is killed.
+        cpu_seconds: CPU seconds per snippet (``None``: no limit).
+        memory_mb: address-space limit of each worker (``None``: no limit).
+        preload: modules imported by every worker at start-up.
+        max_sessions_per_worker: session namespaces a worker keeps.
+        start_method: multiprocessing start method; "spawn" (default) and
+            "forkserver" are safe to use from a process running threads.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        timeout: float = 30.0,
+        cpu_seconds: Optional[float] = 10.0,
+        memory_mb: Optional[int] = 1024,
+        preload: Sequence[str] = ("math", "statistics", "json"),
+        max_sessions_per_worker: int = 64,
+        start_method: str = "spawn",
+        start_timeout: float = 60.0,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.preload = tuple(preload)
+        self.max_sessions_per_worker = max_sessions_per_worker
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._condition = threading.Condition()
+        self._affinity: "OrderedDict[str, _Worker]" = OrderedDict()
+        self._closed = False
+        self.counts = {status: 0 for status in ("ok", "error", "timeout", "cpu_limit", "memory_limit", "crashed")}
+        self.restarts = 0
+        self._workers: List[_Worker] = [self._new_worker() for _ in range(size)]
+        for worker in self._workers:
+            worker.wait_ready(start_timeout)
+
+    def _new_worker(self) -> _Worker:
+        return _Worker(self._context, self.preload, self.memory_mb, self.max_sessions_per_worker)
+
+    # -- dispatch --------------------------------------------------------------
+
+    def _acquire(self, session: Optional[str]) -> _Worker:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("CodeExecutorPool is closed")
+                pinned = self._affinity.get(session) if session is not None else None
+                if pinned is not None and pinned in self._workers:
+                    if not pinned.busy:
+                        self._affinity.move_to_end(session)
+                        pinned.busy = True
+                        return pinned
+                else:
+                    idle = [worker for worker in self._workers if not worker.busy]
+                    if idle:
+                        worker = min(idle, key=lambda w: len(w.sessions))
+                        if session is not None:
+                            self._pin(session, worker)
+                        worker.busy = True
+                        return worker
+                self._condition.wait()
+
+    def _pin(self, session: str, worker: _Worker) -> None:
+        self._affinity[session] = worker
+        worker.sessions.add(session)
+        while len(self._affinity) > self.max_sessions_per_worker * self.size:
+            old_session, old_worker = self._affinity.popitem(last=False)
+            old_worker.sessions.discard(old_session)
+
+    def _release(self, worker: _Worker) -> None:
+        with self._condition:
+            worker.busy = False
+            self._condition.notify_all()
+
+    def _replace(self, worker: _Worker) -> None:
+        """Kill ``worker`` and start a fresh one in its slot; its sessions lose their state."""
+        worker.kill()
+        replacement = self._new_worker()
+        replacement.wait_ready(self.start_timeout)
+        with self._condition:
+            for session in worker.sessions:
+                self._affinity.pop(session, None)
+            self._workers[self._workers.index(worker)] = replacement
+            self.restarts += 1
+            self._condition.notify_all()
+
+    def run(self, code: str, session: Optional[str] = None, timeout: Optional[float] = None) -> ExecutionResult:
+        """Execute ``code`` and return what it printed (stdout and stderr)."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        worker = self._acquire(session)
+        pid = worker.pid
+        try:
+            try:
+                worker.conn.send((session, code, self.cpu_seconds))
+                if worker.conn.poll(timeout):
+                    status, output, _ = worker.conn.recv()
+                else:
+                    status, output = "timeout", f"execution exceeded {timeout}s and was stopped"
+            except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+                status, output = "crashed", "the worker process died while running this code"
+            if status in ("timeout", "crashed"):
+                self._replace(worker)
+                if session is not None:
+                    output += "; session state was reset"
+        finally:
+            self._release(worker)
+        with self._condition:
+            self.counts[status] += 1
+        return ExecutionResult(status, output, time.perf_counter() - start, pid)
+
+    async def arun(self, code: str, session: Optional[str] = None, timeout: Optional[float] = None) -> ExecutionResult:
+        return await asyncio.to_thread(self.run, code, session, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {"workers": self.size, "busy": sum(w.busy for w in self._workers),
+                    "sessions": len(self._affinity), "restarts": self.restarts, **self.counts}
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            self._condition.notify_all()
+        for worker in workers:
+            with contextlib.suppress(Exception):
+                worker.conn.send(None)
+            worker.process.join(timeout=2)
+            worker.kill()
+
+    def __enter__(self) -> "CodeExecutorPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def sanitize_input(query: str) -> str:
+    """Strip whitespace and surrounding ``` fences (with an optional "python" tag), as PythonREPLTool does."""
+    query = re.sub(r"^(\s|`)*(?i:python)?\s*", "", query)
+    return re.sub(r"(\s|`)*$", "", query)
+
+
+class PooledPythonTool(BaseTool):
+    """Python shell tool backed by a :class:`CodeExecutorPool`.
+
+    With ``per_thread_state`` the graph's ``thread_id`` is the session, so a
+    conversation keeps its variables between tool calls.
+    """
+
+    name: str = "Python_REPL"
+    description: str = (
+        "A Python shell. Use this to execute python commands. Input should be a valid python command. "
+        "If you want to see the output of a value, you should print it out with `print(...)`."
+    )
+    pool: Any
+    per_thread_state: bool = True
+
+    def _session(self, config: Optional[RunnableConfig]) -> Optional[str]:
+        if not self.per_thread_state or not config:
+            return None
+        thread_id = config.get("configurable", {}).get("thread_id")
+        return None if thread_id is None else str(thread_id)
+
+    @staticmethod
+    def _format(result: ExecutionResult) -> str:
+        return result.output if result.ok else f"{result.status}: {result.output}"
+
+    def _run(self, query: str, run_manager=None, config: RunnableConfig = None) -> str:
+        return self._format(self.pool.run(sanitize_input(query), session=self._session(config)))
+
+    async def _arun(self, query: str, run_manager=None, config: RunnableConfig = None) -> str:
+        return self._format(await self.pool.arun(sanitize_input(query), session=self._session(config)))
@@ -0,0 +1,202 @@
+"""Agreement and latency of fast_router.FastRouter against the LLM router it replaces.
+
+Two modes:
+
+* ``--log decisions.jsonl`` (the agreement result): a decision log written by a
+  FastRouter in real use (``{"text", "next"}`` lines, one per gpt-4o decision,
+  e.g. the notebook's supervisor_decisions.jsonl). The classifier is trained on
+  the first ``--train`` fraction and scored on the held-out rest. For each
+  confidence threshold it reports the share of held-out decisions taken
+  locally, how often those agree with the LLM (overall and on ``--focus``,
+  the mixed requests that should fan out to ``researcher_and_coder``), local
+  latency, and the LLM time saved.
+* synthetic (no ``--log``): a latency check only. Supervisor and validator
+  decision points are built from templated research, computation and mixed
+  requests, with the notebook's ``Supervisor`` schema and rules, and the
+  streaming fake from benchmarks/fakes.py answers LLM fallbacks after
+  ``--llm-latency`` seconds. The router starts cold and learns online from
+  its fallbacks, as it would in the notebook. It reports how many decisions
+  rules and the classifier take, their latency, and the routing time saved.
+  The fake answers with the same template labels the rules and classifier
+  are built from, so agreement is not reported here.
+
+The default LLM latency is kept small so the synthetic run takes seconds; the
+saved share scales with it.
+
+    python evaluate_fast_router.py --log supervisor_decisions.jsonl --llm-latency 0.8
+    python evaluate_fast_router.py --llm-latency 0.05
+"""
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import List, Literal, Optional, Tuple
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from pydantic import BaseModel, Field  # noqa: E402
+
+from fakes import ScriptedChatModel  # noqa: E402
+from fast_router import (CentroidClassifier, FastRouter, keyword_rule, load_decisions, question,  # noqa: E402
+                         question_and_answer, question_and_speakers, rule, spoke)
+
+THRESHOLDS = (0.1, 0.2, 0.3, 0.4, 0.5)
+
+RESEARCH = ["What's the weather in {x} today?", "Latest news about {x}", "Who is the current mayor of {x}?",
+            "Find the population of {x}", "What are the best places to visit in {x}?",
+            "Give me recent facts about {x}", "What happened in {x} this week?", "History of {x} in brief"]
+COMPUTE = ["Give me the {n}th fibonacci number", "Calculate the factorial of {n}", "Compute {n} squared plus 7",
+           "Write python to sort {n} random numbers", "What is the sum of the first {n} primes?",
+           "Convert {n} miles to kilometers", "Plot a sine wave with {n} points", "Is {n} a prime number?"]
+MIXED = ["Find the population of {x}, and separately give me the {n}th fibonacci number",
+         "What's the weather in {x} today? Also calculate the factorial of {n}",
+         "Latest news about {x}, and compute {n} squared plus 7",
+         "Who is the current mayor of {x}? Also write python to sort {n} random numbers"]
+PLACES = ["Chennai", "Paris", "Tokyo", "Nairobi", "Lima", "Oslo", "Austin", "Hanoi", "Cairo", "Perth"]
+NUMBERS = [12, 20, 35, 48, 64, 77, 90, 101, 150, 256]
+OFF_TOPIC = ["I cannot help with that.", "Sorry, something went wrong.", "As an AI I have no opinion.",
+             "Error: tool call failed."]
+
+
+# The notebook's schema and rules (2_supervisor_multiagent_workflow.ipynb)
+class Supervisor(BaseModel):
+    next: Literal["enhancer", "researcher", "coder", "researcher_and_coder"] = Field(
+        description="Which specialist to activate next; 'researcher_and_coder' runs both in parallel.")
+    reason: str = Field(description="Justification for the routing decision.")
+
+
+class Validator(BaseModel):
+    next: Literal["supervisor", "FINISH"] = Field(description="'supervisor' to continue or 'FINISH' to terminate.")
+    reason: str = Field(description="The reason for the decision.")
+
+
+RESEARCH_INTENT = [r"\bfind\b", r"\bsearch\b", r"\blook up\b", r"\bweather\b", r"\bpopulation\b",
+                   r"\bnews\b", r"\blatest\b", r"\bcurrent\b", r"\btoday\b", r"\bwho\b", r"\bhistory\b"]
+
+
+def supervisor_rules():
+    """Enhancer first; computation goes straight to the coder unless the request also asks for research."""
+    return [rule("enhancer", lambda messages: not spoke(messages, "enhancer"), "enhancer first"),
+            keyword_rule("coder", r"\bfibonacci\b", r"\bfactorial\b", r"\bcalculat", r"\bcompute\b", r"\bpython\b",
+                         unless=RESEARCH_INTENT, when=lambda messages: not spoke(messages, "coder"))]
+
+
+def supervisor_cases(rng: random.Random) -> List[Tuple[list, str]]:
+    """(messages, label): one decision point before and one after the enhancer for each request."""
+    cases = []
+    requests = [(t.format(x=place), "researcher") for t, place in itertools.product(RESEARCH, PLACES)] + \
+               [(t.format(n=n), "coder") for t, n in itertools.product(COMPUTE, NUMBERS)] + \
+               [(t.format(x=place, n=n), "researcher_and_coder") for t in MIXED for place, n in zip(PLACES, NUMBERS)]
+    for text, label in requests:
+        system = {"role": "system", "content": "You are a workflow supervisor."}
+        first = [system, HumanMessage(content=text)]
+        enhanced = first + [HumanMessage(content="Route to the enhancer first.", name="supervisor"),
+                            HumanMessage(content=f"Refined request: {text}. Be specific and complete.",
+                                         name="enhancer")]
+        cases += [(first, "enhancer"), (enhanced, label)]
+    rng.shuffle(cases)
+    return cases
+
+
+def validator_cases(rng: random.Random) -> List[Tuple[list, str]]:
+    cases = []
+    for text in [t.format(x=p) for t, p in itertools.product(RESEARCH, PLACES[:5])] + \
+                [t.format(n=n) for t, n in itertools.product(COMPUTE, NUMBERS[:5])]:
+        good = f"Here is what I found about {text.lower().rstrip('?')}: a complete, sourced answer."
+        bad = rng.choice(OFF_TOPIC)
+        for answer, label in ((good, "FINISH"), (bad, "supervisor")):
+            cases.append(([{"role": "system", "content": "Your task is to ensure reasonable quality."},
+                           {"role": "user", "content": text},
+                           {"role": "assistant", "content": answer}], label))
+    rng.shuffle(cases)
+    return cases
+
+
+def scripted_llm(schema, cases, latency: float):
+    """Structured-output fake that answers each case with its template label after ``latency`` seconds."""
+    labels = {_key(messages): label for messages, label in cases}
+    llm = ScriptedChatModel(latency=latency, choices={f"{schema.__name__}.next": lambda m: labels[_key(m)]})
+    return llm.with_structured_output(schema)
+
+
+def _key(messages) -> str:
+    last = messages[-1]
+    content = last["content"] if isinstance(last, dict) else last.content
+    return f"{question(messages)}|{len(messages)}|{content}"
+
+
+def check_latency(name, schema, cases, rules, featurize, llm_latency: float) -> None:
+    print(f"\n{name}: {len(cases)} synthetic decisions, router learns online from its LLM fallbacks (latency only)")
+    print(f"{'threshold':>9} {'rule':>5} {'centroid':>8} {'llm':>5} {'local %':>8} {'local us':>9} "
+          f"{'routing s':>10} {'all-LLM s':>10} {'saved':>7}")
+    for threshold in THRESHOLDS:
+        router = FastRouter(schema, scripted_llm(schema, cases, llm_latency), rules=rules, featurize=featurize,
+                            threshold=threshold)
+        local_times, start = [], time.perf_counter()
+        for messages, _ in cases:
+            decision = router.decide(messages)
+            if decision.source != "llm":
+                local_times.append(decision.seconds)
+        routing = time.perf_counter() - start
+        all_llm = len(cases) * llm_latency
+        counts = router.counts
+        print(f"{threshold:>9.2f} {counts['rule']:>5} {counts['centroid']:>8} {counts['llm']:>5} "
+              f"{len(local_times) / len(cases):>8.1%} "
+              f"{statistics.median(local_times) * 1e6 if local_times else 0:>9.1f} {routing:>10.2f} "
+              f"{all_llm:>10.2f} {1 - routing / all_llm:>7.1%}")
+
+
+def evaluate_log(path: str, train: float, llm_latency: float, focus: Optional[str] = None) -> None:
+    """Train on the first ``train`` fraction of a decision log and score against the LLM on the rest."""
+    examples = load_decisions(path)
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * train)
+    training, test = examples[:split], examples[split:]
+    classifier = CentroidClassifier().fit(training)
+    predictions = []
+    for text, label in test:
+        start = time.perf_counter()
+        prediction = classifier.predict(text)
+        predictions.append((prediction, label, time.perf_counter() - start))
+    focused = sum(label == focus for _, label in test)
+    print(f"{path}: trained on {len(training)}, tested on {len(test)} held-out LLM decisions "
+          f"(examples per label {classifier.examples}; {focused} held out labelled {focus or '-'})")
+    print(f"{'threshold':>9} {'local %':>8} {'local agree':>11} {(focus or '-') + ' local agree':>32} "
+          f"{'local us':>9} {'saved s':>8}")
+    for threshold in THRESHOLDS:
+        local = [(p, label, s) for p, label, s in predictions if p is not None and p[1] >= threshold]
+        agree = sum(p[0] == label for p, label, _ in local)
+        local_focus = [p[0] == label for p, label, _ in local if label == focus]
+        focus_agree = format(sum(local_focus) / len(local_focus), ".1%") if local_focus else "-"
+        print(f"{threshold:>9.2f} {len(local) / max(len(test), 1):>8.1%} {agree / max(len(local), 1):>11.1%} "
+              f"{focus_agree:>32} {statistics.median([s for *_, s in local]) * 1e6 if local else 0:>9.1f} "
+              f"{len(local) * llm_latency - sum(s for *_, s in local):>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per LLM routing call")
+    parser.add_argument("--log", help="FastRouter decision log to score held-out agreement on")
+    parser.add_argument("--train", type=float, default=0.7, help="training fraction of the log")
+    parser.add_argument("--focus", default="researcher_and_coder", help="label whose agreement is reported on its own")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.log:
+        evaluate_log(args.log, args.train, args.llm_latency, args.focus)
+        return
+    print("no --log given: agreement needs held-out LLM decisions, so this run only checks routing latency")
+    rng = random.Random(args.seed)
+    check_latency("supervisor", Supervisor, supervisor_cases(rng), supervisor_rules(), question_and_speakers,
+                  args.llm_latency)
+    check_latency("validator", Validator, validator_cases(rng), [], question_and_answer, args.llm_latency)
+
+
+if __name__ == "__main__":
+    main()
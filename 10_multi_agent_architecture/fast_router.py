@@ -0,0 +1,321 @@
+"""Local pre-router for the supervisor and validator routing calls.
+
+Every hop of the supervisor workflow asks gpt-4o for a ``Supervisor``
+(``next`` + ``reason``) and every answer is checked with a ``Validator`` call,
+although most of those decisions are predictable from the conversation. A
+:class:`FastRouter` answers first from
+
+1. keyword / state rules (``rule``, ``keyword_rule``), then
+2. a nearest-centroid classifier over embeddings of past decisions,
+
+and only calls the LLM when neither is confident. Every LLM decision is
+appended to a JSONL log and folded into the centroids, so the router learns
+the LLM's behaviour as it runs (and starts from the log on the next run).
+
+    supervisor_router = FastRouter(
+        Supervisor, llm.with_structured_output(Supervisor),
+        rules=[rule("enhancer", lambda messages: not spoke(messages, "enhancer")),
+               keyword_rule("coder", r"\\bcalculat", r"\\bfibonacci\\b", unless=[r"\\bweather\\b", r"\\bfind\\b"],
+                            when=lambda m: not spoke(m, "coder"))],
+        log_path="supervisor_decisions.jsonl",
+    )
+    response = supervisor_router.invoke(messages)   # a Supervisor instance either way
+
+The default embedding is a local hashed bag of words and bigrams (numpy, tens
+of microseconds per call); any LangChain ``Embeddings`` can be passed instead,
+at the cost of its latency. evaluate_fast_router.py measures agreement with the
+LLM and the latency saved.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Messages = Sequence[Any]  # BaseMessage objects or {"role": ..., "content": ...} dicts, as the nodes build them
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+
+@dataclass
+class RouteDecision:
+    next: str
+    reason: str
+    source: str  # "rule", "centroid" or "llm"
+    confidence: float
+    seconds: float
+
+
+@dataclass
+class Rule:
+    route: str
+    matches: Callable[[Messages], bool]
+    name: str
+    confidence: float = 1.0
+
+
+def _field(message: Any, key: str) -> Any:
+    if isinstance(message, dict):
+        return message.get(key)
+    if isinstance(message, (tuple, list)):  # ("user", "text") shorthand
+        return {"role": message[0], "content": message[1]}.get(key)
+    if key == "role":
+        return {"human": "user", "ai": "assistant"}.get(message.type, message.type)
+    return getattr(message, key, None)
+
+
+def question(messages: Messages) -> str:
+    """The user's original request: the first user message that no agent wrote."""
+    for message in messages:
+        if _field(message, "role") == "user" and not _field(message, "name"):
+            return str(_field(message, "content"))
+    return ""
+
+
+def spoke(messages: Messages, name: str) -> bool:
+    return any(_field(message, "name") == name for message in messages)
+
+
+def last_speaker(messages: Messages) -> str:
+    message = messages[-1] if messages else {}
+    return _field(message, "name") or _field(message, "role") or ""
+
+
+def question_and_speakers(messages: Messages) -> str:
+    """Supervisor features: the request plus which agents have answered so far and who spoke last."""
+    speakers = sorted({_field(m, "name") for m in messages if _field(m, "name")})
+    return f"{question(messages)}\nanswered_by_{' answered_by_'.join(speakers) if speakers else 'nobody'}" \
+           f"\nlast_{last_speaker(messages)}"
+
+
+def question_and_answer(messages: Messages) -> str:
+    """Validator features: the request and the answer under review."""
+    return f"{question(messages)}\n{_field(messages[-1], 'content') if messages else ''}"
+
+
+def rule(route: str, matches: Callable[[Messages], bool], name: Optional[str] = None,
+         confidence: float = 1.0) -> Rule:
+    return Rule(route, matches, name or route, confidence)
+
+
+def _any_of(patterns: Sequence[str]) -> "re.Pattern":
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+def keyword_rule(route: str, *patterns: str, unless: Sequence[str] = (),
+                 when: Optional[Callable[[Messages], bool]] = None, confidence: float = 1.0) -> Rule:
+    """Route when the user's request matches any of the (case-insensitive) regex ``patterns``.
+
+    A request that also matches one of the ``unless`` patterns is left to the
+    classifier / LLM (e.g. a computation mixed with a research question), and
+    ``when`` restricts the rule to some conversation states, e.g. before any
+    specialist answered.
+    """
+    compiled = _any_of(patterns)
+    veto = _any_of(unless) if unless else None
+
+    def matches(messages: Messages) -> bool:
+        if when is not None and not when(messages):
+            return False
+        text = question(messages)
+        return compiled.search(text) is not None and (veto is None or veto.search(text) is None)
+
+    return Rule(route, matches, f"keywords {patterns[0]!r}{'...' if len(patterns) > 1 else ''}", confidence)
+
+
+class HashedBagOfWords:
+    """Local text embedding: signed feature hashing of words and bigrams, L2-normalized."""
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    def _slot(self, feature: str) -> Tuple[int, float]:
+        slot = self._slots.get(feature)
+        if slot is None:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            slot = self._slots[feature] = (digest % self.size, 1.0 if digest >> 63 else -1.0)
+        return slot
+
+    def embed_query(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        slots = [self._slot(feature) for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]]
+        if not slots:
+            return np.zeros(self.size, dtype=np.float32)
+        indices, signs = zip(*slots)
+        vector = np.bincount(indices, weights=signs, minlength=self.size).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[np.ndarray]:
+        return [self.embed_query(text) for text in texts]
+
+
+class CentroidClassifier:
+    """Nearest centroid over normalized embeddings, updated one example at a time.
+
+    Confidence is the relative margin ``1 - second / best`` between the cosine
+    similarities of the two closest centroids, so a text halfway between two
+    classes is not trusted however similar it is to both.
+    """
+
+    def __init__(self, embeddings=None, min_examples: int = 3):
+        self.embeddings = embeddings or HashedBagOfWords()
+        self.min_examples = min_examples
+        self._sums: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._labels: List[str] = []
+        self._matrix: Optional[np.ndarray] = None  # normalized centroids of labels with enough examples
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def learn(self, text: str, label: str) -> None:
+        vector = self._vector(text)
+        if label in self._sums:
+            self._sums[label] += vector
+        else:
+            self._sums[label] = vector.copy()
+        self._counts[label] = self._counts.get(label, 0) + 1
+        self._matrix = None
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "CentroidClassifier":
+        for text, label in examples:
+            self.learn(text, label)
+        return self
+
+    def _centroids(self) -> Optional[np.ndarray]:
+        if self._matrix is None:
+            self._labels = [label for label, count in self._counts.items() if count >= self.min_examples]
+            if len(self._labels) < 2:
+                return None
+            matrix = np.stack([self._sums[label] for label in self._labels])
+            self._matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return self._matrix
+
+    def predict(self, text: str) -> Optional[Tuple[str, float]]:
+        """``(label, margin)``, or ``None`` until two labels have ``min_examples`` each."""
+        matrix = self._centroids()
+        if matrix is None:
+            return None
+        scores = matrix @ self._vector(text)
+        best, second = np.argsort(scores)[::-1][:2]
+        if scores[best] <= 0:
+            return self._labels[best], 0.0
+        return self._labels[best], float(1.0 - max(scores[second], 0.0) / scores[best])
+
+    @property
+    def examples(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+
+class FastRouter:
+    """Drop-in for ``llm.with_structured_output(Schema)`` on routing decisions.
+
+    Args:
+        schema: the pydantic routing model (``next`` and ``reason`` fields).
+        llm_router: the structured-output runnable used as fallback and teacher.
+        rules: checked in order; the first match wins.
+        featurize: messages -> text fed to the classifier.
+        threshold: minimum relative centroid margin to decide locally.
+        embeddings: embedding model for the classifier (default: local hashing).
+        log_path: JSONL file of LLM decisions; loaded at start and appended to.
+        min_examples: examples per label before the classifier is consulted.
+    """
+
+    def __init__(
+        self,
+        schema,
+        llm_router,
+        rules: Sequence[Rule] = (),
+        featurize: Callable[[Messages], str] = question_and_speakers,
+        threshold: float = 0.3,
+        embeddings=None,
+        log_path: Optional[str] = None,
+        min_examples: int = 3,
+    ):
+        self.schema = schema
+        self.llm_router = llm_router
+        self.rules = list(rules)
+        self.featurize = featurize
+        self.threshold = threshold
+        self.classifier = CentroidClassifier(embeddings, min_examples)
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self.counts = {"rule": 0, "centroid": 0, "llm": 0}
+        self.local_seconds = 0.0
+        self.llm_seconds = 0.0
+        if log_path and os.path.exists(log_path):
+            self.classifier.fit(load_decisions(log_path))
+
+    def decide_locally(self, messages: Messages) -> Optional[RouteDecision]:
+        start = time.perf_counter()
+        for candidate in self.rules:
+            if candidate.matches(messages):
+                return RouteDecision(candidate.route, f"Routed to {candidate.route} by rule: {candidate.name}.",
+                                     "rule", candidate.confidence, time.perf_counter() - start)
+        prediction = self.classifier.predict(self.featurize(messages))
+        if prediction is not None and prediction[1] >= self.threshold:
+            label, margin = prediction
+            return RouteDecision(label, f"Routed to {label} like similar past decisions (margin {margin:.2f}).",
+                                 "centroid", margin, time.perf_counter() - start)
+        return None
+
+    def decide(self, messages: Messages, config=None) -> RouteDecision:
+        decision = self.decide_locally(messages)
+        if decision is not None:
+            with self._lock:
+                self.counts[decision.source] += 1
+                self.local_seconds += decision.seconds
+            return decision
+        start = time.perf_counter()
+        response = self.llm_router.invoke(messages, config=config)
+        decision = RouteDecision(response.next, response.reason, "llm", 1.0, time.perf_counter() - start)
+        self.record(self.featurize(messages), decision.next)
+        with self._lock:
+            self.counts["llm"] += 1
+            self.llm_seconds += decision.seconds
+        return decision
+
+    def record(self, text: str, label: str) -> None:
+        """Learn one decision (and append it to the log)."""
+        with self._lock:
+            self.classifier.learn(text, label)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"text": text, "next": label}) + "\n")
+
+    def invoke(self, messages: Messages, config=None):
+        decision = self.decide(messages, config)
+        return self.schema(next=decision.next, reason=decision.reason)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.counts.values())
+            return {
+                **self.counts,
+                "local_ratio": (total - self.counts["llm"]) / total if total else 0.0,
+                "mean_local_us": self.local_seconds / max(total - self.counts["llm"], 1) * 1e6,
+                "mean_llm_ms": self.llm_seconds / max(self.counts["llm"], 1) * 1000,
+                "examples": self.classifier.examples,
+            }
+
+
+def load_decisions(path: str) -> List[Tuple[str, str]]:
+    """``(text, next)`` pairs from a decision log; a torn last line is skipped."""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            examples.append((record["text"], record["next"]))
+    return examples
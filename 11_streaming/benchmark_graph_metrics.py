@@ -0,0 +1,111 @@
+"""Overhead of shared/graph_metrics.py on the notebook's model + ToolNode graph.
+
+Runs the same graph (fake chat model and fake search from benchmarks/fakes.py,
+no API keys) with and without the metrics handler and reports the extra time
+per invoke, then prints what the exporters produce. With ``--stream-tokens``
+the instrumented run also switches the model to its streaming path, so that
+comparison includes the cost of streaming itself.
+
+    python benchmark_graph_metrics.py --runs 300
+    python benchmark_graph_metrics.py --latency 0.2 --tokens-per-second 50 --runs 10 --stream-tokens
+"""
+import argparse
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+sys.path.extend(str(Path(__file__).resolve().parent.parent / folder) for folder in ("benchmarks", "shared"))
+
+from langgraph.graph import END, StateGraph, add_messages  # noqa: E402
+from langgraph.prebuilt import ToolNode  # noqa: E402
+
+from fakes import FakeSearchTool, ScriptedChatModel  # noqa: E402
+from graph_metrics import GraphMetrics, instrument  # noqa: E402
+
+
+class AgentState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_app(latency: float, tokens_per_second: float, tool_latency: float):
+    search_tool = FakeSearchTool(max_results=2, default_latency=tool_latency)
+    llm_with_tools = ScriptedChatModel(latency=latency, tokens_per_second=tokens_per_second).bind_tools([search_tool])
+
+    def model(state: AgentState):
+        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+
+    def tools_router(state: AgentState):
+        last_message = state["messages"][-1]
+        if hasattr(last_message, "tool_calls") and len(last_message.tool_calls) > 0:
+            return "tool_node"
+        return END
+
+    graph = StateGraph(AgentState)
+    graph.add_node("model", model)
+    graph.add_node("tool_node", ToolNode(tools=[search_tool]))
+    graph.set_entry_point("model")
+    graph.add_conditional_edges("model", tools_router)
+    graph.add_edge("tool_node", "model")
+    return graph.compile()
+
+
+def time_runs(app, runs: int):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        app.invoke({"messages": ["What's the current weather in Bangalore?"]},
+                   config={"configurable": {"thread_id": f"user-{i % 8}"}})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake LLM latency per call (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--tool-latency", type=float, default=0.0)
+    parser.add_argument("--stream-tokens", action="store_true", help="stream under invoke to record TTFT")
+    args = parser.parse_args()
+
+    app = build_app(args.latency, args.tokens_per_second, args.tool_latency)
+    metrics = GraphMetrics()
+    instrumented = instrument(app, metrics, graph="weather_agent", stream_tokens=args.stream_tokens)
+
+    time_runs(app, 5)
+    time_runs(instrumented, 5)
+    metrics.reset()
+    # interleave the two variants so drift in machine load hits both equally
+    plain, measured = [], []
+    for _ in range(5):
+        plain += time_runs(app, args.runs // 5)
+        measured += time_runs(instrumented, args.runs // 5)
+
+    base, with_metrics = statistics.median(plain) * 1000, statistics.median(measured) * 1000
+    print(f"{len(plain)} invokes each (2 model calls + 1 tool call per invoke)")
+    print(f"without metrics  median {base:.3f} ms")
+    print(f"with metrics     median {with_metrics:.3f} ms   "
+          f"overhead {with_metrics - base:+.3f} ms ({(with_metrics - base) / base:+.1%})")
+
+    start = time.perf_counter()
+    text = metrics.to_prometheus()
+    print(f"prometheus export: {len(text.splitlines())} lines in {(time.perf_counter() - start) * 1000:.2f} ms\n")
+    print("\n".join(line for line in text.splitlines()
+                    if line.startswith("#") or "_count" in line or "_sum" in line or "errors" in line))
+
+    snapshot = metrics.snapshot()["metrics"]
+    print("\nsnapshot (thread user-0):")
+    for name, entries in snapshot.items():
+        for entry in entries:
+            if entry["labels"].get("thread") == "user-0" and "count" in entry:
+                labels = ",".join(f"{k}={v}" for k, v in entry["labels"].items() if k not in ("graph", "thread"))
+                print(f"  {name}{{{labels}}} count={entry['count']} mean={entry['mean']:.4g} "
+                      f"p50={entry['p50']:.4g} p99={entry['p99']:.4g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,32 @@ from typing import List, Sequence
 from dotenv import load_dotenv
 from langchain_core.messages import BaseMessage, HumanMessage
 from langgraph.graph import END, MessageGraph
-from chains import generation_chain, reflection_chain
+from chains import generation_chain, reflection_chain, llm
+from context_window import RollingSummary, build_summarizer, make_stop_rule, window_messages
 import json
 
 load_dotenv()
 
 REFLECT = "reflect"
 GENERATE = "generate"
+
+# 上下文模式："full" 把全部历史消息发给 LLM；"window" 只发 原始请求 + 最近 WINDOW_PAIRS 组 草稿/批评
+CONTEXT_MODE = "window"
+WINDOW_PAIRS = 1
+SUMMARIZE_OLDER = False  # 为 True 时，窗口之外的旧 草稿/批评 会被增量压缩成一段摘要
+MAX_DRAFTS = 2           # 最多生成几版草稿（2 与原来的 len(state) > 2 等价）
+
+summary = RollingSummary(build_summarizer(llm)) if SUMMARIZE_OLDER else None
+stop_rule = make_stop_rule(max_drafts=MAX_DRAFTS)
+
+
+def build_context(state):
+    """按 CONTEXT_MODE 截取发送给 LLM 的消息"""
+    if CONTEXT_MODE == "full":
+        return state
+    return window_messages(state, keep_pairs=WINDOW_PAIRS, summary=summary)
+
+
 graph = MessageGraph()
 
 def generate_node(state): # state 是当前状态，包含所有历史消息
@@ -23,7 +42,7 @@ def generate_node(state): # state 是当前状态，包含所有历史消息
         生成链的输出结果
     """
     return generation_chain.invoke({
-        "messages": state
+        "messages": build_context(state)
     })
 
 
@@ -38,8 +57,9 @@ def reflect_node(state):
     Returns:
         反思结果，包装成HumanMessage格式
     """
-    print("当前反思输入：", state)
-    response = reflection_chain.invoke({"messages": state})
+    context = build_context(state)
+    print("当前反思输入：", context)
+    response = reflection_chain.invoke({"messages": context})
     return [HumanMessage(content=response.content)] # 返回反思结果，包装成HumanMessage格式，让AI以为这是用户输入的
 
 
@@ -60,11 +80,11 @@ def should_continue(state):
         state: 当前状态
         
     Returns:
-        END: 如果消息数量超过4条，结束执行
+        END: 如果满足停止规则（默认已生成 MAX_DRAFTS 版草稿），结束执行
         REFLECT: 否则继续到反思节点
     """
     print("len(state):", len(state))
-    if (len(state) > 2):
+    if stop_rule(state):
         return END  # 结束执行
     return REFLECT  # 继续到反思节点
 
@@ -124,7 +144,7 @@ with open("output.json", "w", encoding="utf-8") as f:
    GENERATE → REFLECT → GENERATE → REFLECT → ... → END
    
 3. 终止条件：
-   - 当消息数量超过6条时自动终止
+   - 由 make_stop_rule 构建：草稿数量达到 MAX_DRAFTS，或批评中出现 stop_phrase，或自定义判断
    - 这防止了无限循环
 
 4. 消息传递：
@@ -151,6 +171,7 @@ with open("output.json", "w", encoding="utf-8") as f:
 9. 性能考虑：
    - 每次循环都会调用LLM，注意API成本
    - 可以根据需要调整终止条件
+   - CONTEXT_MODE = "window" 时提示长度不随迭代次数增长（见 benchmark_context_window.py）
 
 10. 扩展性：
     - 可以轻松添加更多节点
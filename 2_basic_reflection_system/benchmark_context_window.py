@@ -0,0 +1,119 @@
+# 反思循环上下文窗口基准测试：full（全部历史） vs window（最近 K 组） vs window + 摘要
+# 使用本地假 LLM，不需要任何API密钥；假 LLM 的延迟随提示长度线性增长
+#
+# 运行：python benchmark_context_window.py --drafts 6 --window-pairs 1
+# 预期：full 模式每一轮的提示长度都在增长，window 模式从第 2 轮起基本保持不变
+import argparse
+import os
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.graph import END, MessageGraph
+
+# chains.py 在导入时会创建 ChatOpenAI，这里只借用它的提示模板，不会发出任何请求
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+from chains import generation_prompt, reflection_prompt  # noqa: E402
+from context_window import RollingSummary, build_summarizer, make_stop_rule, window_messages  # noqa: E402
+
+DRAFT = ("🚀 AI agents are rewriting the rules of content creation: research, drafts, edits and scheduling "
+         "in minutes instead of days. The winners will pair them with a human voice. #AI #ContentCreation ")
+CRITIQUE = ("Solid hook, but the tweet reads like a press release. Recommendations: 1) open with a concrete "
+            "number or a surprising claim; 2) cut the hashtags to one; 3) add a question to drive replies; "
+            "4) keep it under 200 characters; 5) name one real tool so it feels credible; 6) end with a clear "
+            "call to action. Style: more personal, less corporate. Virality: controversial take, thread teaser. ")
+SUMMARY = "- drafts: AI agents speed up content creation\n- critic keeps asking for a concrete number, fewer hashtags, a question\n"
+
+
+class PromptSizeFakeLLM(BaseChatModel):
+    """按提示类型返回固定的草稿/批评/摘要，记录每次调用的提示长度，延迟 = 基础延迟 + 每 token 延迟"""
+
+    base_latency: float = 0.02
+    latency_per_token: float = 0.00005
+    prompt_tokens: List[int] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "prompt-size-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        system = str(messages[0].content)
+        tokens = sum(len(str(message.content)) for message in messages) // 4  # 粗略估算：约 4 个字符一个 token
+        self.prompt_tokens.append(tokens)
+        time.sleep(self.base_latency + self.latency_per_token * tokens)
+        if "running summary" in system:
+            content = SUMMARY
+        elif "grading a tweet" in system:
+            content = CRITIQUE * 2
+        else:
+            content = DRAFT * 2
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+def build_app(llm, build_context, stop_rule):
+    """与 basic.py 相同的 生成 → 反思 循环，只是链换成了假 LLM"""
+    generation_chain = generation_prompt | llm
+    reflection_chain = reflection_prompt | llm
+
+    def generate_node(state):
+        return generation_chain.invoke({"messages": build_context(state)})
+
+    def reflect_node(state):
+        response = reflection_chain.invoke({"messages": build_context(state)})
+        return [HumanMessage(content=response.content)]
+
+    graph = MessageGraph()
+    graph.add_node("generate", generate_node)
+    graph.add_node("reflect", reflect_node)
+    graph.set_entry_point("generate")
+    graph.add_conditional_edges("generate", lambda state: END if stop_rule(state) else "reflect",
+                                {"reflect": "reflect", END: END})
+    graph.add_edge("reflect", "generate")
+    return graph.compile()
+
+
+def run(label, drafts, build_context, llm, summary_llm=None):
+    llm.prompt_tokens = []
+    if summary_llm is not None:
+        summary_llm.prompt_tokens = []
+    app = build_app(llm, build_context, make_stop_rule(max_drafts=drafts))
+    start = time.perf_counter()
+    app.invoke(HumanMessage(content="AI Agents taking over content creation"))
+    elapsed = time.perf_counter() - start
+    summary_tokens = sum(summary_llm.prompt_tokens) if summary_llm is not None else 0
+    print(f"{label:<22} total {sum(llm.prompt_tokens) + summary_tokens:>7} prompt tokens   {elapsed:.2f}s")
+    return llm.prompt_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drafts", type=int, default=6, help="生成几版草稿（停止规则 max_drafts）")
+    parser.add_argument("--window-pairs", type=int, default=1)
+    args = parser.parse_args()
+
+    llm = PromptSizeFakeLLM()
+    summary_llm = PromptSizeFakeLLM()
+    results = {
+        "full": run("full", args.drafts, lambda state: state, llm),
+        "window": run(f"window (K={args.window_pairs})", args.drafts,
+                      lambda state: window_messages(state, keep_pairs=args.window_pairs), llm),
+    }
+    summary = RollingSummary(build_summarizer(summary_llm))
+    results["window+summary"] = run(
+        f"window+summary (K={args.window_pairs})", args.drafts,
+        lambda state: window_messages(state, keep_pairs=args.window_pairs, summary=summary), llm, summary_llm,
+    )
+    print(f"  摘要调用 {summary.calls} 次，共 {sum(summary_llm.prompt_tokens)} 个提示 token（已计入 total）")
+
+    # 调用顺序：generate 1, reflect 1, generate 2, reflect 2, ..., generate N
+    print(f"\n{'call':<12}" + "".join(f"{mode:>16}" for mode in results))
+    for i in range(len(results["full"])):
+        name = f"generate {i // 2 + 1}" if i % 2 == 0 else f"reflect {i // 2 + 1}"
+        print(f"{name:<12}" + "".join(f"{tokens[i]:>16}" for tokens in results.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import os
+import sys
+
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 
+# LLM 录制/回放缓存放在各章共用的 shared/ 目录里
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from llm_cache import install_llm_cache
+
 # 定义生成提示模板
 # 这个模板用于指导AI生成Twitter帖子
 generation_prompt = ChatPromptTemplate.from_messages(
@@ -39,6 +45,10 @@ reflection_prompt = ChatPromptTemplate.from_messages(
 # 使用OpenAI的GPT-4o模型作为推理引擎
 llm = ChatOpenAI(model="gpt-4o")
 
+# 安装全局LLM缓存：LLM_CACHE_MODE=record 录制响应，replay 离线回放（未录制过的调用直接报错），
+# 默认 passthrough 不缓存
+llm_cache = install_llm_cache()
+
 # 创建生成链
 # 将生成提示模板与LLM组合，形成可执行的生成链
 # 这个链负责根据用户输入和对话历史生成Twitter帖子
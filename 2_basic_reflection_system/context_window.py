@@ -0,0 +1,131 @@
+# 反思循环的上下文窗口：生成/反思节点不再把整个 MessageGraph 状态发给 LLM，
+# 只保留最初的用户请求 + 最近 K 组 草稿/批评，可选地把更早的部分压缩成一段滚动摘要。
+# 同时提供可配置的停止规则，替代固定的 len(state) > 2。
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+CONTEXT_MODES = ("full", "window")
+
+SUMMARY_PREFIX = "Summary of earlier drafts and critiques:\n"
+
+summary_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You maintain a running summary of an iterative tweet-writing session."
+            " Update the summary with the new drafts and critiques below."
+            " Keep it to a few bullet points: what was tried, what the critic asked for, what is still open.",
+        ),
+        ("human", "Current summary:\n{summary}\n\nNew drafts and critiques:\n{messages}"),
+    ]
+)
+
+
+def _transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        role = "Draft" if isinstance(message, AIMessage) else "Critique"
+        lines.append(f"{role}: {message.content}")
+    return "\n\n".join(lines)
+
+
+def build_summarizer(llm) -> Callable[[str, Sequence[BaseMessage]], str]:
+    """
+    用 LLM 构建摘要函数：(已有摘要, 新移出窗口的消息) -> 更新后的摘要
+    """
+    chain = summary_prompt | llm
+
+    def summarize(summary: str, messages: Sequence[BaseMessage]) -> str:
+        response = chain.invoke({"summary": summary or "(empty)", "messages": _transcript(messages)})
+        return response.content.strip()
+
+    return summarize
+
+
+class RollingSummary:
+    """
+    增量滚动摘要
+
+    只对新移出窗口的消息调用一次摘要函数（连同上一版摘要），
+    而不是每轮都重新总结全部旧消息。以原始请求消息的 id 区分不同的图执行，
+    换了请求就重新开始。
+    """
+
+    def __init__(self, summarize: Callable[[str, Sequence[BaseMessage]], str]):
+        self.summarize = summarize
+        self.text = ""
+        self.covered = 0       # 已经并入摘要的旧消息条数
+        self.request_key = None
+        self.calls = 0
+
+    def update(self, request: BaseMessage, older: Sequence[BaseMessage]) -> str:
+        request_key = request.id or request.content
+        if request_key != self.request_key:
+            self.request_key, self.text, self.covered = request_key, "", 0
+        if len(older) > self.covered:
+            self.text = self.summarize(self.text, older[self.covered:])
+            self.covered = len(older)
+            self.calls += 1
+        return self.text
+
+
+def window_messages(
+    messages: Sequence[BaseMessage],
+    keep_pairs: int = 1,
+    summary: Optional[RollingSummary] = None,
+) -> List[BaseMessage]:
+    """
+    截取发送给 LLM 的上下文
+
+    Args:
+        messages: MessageGraph 的完整状态：[用户请求, 草稿1, 批评1, 草稿2, ...]
+        keep_pairs: 保留最近多少组 草稿/批评
+        summary: 可选的滚动摘要，窗口之外的旧消息会被压缩进去
+
+    Returns:
+        [用户请求, (旧消息摘要), 最近的草稿/批评...]，窗口总是从一条草稿开始，
+        所以反思节点看到的是最新草稿，生成节点看到的是最新的 草稿+批评
+    """
+    if not messages:
+        return []
+    request, history = messages[0], list(messages[1:])
+    recent = history[-2 * keep_pairs:] if keep_pairs > 0 else []
+    if recent and not isinstance(recent[0], AIMessage):
+        recent = recent[1:]
+    older = history[:len(history) - len(recent)]
+
+    context = [request]
+    if older and summary is not None:
+        text = summary.update(request, older)
+        if text:
+            context.append(HumanMessage(content=SUMMARY_PREFIX + text))
+    return context + recent
+
+
+def make_stop_rule(
+    max_drafts: int = 2,
+    stop_phrase: Optional[str] = None,
+    stop_when: Optional[Callable[[Sequence[BaseMessage]], bool]] = None,
+) -> Callable[[Sequence[BaseMessage]], bool]:
+    """
+    构建停止规则，在生成节点之后判断是否结束
+
+    Args:
+        max_drafts: 最多生成多少版草稿（默认 2，与原来的 len(state) > 2 等价）
+        stop_phrase: 最近一次批评中出现该短语（不区分大小写）就提前结束，例如 "LGTM"
+        stop_when: 自定义判断函数，接收完整消息列表，返回 True 表示结束
+    """
+
+    def should_stop(messages: Sequence[BaseMessage]) -> bool:
+        drafts = sum(isinstance(message, AIMessage) for message in messages)
+        if drafts >= max_drafts:
+            return True
+        if stop_phrase and len(messages) >= 3:
+            last_critique = messages[-2]
+            if stop_phrase.lower() in str(last_critique.content).lower():
+                return True
+        return bool(stop_when and stop_when(messages))
+
+    return should_stop
@@ -0,0 +1,127 @@
+# execute_tools 基准测试：串行 vs 线程池 vs asyncio
+# 使用 fake_search.py 中注入延迟的假搜索工具，不需要任何API密钥
+#
+# 运行：python benchmark_execute_tools.py
+# 预期：串行模式每轮耗时 ≈ 所有查询延迟之和，并发模式每轮耗时 ≈ 最慢的那条查询
+# 最后一部分演示 SearchCache：第二次运行和近似重复查询都不会再发出真正的搜索
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+from fake_search import FakeSearchTool
+from parallel_search import asearch_tool_calls, collect_search_queries, search_tool_calls
+from search_cache import SearchCache
+
+# 模拟一次完整的反思循环：draft 产生 AnswerQuestion，之后每轮 revisor 产生 ReviseAnswer
+# 最后一轮模拟模型一次返回两个工具调用的情况
+ITERATIONS = [
+    [("AnswerQuestion", ["AI tools for small business",
+                         "AI in small business marketing",
+                         "AI automation for small business"])],
+    [("ReviseAnswer", ["small business AI adoption statistics 2024",
+                       "AI customer service chatbots for SMEs",
+                       "cost of AI tools for small business"])],
+    [("ReviseAnswer", ["AI bookkeeping for small business",
+                       "AI inventory forecasting retail"]),
+     ("ReviseAnswer", ["generative AI content marketing case study"])],
+]
+
+LATENCIES = {
+    "AI tools for small business": 0.25,
+    "AI in small business marketing": 0.40,
+    "AI automation for small business": 0.15,
+    "small business AI adoption statistics 2024": 0.30,
+    "AI customer service chatbots for SMEs": 0.20,
+    "cost of AI tools for small business": 0.35,
+    "AI bookkeeping for small business": 0.10,
+    "AI inventory forecasting retail": 0.45,
+    "generative AI content marketing case study": 0.20,
+}
+
+
+def make_message(iteration: int, calls) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": name,
+                "args": {"answer": "", "search_queries": queries,
+                         "reflection": {"missing": "", "superfluous": ""}},
+                "id": f"call_{iteration}_{i}",
+            }
+            for i, (name, queries) in enumerate(calls)
+        ],
+    )
+
+
+def run_mode(mode: str, messages):
+    tool = FakeSearchTool(latencies=LATENCIES)
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        if mode == "async":
+            tool_messages = asyncio.run(asearch_tool_calls(message.tool_calls, tool))
+        else:
+            tool_messages = search_tool_calls(message.tool_calls, tool, mode=mode)
+        timings.append(time.perf_counter() - start)
+        # ToolMessage 的顺序必须与工具调用顺序一致
+        assert [m.tool_call_id for m in tool_messages] == [c["id"] for c in message.tool_calls]
+    return timings
+
+
+# 第二次运行时 revisor 换了种说法问同样的问题，其中有两条在同一批里互为近似重复
+NEAR_DUPLICATES = [
+    [("ReviseAnswer", ["Small business AI tools",
+                       "AI automation for small businesses?",
+                       "ai in small business marketing"]),
+     ("ReviseAnswer", ["AI chatbots for customer service",
+                       "customer-service chatbots (AI)"])],
+]
+
+
+def run_cached(messages):
+    cache = SearchCache(":memory:")
+    tool = FakeSearchTool(latencies=LATENCIES)
+    runs = [("first run", messages), ("second run", messages),
+            ("near duplicates", [make_message(i, calls) for i, calls in enumerate(NEAR_DUPLICATES)])]
+    print()
+    print(f"{'cached':>16} {'queries':>7} {'fetched':>7} {'time':>7}")
+    for label, run_messages in runs:
+        fetched_before = len(tool.calls)
+        n_queries = 0
+        start = time.perf_counter()
+        for message in run_messages:
+            n_queries += sum(len(q) for _, q in collect_search_queries(message.tool_calls))
+            search_tool_calls(message.tool_calls, tool, mode="thread", cache=cache)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>16} {n_queries:>7} {len(tool.calls) - fetched_before:>7} {elapsed:>6.2f}s")
+    print("cache stats:", cache.stats())
+
+
+def main():
+    messages = [make_message(i, calls) for i, calls in enumerate(ITERATIONS)]
+
+    expected = []
+    for message in messages:
+        latencies = [LATENCIES[q] for _, queries in collect_search_queries(message.tool_calls) for q in queries]
+        expected.append((sum(latencies), max(latencies)))
+
+    results = {mode: run_mode(mode, messages) for mode in ("serial", "thread", "async")}
+
+    print(f"{'iter':>4} {'queries':>7} {'sum(lat)':>9} {'max(lat)':>9} "
+          f"{'serial':>8} {'thread':>8} {'async':>8}")
+    for i, message in enumerate(messages):
+        n_queries = sum(len(q) for _, q in collect_search_queries(message.tool_calls))
+        total, slowest = expected[i]
+        print(f"{i:>4} {n_queries:>7} {total:>8.2f}s {slowest:>8.2f}s "
+              f"{results['serial'][i]:>7.2f}s {results['thread'][i]:>7.2f}s {results['async'][i]:>7.2f}s")
+
+    for mode, timings in results.items():
+        print(f"{mode:>6}: total {sum(timings):.2f}s over {len(timings)} iterations")
+
+    run_cached(messages)
+
+
+if __name__ == "__main__":
+    main()
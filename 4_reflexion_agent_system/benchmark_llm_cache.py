@@ -0,0 +1,85 @@
+# LLM 录制/回放缓存基准测试：录制一次，之后离线回放
+# 使用 benchmarks/scenarios.py 中镜像的各个教程图和注入延迟的假 LLM，不需要任何API密钥
+#
+# 运行：python benchmark_llm_cache.py --latency 0.3
+#       python benchmark_llm_cache.py reflexion rag_advanced --repeat 10
+# 每个场景：record 模式跑一遍（全部未命中，付出模型延迟并录制），再用 replay 模式重建图并重跑
+# （LLMCacheMiss 说明这次运行和录制时不一样），最后用零延迟假 LLM 且不加缓存跑一遍作为对照。
+# 预期：replay 不调用模型，耗时是毫秒级，与零延迟对照接近，两者之差就是缓存查找本身的开销；
+# replay 的耗时可以直接当作框架开销的精确基线。
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+for _folder in ("benchmarks", "shared"):
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", _folder))
+
+from langchain_core.globals import set_llm_cache  # noqa: E402
+
+from llm_cache import LLMCacheMiss, RecordReplayCache  # noqa: E402
+from scenarios import SCENARIOS, Fakes  # noqa: E402
+
+
+def run_once(scenario, fakes: Fakes, thread_id: str) -> float:
+    checkpointer = scenario.own_checkpointer() if scenario.own_checkpointer else None
+    run = scenario.build(fakes, checkpointer)
+    start = time.perf_counter()
+    run(thread_id)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scenarios", nargs="*", help="默认：所有会调用 LLM 的场景")
+    parser.add_argument("--latency", type=float, default=0.3, help="录制时假 LLM 每次调用的延迟（秒）")
+    parser.add_argument("--repeat", type=int, default=5, help="replay 和零延迟对照各跑几次取中位数")
+    args = parser.parse_args()
+
+    names = args.scenarios or [name for name in SCENARIOS if name != "state_counter"]
+    path = os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite")
+    cache = RecordReplayCache(path)
+    print(f"{'scenario':<20} {'llm calls':>9} {'record s':>9} {'replay ms':>10} {'no-cache 0s ms':>15} "
+          f"{'replayed':>9}")
+    for name in names:
+        scenario = SCENARIOS[name]
+        thread_id = f"llm-cache-{name}"
+
+        set_llm_cache(cache)
+        cache.mode = "record"
+        hits_before = cache.hits
+        fakes = Fakes(latency=args.latency)
+        record = run_once(scenario, fakes, thread_id)
+        llm_calls = fakes.llm_calls
+
+        cache.mode = "replay"
+        hits_before = cache.hits
+        replays = []
+        try:
+            for _ in range(args.repeat):
+                fakes = Fakes(latency=args.latency)
+                replays.append(run_once(scenario, fakes, thread_id))
+                assert fakes.llm_calls == 0
+        except LLMCacheMiss as e:
+            print(f"{name:<20} {llm_calls:>9} {record:>9.2f}  replay failed: {e}")
+            continue
+        replayed = (cache.hits - hits_before) // args.repeat
+
+        set_llm_cache(None)
+        baseline = [run_once(scenario, Fakes(latency=0.0), thread_id) for _ in range(args.repeat)]
+        print(f"{name:<20} {llm_calls:>9} {record:>9.2f} {statistics.median(replays) * 1000:>10.1f} "
+              f"{statistics.median(baseline) * 1000:>15.1f} {replayed:>9}")
+
+    set_llm_cache(None)
+    stats = cache.stats()
+    print(f"\ncache file: {stats['entries']} responses, {stats['bytes'] / 1024:.0f} KB, "
+          f"{stats['hits']} hits, {stats['misses']} misses")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
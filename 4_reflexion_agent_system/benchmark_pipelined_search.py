@@ -0,0 +1,175 @@
+# 流水线搜索基准测试：先生成完整个工具调用再搜索 vs 流式生成时就提前发出搜索
+# 使用逐 token 流式输出工具调用参数的假 LLM 和 fake_search.py 中注入延迟的假搜索工具，不需要任何API密钥
+#
+# 运行：python benchmark_pipelined_search.py --tokens-per-second 60 --search-latency 1.5
+# 两种模式都用 chains.py 里真实的提示模板和 schema.py 的 AnswerQuestion/ReviseAnswer，
+# 按 reflexion_graph.py 的结构运行完整的 draft -> (execute_tools -> revisor) x 3 循环，
+# 每轮 = 生成工具调用 + 执行搜索。
+# 预期：字段按 schema 顺序生成（answer, search_queries, reflection[, references]），
+# 查询生成完之后还要生成 reflection/references，这段时间里搜索已经在进行，
+# 每轮节省 ≈ min(搜索延迟, 查询之后剩余部分的生成时间)。
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.graph import END, MessageGraph
+
+# chains.py 在导入时会创建 ChatOpenAI，这里只借用它的提示模板，不会发出任何请求
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+from chains import actor_prompt_template, first_responder_prompt_template, revise_instructions  # noqa: E402
+from fake_search import FakeSearchTool  # noqa: E402
+from parallel_search import search_tool_calls  # noqa: E402
+from pipelined_search import SearchPrefetcher, prefetching_node  # noqa: E402
+from schema import AnswerQuestion, ReviseAnswer  # noqa: E402
+
+QUESTION = "Write about how small business can leverage AI to grow"
+WORDS = ("small businesses can use AI assistants to automate bookkeeping, draft marketing copy, forecast "
+         "inventory and answer customer questions around the clock, freeing owners to focus on growth ").split()
+
+
+def _text(words: int, offset: int = 0) -> str:
+    return " ".join(WORDS[(offset + i) % len(WORDS)] for i in range(words))
+
+
+class StreamingToolCallLLM(BaseChatModel):
+    """
+    假 LLM：按绑定的工具生成 AnswerQuestion/ReviseAnswer 参数，并以约 4 个字符一个 token 的粒度流式输出
+
+    首 token 延迟 first_token_latency，之后每秒 tokens_per_second 个 token；字段顺序与 schema 一致。
+    """
+
+    first_token_latency: float = 0.5
+    tokens_per_second: float = 60.0
+    answer_words: int = 250
+
+    @property
+    def _llm_type(self) -> str:
+        return "streaming-tool-call-fake"
+
+    def bind_tools(self, tools, *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], tool_choice=tool_choice, **kwargs)
+
+    def _tool_call(self, messages: List[BaseMessage], tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+        name = tools[0]["function"]["name"]
+        iteration = sum(isinstance(message, ToolMessage) for message in messages)
+        args = {
+            "answer": _text(self.answer_words, iteration),
+            "search_queries": [f"AI for small business {topic} (round {iteration})"
+                               for topic in ("marketing", "bookkeeping", "customer service")],
+            "reflection": {"missing": _text(40, 3), "superfluous": _text(30, 7)},
+        }
+        if name == "ReviseAnswer":
+            args["references"] = [f"https://example.com/source/{iteration}/{i}" for i in range(3)]
+        return {"name": name, "args": args, "id": f"call_{name}_{iteration}"}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                  tools=None, tool_choice=None, **kwargs: Any) -> ChatResult:
+        message = None
+        for chunk in self._stream(messages, stop, run_manager, tools=tools, tool_choice=tool_choice):
+            message = chunk.message if message is None else message + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="",
+                                                                        tool_calls=message.tool_calls))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                tools=None, tool_choice=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        call = self._tool_call(messages, tools)
+        arguments = json.dumps(call["args"])
+        time.sleep(self.first_token_latency)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+            {"name": call["name"], "args": "", "id": call["id"], "index": 0}]))
+        for start in range(0, len(arguments), 4):
+            time.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": None, "args": arguments[start:start + 4], "id": None, "index": 0}]))
+
+
+def build_app(llm: StreamingToolCallLLM, search_tool: FakeSearchTool, pipelined: bool):
+    first_responder_chain = first_responder_prompt_template | llm.bind_tools(
+        tools=[AnswerQuestion], tool_choice="AnswerQuestion")
+    revisor_chain = actor_prompt_template.partial(first_instruction=revise_instructions) | llm.bind_tools(
+        tools=[ReviseAnswer], tool_choice="ReviseAnswer")
+
+    def event_loop(state: List[BaseMessage]) -> str:
+        return END if sum(isinstance(item, ToolMessage) for item in state) > 2 else "execute_tools"
+
+    if pipelined:
+        prefetcher = SearchPrefetcher(search_tool, max_workers=8, timeout=10.0)
+        draft = prefetching_node(first_responder_chain, prefetcher)
+        revisor = prefetching_node(revisor_chain, prefetcher,
+                                   prefetch_if=lambda state: event_loop(state) == "execute_tools")
+
+        def execute_tools(state: List[BaseMessage]) -> List[BaseMessage]:
+            return prefetcher.tool_messages(state[-1].tool_calls)
+    else:
+        prefetcher = None
+        # 原来的做法：等工具调用生成完，再用线程池并发执行全部查询（execute_tools 的 "thread" 模式）
+        draft, revisor = first_responder_chain, revisor_chain
+
+        def execute_tools(state: List[BaseMessage]) -> List[BaseMessage]:
+            return search_tool_calls(state[-1].tool_calls, search_tool, mode="thread", max_workers=8, timeout=10.0)
+
+    graph = MessageGraph()
+    graph.add_node("draft", draft)
+    graph.add_node("execute_tools", execute_tools)
+    graph.add_node("revisor", revisor)
+    graph.add_edge("draft", "execute_tools")
+    graph.add_edge("execute_tools", "revisor")
+    graph.add_conditional_edges("revisor", event_loop, {"execute_tools": "execute_tools", END: END})
+    graph.set_entry_point("draft")
+    return graph.compile(), prefetcher
+
+
+def run(args, pipelined: bool):
+    """返回 (每轮耗时列表, 最后一次 revisor 的耗时, 总耗时, 搜索次数, prefetcher 统计)"""
+    llm = StreamingToolCallLLM(first_token_latency=args.first_token_latency,
+                               tokens_per_second=args.tokens_per_second, answer_words=args.answer_words)
+    search_tool = FakeSearchTool(default_latency=args.search_latency)
+    app, prefetcher = build_app(llm, search_tool, pipelined)
+    iterations = []
+    start = last = time.perf_counter()
+    final = None
+    for update in app.stream(HumanMessage(content=QUESTION), stream_mode="updates"):
+        now = time.perf_counter()
+        (node,) = update
+        if node == "execute_tools":
+            iterations.append(now - last)
+            last = now
+        elif node == "revisor":
+            final = now - last
+    total = time.perf_counter() - start
+    stats = prefetcher.stats() if prefetcher else None
+    if prefetcher:
+        prefetcher.close()
+    return iterations, final, total, len(search_tool.calls), stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="假 LLM 的输出速度")
+    parser.add_argument("--first-token-latency", type=float, default=0.5, help="假 LLM 的首 token 延迟（秒）")
+    parser.add_argument("--answer-words", type=int, default=250, help="answer 字段的词数")
+    parser.add_argument("--search-latency", type=float, default=1.5, help="每次搜索的延迟（秒）")
+    args = parser.parse_args()
+
+    print(f"假 LLM：首 token {args.first_token_latency}s，{args.tokens_per_second:g} token/s，"
+          f"answer {args.answer_words} 词；每次搜索 {args.search_latency}s")
+    baseline = run(args, pipelined=False)
+    pipelined = run(args, pipelined=True)
+
+    print(f"\n{'轮次':<12} {'生成后再搜索 s':>14} {'流水线 s':>10} {'节省 s':>8}")
+    labels = ["draft"] + [f"revisor {i}" for i in range(1, len(baseline[0]))]
+    for label, before, after in zip(labels, baseline[0], pipelined[0]):
+        print(f"{label:<12} {before:>14.2f} {after:>10.2f} {before - after:>8.2f}")
+    print(f"{'最后一次修订':<12} {baseline[1]:>14.2f} {pipelined[1]:>10.2f}")
+    print(f"{'总计':<12} {baseline[2]:>14.2f} {pipelined[2]:>10.2f} {baseline[2] - pipelined[2]:>8.2f}")
+    print(f"\n搜索次数：{baseline[3]} vs {pipelined[3]}；prefetch 统计：{pipelined[4]}")
+
+
+if __name__ == "__main__":
+    main()
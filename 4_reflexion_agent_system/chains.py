@@ -5,6 +5,10 @@ from langchain_openai import ChatOpenAI  # 导入OpenAI聊天模型接口
 from schema import AnswerQuestion, ReviseAnswer  # 导入自定义的Pydantic模型（结构化输出用）
 from langchain_core.output_parsers.openai_tools import PydanticToolsParser, JsonOutputToolsParser  # 导入结构化输出解析器
 from langchain_core.messages import HumanMessage  # 导入人类消息类型
+import os  # 导入os，用于拼出共享模块目录的路径
+import sys  # 导入sys，把共享模块目录加入搜索路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))  # 各章共用的模块放在 shared/ 里
+from llm_cache import install_llm_cache  # 导入LLM响应的录制/回放缓存
 
 # 注意：schema.py 需提前定义好 AnswerQuestion 和 ReviseAnswer 两个 Pydantic 模型，否则会报错。
 # 导入的解析器要和后续 LLM 输出格式配套使用。
@@ -54,6 +58,9 @@ first_responder_prompt_template = actor_prompt_template.partial(
 llm = ChatOpenAI(model="gpt-4o")  # 初始化OpenAI聊天模型，指定gpt-4o
 # 模型名称要和实际API支持的模型一致。
 
+llm_cache = install_llm_cache()  # 全局LLM缓存：LLM_CACHE_MODE=record 录制，replay 离线回放，默认 passthrough 不缓存
+# 提示词里的 {time} 时间戳在计算缓存键时会被忽略，否则每次运行都无法命中。
+
 first_responder_chain = first_responder_prompt_template | llm.bind_tools(tools=[AnswerQuestion], tool_choice='AnswerQuestion')
 # | 是LangChain的链式操作符，先用prompt模板生成提示，再用llm生成结构化输出。
 # bind_tools 绑定结构化输出工具（AnswerQuestion），并强制选择该工具。
@@ -81,11 +88,12 @@ revisor_chain = actor_prompt_template.partial(
 # 用修订指令填充prompt模板，绑定修订用的结构化工具（ReviseAnswer）。
 # 工具名、字段、指令要和Pydantic模型严格对应。
 
-# 示例调用（注释掉的部分）
-response = first_responder_chain.invoke({
-    "messages": [HumanMessage("AI Agents taking over content creation")]
-})
-print(response)
+# 示例调用：只在直接运行本文件时执行，被 reflexion_graph 导入时不会在启动阶段发起一次LLM请求
+if __name__ == "__main__":
+    response = first_responder_chain.invoke({
+        "messages": [HumanMessage("AI Agents taking over content creation")]
+    })
+    print(response)
 # 演示如何调用首次回答链，传入用户消息，得到结构化输出。
 # 实际调用时要保证输入参数格式和prompt模板一致。
 
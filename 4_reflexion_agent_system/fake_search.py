@@ -0,0 +1,49 @@
+# 本地假搜索工具：不访问网络，按查询注入固定延迟，返回确定性的结果
+# 用于在没有 TAVILY_API_KEY 的情况下对 execute_tools 做基准测试
+import asyncio
+import hashlib
+import time
+from typing import Dict, List
+
+from langchain_core.tools import BaseTool
+from pydantic import Field
+
+
+class FakeSearchTool(BaseTool):
+    """
+    模拟 TavilySearchResults 的假搜索工具
+
+    每次调用会先 sleep 注入的延迟（latencies 中按查询指定，否则使用 default_latency），
+    然后返回和 Tavily 结构一致的 [{"url": ..., "content": ...}] 列表。
+    calls 按调用顺序记录所有收到的查询，便于统计实际发出的请求数。
+    """
+
+    name: str = "tavily_search_results_json"
+    description: str = "Fake search engine with injected latency, for offline benchmarks."
+    default_latency: float = 0.3
+    latencies: Dict[str, float] = Field(default_factory=dict)
+    max_results: int = 2
+    calls: List[str] = Field(default_factory=list)
+
+    def latency_for(self, query: str) -> float:
+        return self.latencies.get(query, self.default_latency)
+
+    def _results(self, query: str) -> List[Dict[str, str]]:
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+        return [
+            {
+                "url": f"https://example.com/{digest}/{i}",
+                "content": f"Result {i} for '{query}'",
+            }
+            for i in range(self.max_results)
+        ]
+
+    def _run(self, query: str) -> List[Dict[str, str]]:
+        self.calls.append(query)
+        time.sleep(self.latency_for(query))
+        return self._results(query)
+
+    async def _arun(self, query: str) -> List[Dict[str, str]]:
+        self.calls.append(query)
+        await asyncio.sleep(self.latency_for(query))
+        return self._results(query)
@@ -0,0 +1,240 @@
+# 并发搜索执行器
+# execute_tools 原来对每个 AnswerQuestion/ReviseAnswer 工具调用、每条 search_query 依次调用 tavily_tool，
+# 一轮反思要等待所有搜索延迟之和。这里把所有工具调用里的全部查询一次性并发发出，
+# 一轮的耗时就变成了最慢那次搜索的耗时。
+import asyncio
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import ToolMessage
+
+from search_cache import SearchCache
+
+# 包含 search_queries 字段的工具（见 schema.py）
+SEARCH_TOOL_NAMES = ("AnswerQuestion", "ReviseAnswer")
+
+# 支持的执行模式：
+# - "serial": 原来的逐条串行调用，用作对照
+# - "thread": 有上限的线程池，适合同步的 app.invoke
+# - "async":  asyncio 并发，适合 app.ainvoke（见 asearch_tool_calls）
+SEARCH_MODES = ("serial", "thread", "async")
+
+
+def collect_search_queries(tool_calls: Sequence[Dict[str, Any]]) -> List[Tuple[str, List[str]]]:
+    """
+    从AI消息的工具调用中提取 (tool_call_id, search_queries)
+
+    只处理 AnswerQuestion / ReviseAnswer，返回顺序与工具调用顺序一致，
+    保证后面生成的 ToolMessage 顺序是确定的。
+    """
+    calls = []
+    for tool_call in tool_calls:
+        if tool_call["name"] in SEARCH_TOOL_NAMES:
+            calls.append((tool_call["id"], list(tool_call["args"].get("search_queries", []))))
+    return calls
+
+
+def build_tool_messages(calls: List[Tuple[str, List[str]]], results: List[Any]) -> List[ToolMessage]:
+    """
+    把扁平的搜索结果按工具调用重新分组，生成 ToolMessage 列表
+
+    results 与所有查询展开后的顺序一一对应（先按工具调用、再按查询）。
+    """
+    tool_messages = []
+    position = 0
+    for call_id, queries in calls:
+        query_results = {}
+        for query in queries:
+            query_results[query] = results[position]
+            position += 1
+        tool_messages.append(
+            ToolMessage(
+                content=json.dumps(query_results),  # 搜索结果序列化为JSON
+                tool_call_id=call_id  # 关联到原始工具调用
+            )
+        )
+    return tool_messages
+
+
+def _error_result(error: BaseException) -> str:
+    # 与 TavilySearchResults 出错时的行为一致：返回错误描述字符串，而不是让整个节点失败
+    return f"{type(error).__name__}: {error}"
+
+
+def _timeout_result(timeout: float) -> str:
+    return f"TimeoutError: search exceeded {timeout}s"
+
+
+def run_queries_serial(search_tool, queries: Sequence[str]) -> List[Any]:
+    """逐条执行查询（原始行为），没有超时控制"""
+    results = []
+    for query in queries:
+        try:
+            results.append(search_tool.invoke(query))
+        except Exception as e:
+            results.append(_error_result(e))
+    return results
+
+
+def run_queries_threaded(search_tool, queries: Sequence[str], max_workers: int = 8,
+                         timeout: float = 10.0) -> List[Any]:
+    """
+    在有上限的线程池里并发执行查询
+
+    Args:
+        search_tool: 任意带 invoke(query) 的搜索工具
+        queries: 查询列表
+        max_workers: 线程池大小上限
+        timeout: 单条查询的超时时间（秒），从该查询真正开始执行时计时
+
+    Returns:
+        与 queries 顺序一致的结果列表；超时或出错的查询返回错误描述字符串
+    """
+    if not queries:
+        return []
+
+    results: List[Any] = [None] * len(queries)
+    started: Dict[int, float] = {}  # 记录每条查询在工作线程中真正开始的时间
+
+    def run(index: int, query: str):
+        started[index] = time.monotonic()
+        return search_tool.invoke(query)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(queries)),
+                                  thread_name_prefix="reflexion-search")
+    try:
+        pending = {executor.submit(run, i, query): i for i, query in enumerate(queries)}
+        while pending:
+            # 等到下一次有查询完成，或最早开始的那条查询到达超时
+            deadlines = [started[i] + timeout for i in pending.values() if i in started]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else timeout
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = _error_result(e)
+
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                if index in started and now - started[index] >= timeout:
+                    # 线程无法被强制中断，这里只是不再等待它的结果
+                    pending.pop(future)
+                    future.cancel()
+                    results[index] = _timeout_result(timeout)
+    finally:
+        # 不等待已超时的查询，让它们在后台自行结束
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+async def arun_queries(search_tool, queries: Sequence[str], max_concurrency: int = 8,
+                       timeout: float = 10.0) -> List[Any]:
+    """
+    asyncio 版本：所有查询同时发出，用信号量限制同时在途的数量
+
+    超时的查询会被取消，结果顺序与 queries 一致。
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(query: str):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(search_tool.ainvoke(query), timeout)
+            except asyncio.TimeoutError:
+                return _timeout_result(timeout)
+            except Exception as e:
+                return _error_result(e)
+
+    return list(await asyncio.gather(*(run(query) for query in queries)))
+
+
+def _plan_queries(queries: Sequence[str], cache: SearchCache):
+    """
+    查缓存并合并近似重复查询
+
+    Returns:
+        keys: 每条查询对应的缓存键（与 queries 顺序一致）
+        resolved: 已经从缓存拿到结果的 {键: 结果}
+        to_fetch: 需要真正发出的查询，每个键只保留第一次出现的原始查询
+    """
+    keys = [cache.key(query) for query in queries]
+    resolved: Dict[str, Any] = {}
+    to_fetch: Dict[str, str] = {}
+    for key, query in zip(keys, queries):
+        if key in resolved or key in to_fetch:
+            cache.deduplicated += 1
+            continue
+        found, result = cache.lookup(query)
+        if found:
+            resolved[key] = result
+        else:
+            to_fetch[key] = query
+    return keys, resolved, to_fetch
+
+
+def _finish_queries(cache: SearchCache, keys: List[str], resolved: Dict[str, Any],
+                    to_fetch: Dict[str, str], fetched: List[Any]) -> List[Any]:
+    for (key, query), result in zip(to_fetch.items(), fetched):
+        cache.store(query, result)
+        resolved[key] = result
+    return [resolved[key] for key in keys]
+
+
+def run_queries_cached(queries: Sequence[str], cache: Optional[SearchCache],
+                       fetch: Callable[[List[str]], List[Any]]) -> List[Any]:
+    """在 fetch 前先查缓存；同一批中近似重复的查询只会被发出一次"""
+    if cache is None:
+        return fetch(list(queries))
+    keys, resolved, to_fetch = _plan_queries(queries, cache)
+    fetched = fetch(list(to_fetch.values())) if to_fetch else []
+    return _finish_queries(cache, keys, resolved, to_fetch, fetched)
+
+
+async def arun_queries_cached(queries: Sequence[str], cache: Optional[SearchCache], fetch) -> List[Any]:
+    """run_queries_cached 的 asyncio 版本，fetch 是返回协程的函数"""
+    if cache is None:
+        return await fetch(list(queries))
+    keys, resolved, to_fetch = _plan_queries(queries, cache)
+    fetched = await fetch(list(to_fetch.values())) if to_fetch else []
+    return _finish_queries(cache, keys, resolved, to_fetch, fetched)
+
+
+def search_tool_calls(tool_calls: Sequence[Dict[str, Any]], search_tool, mode: str = "thread",
+                      max_workers: int = 8, timeout: float = 10.0,
+                      cache: Optional[SearchCache] = None) -> List[ToolMessage]:
+    """
+    执行所有工具调用中的搜索查询，返回与工具调用顺序一致的 ToolMessage 列表
+
+    mode 为 "serial" 或 "thread"；"async" 模式请使用 asearch_tool_calls。
+    传入 cache 时，命中缓存的查询不会再发出，同一批里的近似重复查询也只搜索一次。
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+    if mode == "async":
+        raise ValueError("Use asearch_tool_calls for mode='async'")
+
+    calls = collect_search_queries(tool_calls)
+    # 把所有工具调用的查询展开成一个列表，一次性并发执行
+    queries = [query for _, call_queries in calls for query in call_queries]
+    if mode == "serial":
+        fetch = lambda batch: run_queries_serial(search_tool, batch)
+    else:
+        fetch = lambda batch: run_queries_threaded(search_tool, batch, max_workers=max_workers, timeout=timeout)
+    results = run_queries_cached(queries, cache, fetch)
+    return build_tool_messages(calls, results)
+
+
+async def asearch_tool_calls(tool_calls: Sequence[Dict[str, Any]], search_tool,
+                             max_concurrency: int = 8, timeout: float = 10.0,
+                             cache: Optional[SearchCache] = None) -> List[ToolMessage]:
+    """search_tool_calls 的 asyncio 版本"""
+    calls = collect_search_queries(tool_calls)
+    queries = [query for _, call_queries in calls for query in call_queries]
+    fetch = lambda batch: arun_queries(search_tool, batch, max_concurrency=max_concurrency, timeout=timeout)
+    results = await arun_queries_cached(queries, cache, fetch)
+    return build_tool_messages(calls, results)
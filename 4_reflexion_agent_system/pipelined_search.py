@@ -0,0 +1,254 @@
+# 流水线搜索：结构化答案还在流式生成时就开始搜索
+# first_responder_chain / revisor_chain 要把整个 AnswerQuestion/ReviseAnswer 工具调用（包括约250词的 answer）
+# 生成完，execute_tools 才开始搜索。这里增量解析流式返回的工具调用参数（还不完整的 JSON），
+# search_queries 里的每一条一旦完整就立刻提交搜索，让搜索和剩余部分（reflection、references）的生成重叠；
+# 之后 execute_tools 直接取用已经在途或已完成的搜索结果。
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.globals import get_llm_cache
+from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+from parallel_search import (SEARCH_TOOL_NAMES, _error_result, _timeout_result, build_tool_messages,
+                             collect_search_queries)
+from search_cache import SearchCache
+
+Path = Tuple[Any, ...]
+
+
+class PartialJSONStrings:
+    """
+    增量 JSON 扫描器：分块喂入 JSON 文本，每个字符串值一结束就返回 (路径, 值)
+
+    路径由对象键和数组下标组成，例如 {"search_queries": ["a", "b"]} 中的 "b" 的路径是 ("search_queries", 1)。
+    只关心字符串值，数字、布尔值等会被跳过；对象的键本身不会被返回。
+    """
+
+    def __init__(self):
+        # 每一层容器：对象是 [dict, 当前键, 是否在等待键]，数组是 [list, 当前下标]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escaped = False
+        self._buffer: List[str] = []
+
+    def _path(self) -> Path:
+        return tuple(frame[1] for frame in self._stack)
+
+    def feed(self, text: str) -> List[Tuple[Path, str]]:
+        completed = []
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    # 转义序列（\n、\"、中 等）交给 json 解码
+                    value = json.loads('"' + "".join(self._buffer) + '"')
+                    self._buffer = []
+                    top = self._stack[-1] if self._stack else None
+                    if top is not None and top[0] is dict and top[2]:
+                        top[1], top[2] = value, False
+                    else:
+                        completed.append((self._path(), value))
+                    continue
+                self._buffer.append(char)
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._stack.append([dict, None, True])
+            elif char == "[":
+                self._stack.append([list, 0])
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif char == "," and self._stack:
+                top = self._stack[-1]
+                if top[0] is dict:
+                    top[2] = True
+                else:
+                    top[1] += 1
+        return completed
+
+
+class StreamedSearchQueries:
+    """
+    从流式 AIMessageChunk 的 tool_call_chunks 中提取已经完整的 search_queries 条目
+
+    每个工具调用（按 index 区分）一个扫描器；只处理 AnswerQuestion / ReviseAnswer。
+    """
+
+    def __init__(self, tool_names: Sequence[str] = SEARCH_TOOL_NAMES):
+        self.tool_names = tuple(tool_names)
+        self._names: Dict[int, Optional[str]] = {}
+        self._parsers: Dict[int, PartialJSONStrings] = {}
+
+    def feed(self, chunk: AIMessageChunk) -> List[str]:
+        queries = []
+        for tool_call_chunk in chunk.tool_call_chunks:
+            index = tool_call_chunk.get("index") or 0
+            if tool_call_chunk.get("name"):
+                self._names[index] = tool_call_chunk["name"]
+            parser = self._parsers.setdefault(index, PartialJSONStrings())
+            completed = parser.feed(tool_call_chunk.get("args") or "")
+            if self._names.get(index) not in self.tool_names:
+                continue
+            queries += [value for path, value in completed if len(path) == 2 and path[0] == "search_queries"]
+        return queries
+
+
+class SearchPrefetcher:
+    """
+    提前发出的搜索：submit() 在后台线程池里开始搜索，tool_messages() 取用结果
+
+    Args:
+        search_tool: 任意带 invoke(query) 的搜索工具
+        max_workers: 线程池大小上限（整个进程共用）
+        timeout: 单条查询的超时时间（秒），从该查询真正开始执行时计时
+        cache: 可选的 SearchCache；命中缓存的查询不会再发出，近似重复的查询只搜索一次
+        max_pending: 最多保留多少条未被取用的结果（例如流式生成中途失败），超出时丢弃最早的
+    """
+
+    def __init__(self, search_tool, max_workers: int = 8, timeout: float = 10.0,
+                 cache: Optional[SearchCache] = None, max_pending: int = 256):
+        self.search_tool = search_tool
+        self.timeout = timeout
+        self.cache = cache
+        self.max_pending = max_pending
+        self.prefetched = 0  # 在 execute_tools 之前就发出的查询
+        self.ready = 0  # execute_tools 取用时已经完成、完全不用等待的查询
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reflexion-prefetch")
+        self._futures: "OrderedDict[str, Future]" = OrderedDict()
+        self._started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, query: str) -> str:
+        return self.cache.key(query) if self.cache is not None else query
+
+    def _fetch(self, key: str, query: str) -> Any:
+        self._started[key] = time.monotonic()
+        try:
+            result = self.search_tool.invoke(query)
+        except Exception as e:
+            return _error_result(e)
+        if self.cache is not None:
+            self.cache.store(query, result)
+        return result
+
+    def submit(self, query: str, prefetch: bool = True) -> Future:
+        key = self._key(query)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                # execute_tools 取用提前发出的查询不算重复
+                if prefetch and self.cache is not None:
+                    self.cache.deduplicated += 1
+                return future
+            found, result = self.cache.lookup(query) if self.cache is not None else (False, None)
+            if found:
+                future = Future()
+                future.set_result(result)
+            else:
+                future = self._executor.submit(self._fetch, key, query)
+                if prefetch:
+                    self.prefetched += 1
+            self._futures[key] = future
+            while len(self._futures) > self.max_pending:
+                old_key, _ = self._futures.popitem(last=False)
+                self._started.pop(old_key, None)
+        return future
+
+    def _result(self, key: str, future: Future) -> Any:
+        while True:
+            started = self._started.get(key)
+            remaining = self.timeout if started is None else started + self.timeout - time.monotonic()
+            try:
+                return future.result(timeout=max(0.0, remaining))
+            except FutureTimeoutError:
+                started = self._started.get(key)
+                if started is not None and time.monotonic() - started >= self.timeout:
+                    # 线程无法被强制中断，这里只是不再等待它的结果
+                    return _timeout_result(self.timeout)
+
+    def results(self, queries: Sequence[str]) -> List[Any]:
+        """与 queries 顺序一致的结果；还没提交过的查询现在提交，取用后从待取列表中移除"""
+        futures = [(self._key(query), self.submit(query, prefetch=False)) for query in queries]
+        with self._lock:
+            self.ready += sum(future.done() for _, future in futures)
+            if self.cache is not None:
+                self.cache.deduplicated += len(futures) - len({key for key, _ in futures})
+        results = [self._result(key, future) for key, future in futures]
+        with self._lock:
+            for key, _ in futures:
+                self._futures.pop(key, None)
+                self._started.pop(key, None)
+        return results
+
+    def tool_messages(self, tool_calls: Sequence[Dict[str, Any]]) -> List[ToolMessage]:
+        """和 search_tool_calls 的返回值一致：每个工具调用一条 ToolMessage，内容是 {查询: 结果} 的JSON"""
+        calls = collect_search_queries(tool_calls)
+        queries = [query for _, call_queries in calls for query in call_queries]
+        return build_tool_messages(calls, self.results(queries))
+
+    async def atool_messages(self, tool_calls: Sequence[Dict[str, Any]]) -> List[ToolMessage]:
+        # 等待结果会阻塞，放到默认线程池里，不占用事件循环
+        return await asyncio.get_running_loop().run_in_executor(None, self.tool_messages, tool_calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"prefetched": self.prefetched, "ready": self.ready, "pending": len(self._futures)}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _cached_llm() -> bool:
+    # .stream() 不经过 LangChain 的 LLM 缓存；安装了缓存（例如 llm_cache 的 record/replay 模式）时改用 invoke
+    cache = get_llm_cache()
+    return cache is not None and getattr(cache, "mode", None) != "passthrough"
+
+
+def prefetching_node(chain, prefetcher: SearchPrefetcher,
+                     prefetch_if: Optional[Callable[[List[BaseMessage]], bool]] = None) -> RunnableLambda:
+    """
+    把 first_responder_chain / revisor_chain 包装成流式节点：边生成边把完整的查询交给 prefetcher
+
+    返回的节点和原来的链一样输出一条 AIMessage，同时支持 app.invoke 和 app.ainvoke。
+    prefetch_if(state) 返回 False 时照常调用链、不提前搜索，例如最后一次修订之后图就结束了，没有 execute_tools 来取用结果。
+    """
+
+    def skip(state: List[BaseMessage]) -> bool:
+        return _cached_llm() or (prefetch_if is not None and not prefetch_if(state))
+
+    def draft(state: List[BaseMessage], config: RunnableConfig) -> BaseMessage:
+        if skip(state):
+            return chain.invoke(state, config)
+        queries = StreamedSearchQueries()
+        message = None
+        for chunk in chain.stream(state, config):
+            message = chunk if message is None else message + chunk
+            for query in queries.feed(chunk):
+                prefetcher.submit(query)
+        return message_chunk_to_message(message)
+
+    async def adraft(state: List[BaseMessage], config: RunnableConfig) -> BaseMessage:
+        if skip(state):
+            return await chain.ainvoke(state, config)
+        queries = StreamedSearchQueries()
+        message = None
+        async for chunk in chain.astream(state, config):
+            message = chunk if message is None else message + chunk
+            for query in queries.feed(chunk):
+                prefetcher.submit(query)
+        return message_chunk_to_message(message)
+
+    return RunnableLambda(draft, afunc=adraft)
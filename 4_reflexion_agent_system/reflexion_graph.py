@@ -3,13 +3,17 @@ from typing import List
 
 # 导入LangChain的消息类型，用于处理AI对话中的消息
 from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 # 导入LangGraph的核心组件，用于构建AI工作流图
 from langgraph.graph import END, MessageGraph
 
 # 导入自定义的链（chain），这些是AI处理任务的具体组件
 from chains import revisor_chain, first_responder_chain
 # 导入工具执行函数，用于执行具体的操作
-from execute_tools import execute_tools
+# execute_tools 用线程池并发执行搜索，aexecute_tools 是 app.ainvoke 时使用的 asyncio 版本
+from execute_tools import execute_tools, aexecute_tools, search_cache, search_prefetcher, PIPELINE_SEARCH
+# prefetching_node 把链包装成流式节点，生成过程中就把完整的搜索查询交给 search_prefetcher
+from pipelined_search import prefetching_node
 
 # 创建一个消息图（MessageGraph），这是LangGraph的核心数据结构
 # 它定义了AI代理（agent）如何在不同节点之间流转和处理消息
@@ -21,13 +25,19 @@ MAX_ITERATIONS = 2
 # 向图中添加三个节点，每个节点代表AI工作流中的一个处理步骤：
 
 # 1. "draft" 节点：初始响应者链，负责生成初步的回答
-graph.add_node("draft", first_responder_chain)
+# 开启流水线搜索时，draft 一边流式生成 AnswerQuestion，一边提前发出已经完整的 search_queries
+graph.add_node("draft", prefetching_node(first_responder_chain, search_prefetcher) if PIPELINE_SEARCH
+               else first_responder_chain)
 
 # 2. "execute_tools" 节点：工具执行器，负责调用外部工具或API
-graph.add_node("execute_tools", execute_tools)
+# RunnableLambda 同时注册同步和异步实现：app.invoke 走线程池，app.ainvoke 走 asyncio
+graph.add_node("execute_tools", RunnableLambda(execute_tools, afunc=aexecute_tools))
 
 # 3. "revisor" 节点：修订者链，负责检查和改进之前的回答
-graph.add_node("revisor", revisor_chain)
+# 最后一次修订之后图就结束了（见下面的 event_loop），这时不提前搜索
+graph.add_node("revisor", prefetching_node(revisor_chain, search_prefetcher,
+                                           prefetch_if=lambda state: event_loop(state) == "execute_tools")
+               if PIPELINE_SEARCH else revisor_chain)
 
 # 添加边（edges），定义节点之间的执行顺序：
 # draft -> execute_tools -> revisor
@@ -83,6 +93,10 @@ response = app.invoke(
 # 打印最终结果
 # 获取最后一个响应中的工具调用结果
 print(response[-1].tool_calls[0]["args"]["answer"])
+# 打印搜索缓存的命中情况（重复运行时大部分查询会直接命中缓存）
+print("search cache:", search_cache.stats())
+# 提前发出的查询数，以及 execute_tools 取用时已经完成的查询数
+print("search prefetch:", search_prefetcher.stats())
 # # 打印完整的响应对象，用于调试
 # print(response, "response")
 
@@ -0,0 +1,167 @@
+# 搜索结果缓存
+# 反思循环里 revisor 经常重复（或只是换个大小写、语序）之前已经搜过的查询，
+# 多次运行之间也会反复搜索同样的问题。SearchCache 把搜索结果持久化到本地 SQLite 文件，
+# 用归一化后的查询作为键，支持 TTL 过期和 LRU 淘汰，并记录命中/未命中次数。
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+# 归一化时忽略的常见虚词，"AI tools for small business" 和 "small business AI tools" 会得到同一个键
+STOPWORDS = frozenset({
+    "a", "an", "the", "of", "for", "in", "on", "to", "and", "or", "with", "by",
+    "about", "how", "what", "is", "are", "do", "does",
+})
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def _fold_plural(token: str) -> str:
+    # Porter 词干算法的第一步（1a）：businesses -> business, queries -> queri, tools -> tool
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("ies"):
+        return token[:-2]
+    if token.endswith("ss") or len(token) <= 3:
+        return token
+    if token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+def normalize_query(query: str) -> str:
+    """
+    把查询归一化为缓存键
+
+    规则：Unicode NFKC + casefold，去掉标点，去掉虚词，复数还原为单数，剩余词去重后排序。
+    只改变大小写、标点、语序、单复数或虚词的近似重复查询会得到相同的键。
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    tokens = _PUNCTUATION.sub(" ", text).split()
+    words = sorted({_fold_plural(token) for token in tokens if token not in STOPWORDS})
+    # 全是虚词的查询退化为原始词序列，避免得到空键
+    return " ".join(words) if words else " ".join(tokens)
+
+
+class SearchCache:
+    """
+    基于 SQLite 的搜索结果缓存
+
+    Args:
+        path: SQLite 文件路径，":memory:" 表示只在进程内缓存
+        ttl: 结果有效期（秒），None 表示永不过期
+        max_entries: 最多保留的条目数，超出时按最近访问时间淘汰（LRU）
+    """
+
+    def __init__(self, path: str = "search_cache.sqlite", ttl: Optional[float] = 24 * 3600,
+                 max_entries: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0  # 同一批查询中被合并掉的近似重复查询
+        self.expired = 0
+        self.evictions = 0
+        # 并发搜索时多个线程会同时读写，这里用一个连接加锁串行化访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_last_access ON search_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(query: str) -> str:
+        return normalize_query(query)
+
+    def lookup(self, query: str) -> Tuple[bool, Any]:
+        """
+        查询缓存，返回 (是否命中, 结果)
+
+        过期的条目会被删除并按未命中处理。
+        """
+        key = self.key(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return False, None
+            self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return True, json.loads(row[0])
+
+    def store(self, query: str, result: Any) -> None:
+        """
+        写入搜索结果
+
+        只缓存正常的结构化结果；搜索出错或超时时返回的是错误描述字符串，不写入缓存。
+        """
+        if isinstance(result, str):
+            return
+        key = self.key(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, result, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query, json.dumps(result), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # 调用方已持有锁
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,10 +1,11 @@
-from langchain_openai import ChatOpenAI
-from langchain.agents import tool, create_react_agent
+from langchain_core.tools import tool
 import datetime
-from langchain_community.tools import TavilySearchResults
-from langchain import hub
 
-llm = ChatOpenAI(model="gpt-4")
+from lazy_loading import Lazy, LazyRunnable
+from multi_action_parser import MULTI_ACTION_REACT_PROMPT, MultiActionReActOutputParser
+
+# Provider and tool modules are imported on first use, not when a worker starts
+llm = LazyRunnable("langchain_openai:ChatOpenAI", model="gpt-4")
 
 @tool
 def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
@@ -14,10 +15,20 @@ def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
     formatted_time = current_time.strftime(format)
     return formatted_time
 
-search_tool = TavilySearchResults(search_depth="basic")
-react_prompt = hub.pull("hwchase17/react")
+search_tool = Lazy("langchain_community.tools:TavilySearchResults", search_depth="basic")
+# hwchase17/react, bundled locally (no hub fetch), plus permission to issue several independent actions in one step
+react_prompt = MULTI_ACTION_REACT_PROMPT
+
+
+def get_tools():
+    return [get_system_time, search_tool.load()]
+
+
+def build_react_agent():
+    from langchain.agents import create_react_agent
 
+    return create_react_agent(tools=get_tools(), llm=llm, prompt=react_prompt,
+                              output_parser=MultiActionReActOutputParser())
 
-tools = [get_system_time, search_tool]
 
-react_agent_runnable = create_react_agent(tools=tools, llm=llm, prompt=react_prompt)
\ No newline at end of file
+react_agent_runnable = LazyRunnable(build_react_agent)
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Reason/act cycles and wall time of the ReAct graph: one action per step vs several concurrent actions.
+
+The question needs four independent searches and the current time. A scripted
+text LLM (``--latency`` seconds per call) plays the agent; the search tool is
+the fake from benchmarks/fakes.py (``--tool-latency`` seconds per query).
+
+* before: the original act_node (linear tool scan, one action per cycle) with
+  the hwchase17/react prompt; the agent issues one action per reasoning step.
+* after:  act_node on ToolRegistry with MultiActionReActOutputParser; the agent
+  issues all five actions in its first step and they run concurrently.
+
+Tool lookup cost is also measured on its own for a large toolbox.
+
+    python benchmark_act_node.py --latency 0.5 --tool-latency 0.3
+"""
+import argparse
+import datetime
+import operator
+import statistics
+import sys
+import time
+import timeit
+import warnings
+from pathlib import Path
+from typing import Annotated, Any, List, Optional, TypedDict
+
+warnings.filterwarnings("ignore")
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from langchain.agents import create_react_agent  # noqa: E402
+from langchain.agents.output_parsers import ReActSingleInputOutputParser  # noqa: E402
+from langchain_core.agents import AgentFinish  # noqa: E402
+from langchain_core.language_models.llms import LLM  # noqa: E402
+from langchain_core.runnables import RunnableConfig  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+from langgraph.graph import END, StateGraph  # noqa: E402
+
+from fakes import FakeSearchTool  # noqa: E402
+from multi_action_parser import MULTI_ACTION_REACT_PROMPT, REACT_PROMPT, MultiActionReActOutputParser  # noqa: E402
+from tool_registry import ToolRegistry  # noqa: E402
+
+QUESTION = "Compare the populations of Chennai, Delhi, Mumbai and Kolkata, and tell me today's date"
+SEARCH = "tavily_search_results_json"
+ACTIONS = [(SEARCH, f"population of {city}") for city in ("Chennai", "Delhi", "Mumbai", "Kolkata")] + \
+          [("get_system_time", "%Y-%m-%d")]
+
+
+class ScriptedReActLLM(LLM):
+    """Text LLM that works through ACTIONS, one per step or all in the first step."""
+
+    latency: float = 0.0
+    multi_action: bool = False
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-react"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        done = prompt.count("Observation:") - prompt.count("Observation: the result of the action")
+        if done >= len(ACTIONS):
+            return " I now know the final answer\nFinal Answer: Delhi is the largest of the four."
+        pending = ACTIONS[done:] if self.multi_action else ACTIONS[done:done + 1]
+        return " I need to look this up.\n" + "\n".join(f"Action: {name}\nAction Input: {tool_input}"
+                                                        for name, tool_input in pending)
+
+
+@tool
+def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
+    """ Returns the current date and time in the specified format """
+    return datetime.datetime.now().strftime(format)
+
+
+class AgentState(TypedDict):
+    input: str
+    agent_outcome: Any
+    intermediate_steps: Annotated[list, operator.add]
+
+
+def original_act_node(tools):
+    def act_node(state: AgentState):
+        agent_action = state["agent_outcome"]
+        tool_function = None
+        for candidate in tools:
+            if candidate.name == agent_action.tool:
+                tool_function = candidate
+                break
+        output = tool_function.invoke(agent_action.tool_input) if tool_function else \
+            f"Tool '{agent_action.tool}' not found"
+        return {"intermediate_steps": [(agent_action, str(output))]}
+    return act_node
+
+
+def registry_act_node(tools):
+    registry = ToolRegistry(tools)
+
+    def act_node(state: AgentState, config: RunnableConfig):
+        agent_outcome = state["agent_outcome"]
+        agent_actions = agent_outcome if isinstance(agent_outcome, list) else [agent_outcome]
+        return {"intermediate_steps": registry.run_all(agent_actions, config)}
+    return act_node
+
+
+def build_app(llm, tools, multi_action: bool):
+    if multi_action:
+        agent = create_react_agent(tools=tools, llm=llm, prompt=MULTI_ACTION_REACT_PROMPT,
+                                   output_parser=MultiActionReActOutputParser())
+        act_node = registry_act_node(tools)
+    else:
+        agent = create_react_agent(tools=tools, llm=llm, prompt=REACT_PROMPT,
+                                   output_parser=ReActSingleInputOutputParser())
+        act_node = original_act_node(tools)
+
+    graph = StateGraph(AgentState)
+    graph.add_node("reason_node", lambda state: {"agent_outcome": agent.invoke(state)})
+    graph.set_entry_point("reason_node")
+    graph.add_node("act_node", act_node)
+    graph.add_conditional_edges("reason_node",
+                                lambda state: END if isinstance(state["agent_outcome"], AgentFinish) else "act_node")
+    graph.add_edge("act_node", "reason_node")
+    return graph.compile()
+
+
+def run(multi_action: bool, latency: float, tool_latency: float, repeat: int):
+    llm = ScriptedReActLLM(latency=latency, multi_action=multi_action)
+    app = build_app(llm, [get_system_time, FakeSearchTool(default_latency=tool_latency)], multi_action)
+    walls = []
+    for _ in range(repeat):
+        llm.calls = 0
+        start = time.perf_counter()
+        result = app.invoke({"input": QUESTION, "agent_outcome": None, "intermediate_steps": []})
+        walls.append(time.perf_counter() - start)
+    steps = result["intermediate_steps"]
+    assert [(action.tool, action.tool_input) for action, _ in steps] == ACTIONS, "observations out of order"
+    return llm.calls, len(steps), statistics.median(walls)
+
+
+def lookup_cost(size: int, number: int = 20000):
+    tools = [tool(f"tool_{i}", lambda x: x, description="noop") for i in range(size)]
+    registry = ToolRegistry(tools)
+    target = tools[-1].name
+    scan = timeit.timeit(lambda: next(t for t in tools if t.name == target), number=number) / number
+    indexed = timeit.timeit(lambda: registry[target], number=number) / number
+    return scan, indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency per reasoning step (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.3, help="fake search latency per query (s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{len(ACTIONS)} independent actions; LLM {args.latency}s per step, search {args.tool_latency}s; "
+          f"median of {args.repeat}")
+    print(f"{'variant':<26} {'reason/act cycles':>17} {'actions':>8} {'wall s':>7} {'wall s (0 lat)':>15}")
+    for name, multi_action in (("before (one action/step)", False), ("after (multi-action)", True)):
+        cycles, actions, wall = run(multi_action, args.latency, args.tool_latency, args.repeat)
+        _, _, fast = run(multi_action, 0.0, 0.0, max(args.repeat, 20))
+        print(f"{name:<26} {cycles - 1:>17} {actions:>8} {wall:>7.2f} {fast:>15.4f}")
+
+    print(f"\n{'tools':>6} {'linear scan us':>15} {'registry us':>12}")
+    for size in (2, 20, 200):
+        scan, indexed = lookup_cost(size)
+        print(f"{size:>6} {scan * 1e6:>15.3f} {indexed * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Load provider and tool modules on first use instead of at import time.
+
+``langchain_openai``, ``langchain_community`` and ``langchain.agents`` each take
+around a second to import, which every worker used to pay before it could do
+anything. A :class:`Lazy` stands in for an object and builds it (importing its
+module) the first time one of its attributes is used; :class:`LazyRunnable`
+is the same for runnables, so it can go into ``|`` pipelines and graph nodes.
+
+    llm = LazyRunnable("langchain_openai:ChatOpenAI", model="gpt-4")
+    search_tool = Lazy("langchain_community.tools:TavilySearchResults", search_depth="basic")
+    warm_up(llm, search_tool)   # optional: load in the background while the worker starts serving
+"""
+import importlib
+import threading
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Union
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+def load_attr(path: str) -> Any:
+    """``"package.module:Name"`` -> the imported attribute."""
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class Lazy:
+    """Proxy that calls ``factory(*args, **kwargs)`` on first attribute access.
+
+    ``factory`` is a callable or a ``"module:Name"`` path, imported only then.
+    """
+
+    def __init__(self, factory: Union[str, Callable[..., Any]], *args: Any, **kwargs: Any):
+        self._factory = factory
+        self._args = args
+        self._kwargs = kwargs
+        self._target = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Any:
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    factory = load_attr(self._factory) if isinstance(self._factory, str) else self._factory
+                    self._target = factory(*self._args, **self._kwargs)
+        return self._target
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") or name in ("_factory", "_args", "_kwargs", "_target", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        factory = self._factory if isinstance(self._factory, str) else getattr(self._factory, "__name__", "factory")
+        return f"{type(self).__name__}({factory}{', loaded' if self.loaded else ''})"
+
+
+class LazyRunnable(Lazy, Runnable):
+    """:class:`Lazy` for a runnable: usable in pipelines and nodes before it is built."""
+
+    def get_name(self, suffix: Optional[str] = None, *, name: Optional[str] = None) -> str:
+        return self.load().get_name(suffix, name=name)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self.load().invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await self.load().ainvoke(input, config, **kwargs)
+
+    def batch(self, inputs: List[Any], config=None, *, return_exceptions: bool = False, **kwargs: Any) -> List[Any]:
+        return self.load().batch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+
+    async def abatch(self, inputs: List[Any], config=None, *, return_exceptions: bool = False,
+                     **kwargs: Any) -> List[Any]:
+        return await self.load().abatch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        return self.load().stream(input, config, **kwargs)
+
+    def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        return self.load().astream(input, config, **kwargs)
+
+    def transform(self, input: Iterator[Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        return self.load().transform(input, config, **kwargs)
+
+    def atransform(self, input: AsyncIterator[Any], config: Optional[RunnableConfig] = None,
+                   **kwargs: Any) -> AsyncIterator[Any]:
+        return self.load().atransform(input, config, **kwargs)
+
+
+def warm_up(*lazies: Lazy) -> threading.Thread:
+    """Load ``lazies`` in a daemon thread; join it to wait until they are ready."""
+    thread = threading.Thread(target=lambda: [lazy.load() for lazy in lazies], name="warm-up", daemon=True)
+    thread.start()
+    return thread
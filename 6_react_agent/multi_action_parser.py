@@ -0,0 +1,84 @@
+"""ReAct prompt and output parser that allow several independent actions per reasoning step.
+
+The model may write more than one ``Action`` / ``Action Input`` pair before the
+``Observation``; act_node runs them concurrently and the scratchpad shows each
+with its own observation. A response with a single action parses exactly as
+with ``ReActSingleInputOutputParser``.
+
+Importing this module does not import ``langchain.agents`` (about a second);
+the single-action parser is loaded the first time it is needed.
+"""
+import re
+from typing import List, Union
+
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import BaseOutputParser
+from langchain_core.prompts import PromptTemplate
+
+MULTI_ACTION_INSTRUCTIONS = """When several actions do not depend on each other's results, write all of their
+Action/Action Input pairs one after another before the Observation; they run at
+the same time and you get one Observation per action.
+
+"""
+
+
+def allow_multiple_actions(prompt: PromptTemplate) -> PromptTemplate:
+    """The hwchase17/react prompt with ``MULTI_ACTION_INSTRUCTIONS`` inserted before ``Begin!``."""
+    return PromptTemplate.from_template(prompt.template.replace("Begin!", MULTI_ACTION_INSTRUCTIONS + "Begin!", 1))
+
+
+# hwchase17/react, bundled so that building the agent needs no hub fetch at import time
+REACT_PROMPT = PromptTemplate.from_template(
+    """Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+)
+
+MULTI_ACTION_REACT_PROMPT = allow_multiple_actions(REACT_PROMPT)
+
+
+_ACTION = re.compile(
+    r"^[ \t]*Action\s*\d*\s*:[ \t]*(.*?)\s*\n[ \t]*Action\s*\d*\s*Input\s*\d*\s*:[ \t]*(.*?)"
+    r"(?=\n[ \t]*(?:Thought|Action\s*\d*\s*:)|\Z)",
+    re.MULTILINE | re.DOTALL,
+)
+
+
+class MultiActionReActOutputParser(BaseOutputParser[Union[AgentAction, List[AgentAction], AgentFinish]]):
+    def parse(self, text: str) -> Union[AgentAction, List[AgentAction], AgentFinish]:
+        matches = list(_ACTION.finditer(text))
+        if len(matches) <= 1:
+            from langchain.agents.output_parsers import ReActSingleInputOutputParser
+
+            return ReActSingleInputOutputParser().parse(text)
+        if "Final Answer:" in text:
+            raise OutputParserException(
+                f"Parsing LLM output produced both a final answer and a parse-able action: {text}")
+        actions, start = [], 0
+        for match in matches:
+            # each action carries its own slice of the text, so the scratchpad reads Action, Observation, Action, ...
+            actions.append(AgentAction(match.group(1).strip(), match.group(2).strip().strip('"'),
+                                       text[start:match.end()]))
+            start = match.end()
+        return actions
+
+    @property
+    def _type(self) -> str:
+        return "react-multi-action"
@@ -1,36 +1,25 @@
 from dotenv import load_dotenv
+from langchain_core.runnables import RunnableConfig
 
-from agent_reason_runnable import react_agent_runnable, tools
+from agent_reason_runnable import get_tools, react_agent_runnable
+from lazy_loading import Lazy
 from react_state import AgentState
+from tool_registry import ToolRegistry
 
 load_dotenv()
 
+tool_registry = Lazy(lambda: ToolRegistry(get_tools()))
+
 def reason_node(state: AgentState):
     agent_outcome = react_agent_runnable.invoke(state)
     return {"agent_outcome": agent_outcome}
 
 
-def act_node(state: AgentState):
-    agent_action = state["agent_outcome"]
-    
-    # Extract tool name and input from AgentAction
-    tool_name = agent_action.tool
-    tool_input = agent_action.tool_input
-    
-    # Find the matching tool function
-    tool_function = None
-    for tool in tools:
-        if tool.name == tool_name:
-            tool_function = tool
-            break
-    
-    # Execute the tool with the input
-    if tool_function:
-        if isinstance(tool_input, dict):
-            output = tool_function.invoke(**tool_input)
-        else:
-            output = tool_function.invoke(tool_input)
-    else:
-        output = f"Tool '{tool_name}' not found"
-    
-    return {"intermediate_steps": [(agent_action, str(output))]}
\ No newline at end of file
+def act_node(state: AgentState, config: RunnableConfig):
+    agent_outcome = state["agent_outcome"]
+
+    # One reasoning step may produce several independent actions
+    agent_actions = agent_outcome if isinstance(agent_outcome, list) else [agent_outcome]
+
+    # Look up, validate and run them concurrently; observations stay in the order the agent wrote the actions
+    return {"intermediate_steps": tool_registry.run_all(agent_actions, config)}
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Tool dispatch for act_node: O(1) lookup, validated arguments, concurrent actions.
+
+    registry = ToolRegistry(tools)
+    steps = registry.run_all(actions, config)   # [(action, observation), ...] in action order
+
+Problems an agent can recover from (unknown tool, arguments that do not match
+the tool's schema) are returned as the observation, so the next reasoning step
+sees them; exceptions raised by the tool itself propagate as before.
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.agents import AgentAction
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_executor_for_config
+from langchain_core.tools import BaseTool
+from pydantic import ValidationError
+
+
+class ToolInputError(ValueError):
+    """The action names an unknown tool or its input does not fit the tool's arguments."""
+
+
+class ToolRegistry:
+    def __init__(self, tools: Sequence[BaseTool]):
+        self._tools: Dict[str, BaseTool] = {}
+        for tool in tools:
+            if tool.name in self._tools:
+                raise ValueError(f"Duplicate tool name '{tool.name}'")
+            self._tools[tool.name] = tool
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __getitem__(self, name: str) -> BaseTool:
+        return self._tools[name]
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def bind(self, action: AgentAction) -> Tuple[BaseTool, Union[str, Dict[str, Any]]]:
+        """The tool and the input to invoke it with, checked against the tool's argument schema."""
+        tool = self._tools.get(action.tool)
+        if tool is None:
+            raise ToolInputError(f"Tool '{action.tool}' not found. Available tools: {', '.join(self._tools)}")
+        tool_input = action.tool_input
+        if isinstance(tool_input, str) and tool_input.strip().startswith("{"):
+            # text ReAct agents write structured arguments as JSON
+            try:
+                parsed = json.loads(tool_input)
+            except json.JSONDecodeError:
+                parsed = None
+            if isinstance(parsed, dict):
+                tool_input = parsed
+        if isinstance(tool_input, dict):
+            try:
+                tool.get_input_schema().model_validate(tool_input)
+            except ValidationError as e:
+                problems = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                raise ToolInputError(f"Invalid input for tool '{tool.name}': {problems}") from e
+        else:
+            required = [name for name, field in tool.get_input_schema().model_fields.items() if field.is_required()]
+            if len(required) > 1:
+                raise ToolInputError(f"Tool '{tool.name}' takes arguments {required}; "
+                                     f"pass them as a JSON object, not {tool_input!r}")
+        return tool, tool_input
+
+    def run(self, action: AgentAction, config: Optional[RunnableConfig] = None) -> str:
+        try:
+            tool, tool_input = self.bind(action)
+        except ToolInputError as e:
+            return str(e)
+        return str(tool.invoke(tool_input, config))
+
+    def run_all(self, actions: Sequence[AgentAction],
+                config: Optional[RunnableConfig] = None) -> List[Tuple[AgentAction, str]]:
+        """Run independent actions concurrently (bounded by ``max_concurrency`` in ``config``).
+
+        Observations are paired with their actions in the order the agent wrote them,
+        whatever order the tools finish in.
+        """
+        if len(actions) == 1:
+            return [(actions[0], self.run(actions[0], config))]
+        with get_executor_for_config(config) as executor:
+            outputs = list(executor.map(lambda action: self.run(action, config), actions))
+        return list(zip(actions, outputs))
@@ -1,3 +1,5 @@
+import sys
+from pathlib import Path
 from typing import TypedDict, Annotated
 from langgraph.graph import add_messages, StateGraph, END
 from langchain_groq import ChatGroq
@@ -6,13 +8,20 @@ from dotenv import load_dotenv
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langgraph.prebuilt import ToolNode
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from tool_limiter import ToolLimiter, ToolLimits  # noqa: E402
+
 load_dotenv()
 
 class BasicChatBot(TypedDict):
     messages: Annotated[list, add_messages]
 
 search_tool = TavilySearchResults(max_results=2)
-tools = [search_tool]
+# ToolNode runs all tool calls at once; the limiter caps concurrency and rate per tool
+# and shares one request between identical in-flight searches
+tool_limiter = ToolLimiter(max_concurrency=8,
+                           limits={"tavily_search_results_json": ToolLimits(max_concurrency=4, rate=5)})
+tools = tool_limiter.wrap([search_tool])
 
 llm = ChatGroq(model="llama-3.1-8b-instant")
 
@@ -1,18 +1,34 @@
+import sys
+from pathlib import Path
 from typing import TypedDict, Annotated
-from langgraph.graph import add_messages, StateGraph, END
+from langgraph.graph import StateGraph, END
 from langchain_groq import ChatGroq
 from langchain_core.messages import AIMessage, HumanMessage
 from dotenv import load_dotenv
-from langgraph.checkpoint.memory import MemorySaver
+from message_budget import summarize_node, token_budget_reducer
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from bounded_memory_saver import BoundedMemorySaver  # noqa: E402
+from delta_checkpointer import DeltaCheckpointSaver  # noqa: E402
 
 load_dotenv()
 
-memory = MemorySaver()
+# Each checkpoint keeps only the new messages instead of another copy of the whole history.
+# Threads idle for an hour, or the least recently used ones past 256 MB, spill to
+# checkpoint_spill/ and are loaded back when the conversation resumes.
+memory = DeltaCheckpointSaver(BoundedMemorySaver(max_bytes=256 * 1024 * 1024, idle_ttl=3600))
 
 llm = ChatGroq(model="llama-3.1-8b-instant")
 
+# Once the thread passes 4000 tokens, the summarize node (run before the chatbot)
+# folds the oldest turns into a running summary written by the LLM, so the prompt
+# stops growing with the thread. The reducer itself stays pure: it keeps that
+# summary at the top and only trims (extractively) past a hard cap of 8000 tokens.
+summarize = summarize_node(llm, max_tokens=4000)
+budgeted_messages = token_budget_reducer(max_tokens=8000)
+
 class BasicChatState(TypedDict): 
-    messages: Annotated[list, add_messages]
+    messages: Annotated[list, budgeted_messages]
 
 def chatbot(state: BasicChatState): 
     return {
@@ -21,11 +37,13 @@ def chatbot(state: BasicChatState):
 
 graph = StateGraph(BasicChatState)
 
+graph.add_node("summarize", summarize)
 graph.add_node("chatbot", chatbot)
 
+graph.add_edge("summarize", "chatbot")
 graph.add_edge("chatbot", END)
 
-graph.set_entry_point("chatbot")
+graph.set_entry_point("summarize")
 
 app = graph.compile(checkpointer=memory)
 
@@ -1,21 +1,38 @@
+import sys
+from pathlib import Path
 from typing import TypedDict, Annotated
-from langgraph.graph import add_messages, StateGraph, END
+from langgraph.graph import StateGraph, END
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
+from tuned_sqlite_saver import TunedSqliteSaver
+from message_budget import summarize_node, token_budget_reducer
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from delta_checkpointer import DeltaCheckpointSaver  # noqa: E402
 
 load_dotenv()
 
-sqlite_conn = sqlite3.connect("checkpoint.sqlite", check_same_thread=False)
+# WAL + group-committed writes + per-thread read connections; keeps the newest
+# 20 checkpoints per thread and drops anything older than 30 days.
+sqlite_saver = TunedSqliteSaver("checkpoint.sqlite", keep_last=20, max_age=30 * 24 * 3600)
 
-memory = SqliteSaver(sqlite_conn)
+# Checkpoints store only the messages added since the previous one, with a full
+# snapshot every 20 steps. Retention above keeps the older checkpoints a delta
+# still needs, so pruning never cuts a chain back to its snapshot.
+memory = DeltaCheckpointSaver(sqlite_saver, snapshot_every=20)
 
 llm = ChatGroq(model="llama-3.1-8b-instant")
 
+# Once the thread passes 4000 tokens, the summarize node (run before the chatbot)
+# folds the oldest turns into a running summary written by the LLM, so the prompt
+# stops growing with the thread. The reducer itself stays pure: it keeps that
+# summary at the top and only trims (extractively) past a hard cap of 8000 tokens.
+summarize = summarize_node(llm, max_tokens=4000)
+budgeted_messages = token_budget_reducer(max_tokens=8000)
+
 class BasicChatState(TypedDict): 
-    messages: Annotated[list, add_messages]
+    messages: Annotated[list, budgeted_messages]
 
 def chatbot(state: BasicChatState): 
     return {
@@ -24,11 +41,13 @@ def chatbot(state: BasicChatState):
 
 graph = StateGraph(BasicChatState)
 
+graph.add_node("summarize", summarize)
 graph.add_node("chatbot", chatbot)
 
+graph.add_edge("summarize", "chatbot")
 graph.add_edge("chatbot", END)
 
-graph.set_entry_point("chatbot")
+graph.set_entry_point("summarize")
 
 app = graph.compile(checkpointer=memory)
 
@@ -47,3 +66,5 @@ while True:
 
         print("AI: " + result["messages"][-1].content)
 
+sqlite_saver.close()
+
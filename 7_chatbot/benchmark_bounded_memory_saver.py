@@ -0,0 +1,119 @@
+"""Memory held by MemorySaver vs BoundedMemorySaver over many short sessions.
+
+Like 8_human-in-the-loop/5_multiturn_conversation.py, every session starts a
+new ``uuid4`` thread. After all sessions the script reports traced Python
+memory, the saver's resident bytes and eviction counters, and then resumes
+the very first (long evicted) thread to show it is reloaded intact, and the
+second one through the async API to show the reload runs off the event loop.
+
+    python benchmark_bounded_memory_saver.py --sessions 400 --turns 10 --max-mb 4
+"""
+import argparse
+import asyncio
+import gc
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph, add_messages
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from bounded_memory_saver import BoundedMemorySaver  # noqa: E402
+
+REPLY = "Thanks for the details! Here is a draft you can review and adjust as needed. " * 3
+
+
+class BasicChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def chatbot(state: BasicChatState):
+    return {"messages": [AIMessage(content=REPLY)]}
+
+
+def build_app(checkpointer):
+    graph = StateGraph(BasicChatState)
+    graph.add_node("chatbot", chatbot)
+    graph.add_edge("chatbot", END)
+    graph.set_entry_point("chatbot")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run(label, memory, sessions, turns):
+    app = build_app(memory)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    thread_ids = []
+    for _ in range(sessions):
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        thread_ids.append(config["configurable"]["thread_id"])
+        for turn in range(turns):
+            app.invoke({"messages": [HumanMessage(content=f"Turn {turn}: please refine the post.")]}, config)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {sessions * turns / elapsed:>7.0f} turns/s   traced memory now {current / 1e6:>7.1f} MB, "
+          f"peak {peak / 1e6:>7.1f} MB")
+    return app, thread_ids
+
+
+async def resume_async(app, memory, config):
+    """Resume an evicted thread via ``aget_state``; return the thread ids its reload ran on."""
+    reload_threads = []
+    reload = memory._reload
+
+    def recording_reload(thread_id):
+        reload_threads.append(threading.get_ident())
+        reload(thread_id)
+
+    memory._reload = recording_reload
+    try:
+        state = await app.aget_state(config)
+    finally:
+        memory._reload = reload
+    return state, reload_threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--max-mb", type=float, default=4.0)
+    args = parser.parse_args()
+
+    run("memory", MemorySaver(), args.sessions, args.turns)
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-spill-") as spill_directory:
+        memory = BoundedMemorySaver(max_bytes=int(args.max_mb * 1e6), spill_directory=spill_directory)
+        app, thread_ids = run("bounded", memory, args.sessions, args.turns)
+        print(f"         {memory.stats()}")
+
+        config = {"configurable": {"thread_id": thread_ids[0]}}
+        start = time.perf_counter()
+        state = app.get_state(config)
+        print(f"resume first thread: reloaded in {(time.perf_counter() - start) * 1000:.2f} ms, "
+              f"{len(state.values['messages'])} messages")
+        assert len(state.values["messages"]) == 2 * args.turns
+        app.invoke({"messages": [HumanMessage(content="One more change, please.")]}, config)
+        assert len(app.get_state(config).values["messages"]) == 2 * args.turns + 2
+
+        config = {"configurable": {"thread_id": thread_ids[1]}}
+        state, reload_threads = asyncio.run(resume_async(app, memory, config))
+        print(f"resume second thread via aget_state: {len(state.values['messages'])} messages, "
+              f"reloaded off the event loop: {threading.get_ident() not in reload_threads}")
+        assert len(state.values["messages"]) == 2 * args.turns
+        assert reload_threads and threading.get_ident() not in reload_threads
+        print(f"         {memory.stats()}")
+
+
+if __name__ == "__main__":
+    main()
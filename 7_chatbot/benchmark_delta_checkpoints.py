@@ -0,0 +1,128 @@
+"""Bytes written and state load latency vs thread length, full vs delta checkpoints.
+
+Runs one conversation of each length through the 4_chat_with_sqlite_checkpointer.py
+graph shape (fake instant chatbot) on a plain SqliteSaver, with and without
+DeltaCheckpointSaver, then measures ``get_state`` on the latest checkpoint
+from a fresh saver (cold: nothing cached) and again (warm). A last check runs
+TunedSqliteSaver retention (keep_last well below snapshot_every, and an age
+cutoff halfway through the thread) under delta checkpoints and reloads the
+state from a cold saver.
+
+    python benchmark_delta_checkpoints.py --turns 25 50 100 200 --snapshot-every 20
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph, add_messages
+
+from tuned_sqlite_saver import TunedSqliteSaver
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from delta_checkpointer import DeltaCheckpointSaver  # noqa: E402
+
+REPLY = ("Sure! Here is a detailed answer that is about as long as a typical chatbot reply. " * 4).strip()
+
+
+class BasicChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def chatbot(state: BasicChatState):
+    return {"messages": [AIMessage(content=REPLY)]}
+
+
+def build_app(checkpointer):
+    graph = StateGraph(BasicChatState)
+    graph.add_node("chatbot", chatbot)
+    graph.add_edge("chatbot", END)
+    graph.set_entry_point("chatbot")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def stored_bytes(conn):
+    checkpoints = conn.execute("SELECT COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints").fetchone()[0]
+    writes = conn.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes").fetchone()[0]
+    return checkpoints + writes
+
+
+def run(path, turns, delta, snapshot_every):
+    def make_saver(conn):
+        saver = SqliteSaver(conn)
+        return DeltaCheckpointSaver(saver, snapshot_every=snapshot_every) if delta else saver
+
+    config = {"configurable": {"thread_id": "1"}}
+    conn = sqlite3.connect(path, check_same_thread=False)
+    app = build_app(make_saver(conn))
+    start = time.perf_counter()
+    for turn in range(turns):
+        app.invoke({"messages": [HumanMessage(content=f"Question number {turn}: tell me more please.")]}, config)
+    write_seconds = time.perf_counter() - start
+    written = stored_bytes(conn)
+    conn.close()
+
+    conn = sqlite3.connect(path, check_same_thread=False)
+    app = build_app(make_saver(conn))
+    start = time.perf_counter()
+    state = app.get_state(config)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    app.get_state(config)
+    warm = time.perf_counter() - start
+    conn.close()
+    assert len(state.values["messages"]) == 2 * turns
+    return written, write_seconds / turns, cold, warm, state.values["messages"]
+
+
+def check_retention(path, turns, snapshot_every, keep_last=3):
+    """Retention must leave every surviving delta its chain back to a snapshot."""
+    config = {"configurable": {"thread_id": "1"}}
+    sqlite_saver = TunedSqliteSaver(path, keep_last=keep_last, maintenance_interval=None)
+    app = build_app(DeltaCheckpointSaver(sqlite_saver, snapshot_every=snapshot_every))
+    for turn in range(turns):
+        if turn == turns // 2:
+            midpoint = time.time()
+        app.invoke({"messages": [HumanMessage(content=f"Question number {turn}: tell me more please.")]}, config)
+    sqlite_saver.max_age = time.time() - midpoint
+    deleted = sqlite_saver.run_maintenance()["deleted_checkpoints"]
+    remaining = sqlite_saver.conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    state = build_app(DeltaCheckpointSaver(sqlite_saver, snapshot_every=snapshot_every)).get_state(config)
+    sqlite_saver.close()
+    assert deleted > 0, "retention should have deleted something"
+    assert len(state.values["messages"]) == 2 * turns, "retention cut a delta chain"
+    return deleted, remaining
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--snapshot-every", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'turns':>5} {'mode':<6} {'bytes written':>14} {'ms/turn':>8} {'cold load ms':>13} {'warm load ms':>13}")
+    with tempfile.TemporaryDirectory(prefix="delta-checkpoints-") as workdir:
+        for turns in args.turns:
+            results = {}
+            for mode in ("full", "delta"):
+                path = os.path.join(workdir, f"{mode}-{turns}.sqlite")
+                written, per_turn, cold, warm, messages = run(path, turns, mode == "delta", args.snapshot_every)
+                results[mode] = [(message.type, message.content) for message in messages]  # ids are random
+                print(f"{turns:>5} {mode:<6} {written:>14,} {per_turn * 1000:>8.2f} {cold * 1000:>13.2f} {warm * 1000:>13.2f}")
+            assert results["full"] == results["delta"], "delta checkpoints must rebuild the same messages"
+
+        turns = max(args.turns)
+        deleted, remaining = check_retention(os.path.join(workdir, "retention.sqlite"), turns, args.snapshot_every)
+        print(f"\nretention (keep_last=3, max_age at turn {turns // 2}) after {turns} turns: "
+              f"deleted {deleted}, kept {remaining} for the delta chain, state reloads intact")
+
+
+if __name__ == "__main__":
+    main()
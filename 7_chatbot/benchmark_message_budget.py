@@ -0,0 +1,126 @@
+"""Prompt tokens per turn with add_messages vs the token-budgeted history.
+
+Replays a long chat through the 2_chatbot_with_tools.py graph shape
+(chatbot -> tool_node -> chatbot) with a scripted fake model: every third
+user turn triggers a tool call. The fake model records the size of every
+prompt it receives and checks that no ToolMessage reaches it without the
+AIMessage that requested it. The budgeted run puts summarize_node in front of
+the chatbot (LLM summary at --max-tokens) over the pure reducer (hard cap at
+twice that), as the 3_/4_ chat scripts do.
+
+    python benchmark_message_budget.py --turns 60 --max-tokens 2000
+"""
+import argparse
+from typing import Annotated, Any, List, Optional, TypedDict
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph, add_messages
+from langgraph.prebuilt import ToolNode
+
+from message_budget import SUMMARY_ID, approximate_tokens, summarize_node, token_budget_reducer
+
+REPLY = "Here is a fairly detailed answer covering the main points you asked about, with an example or two. " * 3
+
+
+@tool
+def search(query: str) -> str:
+    """Search the web."""
+    return f"Top results for {query}: " + "some relevant snippet of text. " * 12
+
+
+class ScriptedChatModel(BaseChatModel):
+    prompt_tokens: List[int] = []
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def bind_tools(self, tools, **kwargs: Any):
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if "running summary" in str(messages[0].content):
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(
+                content="User asked a series of questions about the project; assistant answered and searched twice."))])
+        requested = {call["id"] for m in messages if isinstance(m, AIMessage) for call in m.tool_calls}
+        orphans = [m for m in messages if isinstance(m, ToolMessage) and m.tool_call_id not in requested]
+        assert not orphans, "a tool result reached the model without its tool call"
+        self.prompt_tokens.append(approximate_tokens(messages))
+        last = messages[-1]
+        if isinstance(last, HumanMessage) and "search" in last.content:
+            message = AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": last.content},
+                                                         "id": f"call_{self.calls}"}])
+        else:
+            message = AIMessage(content=REPLY)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def build_app(llm, reducer, summarize=None):
+    class State(TypedDict):
+        messages: Annotated[list, reducer]
+
+    def chatbot(state: State):
+        return {"messages": [llm.invoke(state["messages"])]}
+
+    def tools_router(state: State):
+        return "tool_node" if getattr(state["messages"][-1], "tool_calls", None) else END
+
+    graph = StateGraph(State)
+    graph.add_node("chatbot", chatbot)
+    graph.add_node("tool_node", ToolNode(tools=[search]))
+    if summarize is None:
+        graph.set_entry_point("chatbot")
+    else:
+        graph.add_node("summarize", summarize)
+        graph.add_edge("summarize", "chatbot")
+        graph.set_entry_point("summarize")
+    graph.add_conditional_edges("chatbot", tools_router)
+    graph.add_edge("tool_node", "chatbot")
+    return graph.compile(checkpointer=MemorySaver())
+
+
+def replay(llm, reducer, turns, summarize=None):
+    llm.prompt_tokens = []
+    app = build_app(llm, reducer, summarize)
+    config = {"configurable": {"thread_id": "1"}}
+    app.invoke({"messages": [SystemMessage(content="You are a helpful assistant.")]}, config)
+    per_turn = []
+    for turn in range(turns):
+        text = f"please search for topic {turn}" if turn % 3 == 2 else f"Tell me more about point {turn}."
+        before = len(llm.prompt_tokens)
+        app.invoke({"messages": [HumanMessage(content=text)]}, config)
+        per_turn.append(sum(llm.prompt_tokens[before:]))
+    messages = app.get_state(config).values["messages"]
+    summaries = [i for i, message in enumerate(messages) if message.id == SUMMARY_ID]
+    assert summaries in ([], [1]), "the running summary must follow the system prompt"
+    return per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--max-tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    llm = ScriptedChatModel()
+    full = replay(llm, add_messages, args.turns)
+    summary_llm = ScriptedChatModel()
+    budgeted = replay(llm, token_budget_reducer(max_tokens=2 * args.max_tokens), args.turns,
+                      summarize_node(summary_llm, max_tokens=args.max_tokens))
+
+    print(f"{'turn':>4} {'add_messages':>13} {'budgeted':>9}")
+    for turn in range(0, args.turns, max(1, args.turns // 12)):
+        print(f"{turn + 1:>4} {full[turn]:>13} {budgeted[turn]:>9}")
+    print(f"total prompt tokens: add_messages {sum(full)}, budgeted {sum(budgeted)} "
+          f"(+ {summary_llm.calls} summary calls)")
+
+
+if __name__ == "__main__":
+    main()
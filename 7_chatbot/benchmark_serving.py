@@ -0,0 +1,180 @@
+"""Load generator for serve.py: throughput and latency percentiles.
+
+Virtual users each open their own ``thread_id`` and send ``--turns`` messages
+one after another (like a person typing), all users at once. Without
+``--url`` the script starts serve.py in-process with a FakeChatModel of
+``--latency`` seconds, so the numbers show the serving overhead rather than a
+provider's speed. ``--cancel-ratio`` makes that fraction of requests give up
+halfway, which exercises server-side cancellation.
+
+    python benchmark_serving.py --users 200 --turns 5 --latency 0.3
+    python benchmark_serving.py --transport ws --stream --users 200
+    python benchmark_serving.py --url http://127.0.0.1:8080 --users 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import List, Optional
+
+import aiohttp
+from langgraph.checkpoint.memory import MemorySaver
+
+from fake_llm import FakeChatModel
+from serve import ChatServer, build_chat_graph, start_server
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Results:
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.first_token: List[float] = []
+        self.rejected = 0
+        self.cancelled = 0
+        self.errors = 0
+
+
+async def http_turn(session, url, thread_id, message, stream, give_up: Optional[float], results: Results):
+    start = time.perf_counter()
+    try:
+        async with asyncio.timeout(give_up):
+            async with session.post(f"{url}/chat", json={"thread_id": thread_id, "message": message,
+                                                         "stream": stream}) as response:
+                if response.status == 429:
+                    results.rejected += 1
+                    return False
+                if response.status != 200:
+                    results.errors += 1
+                    return False
+                if stream:
+                    first = True
+                    async for _ in response.content:
+                        if first:
+                            results.first_token.append(time.perf_counter() - start)
+                            first = False
+                else:
+                    await response.json()
+    except TimeoutError:
+        results.cancelled += 1
+        return False
+    results.latencies.append(time.perf_counter() - start)
+    return True
+
+
+async def ws_user(session, url, turns, cancel_ratio, latency, results: Results):
+    thread_id = str(uuid.uuid4())
+    async with session.ws_connect(f"{url}/ws") as ws:
+        for turn in range(turns):
+            request_id = f"{thread_id}-{turn}"
+            start = time.perf_counter()
+            await ws.send_json({"type": "chat", "id": request_id, "thread_id": thread_id,
+                                "message": f"Turn {turn}: tell me something useful."})
+            cancel_at = start + latency / 2 if random.random() < cancel_ratio else None
+            first = True
+            while True:
+                timeout = None if cancel_at is None else max(0.0, cancel_at - time.perf_counter())
+                try:
+                    msg = await ws.receive(timeout=timeout)
+                except asyncio.TimeoutError:
+                    await ws.send_json({"type": "cancel", "id": request_id})
+                    cancel_at = None
+                    continue
+                event = json.loads(msg.data)
+                if event["type"] == "token" and first:
+                    results.first_token.append(time.perf_counter() - start)
+                    first = False
+                elif event["type"] == "done":
+                    results.latencies.append(time.perf_counter() - start)
+                    break
+                elif event["type"] == "cancelled":
+                    results.cancelled += 1
+                    break
+                elif event["type"] == "error":
+                    if event["error"] == "overloaded":
+                        results.rejected += 1
+                    else:
+                        results.errors += 1
+                    break
+
+
+async def http_user(session, url, turns, stream, cancel_ratio, latency, results: Results):
+    thread_id = str(uuid.uuid4())
+    for turn in range(turns):
+        give_up = latency / 2 if random.random() < cancel_ratio else None
+        await http_turn(session, url, thread_id, f"Turn {turn}: tell me something useful.", stream, give_up, results)
+
+
+async def run(args) -> None:
+    runner = server = None
+    url = args.url
+    if url is None:
+        llm = FakeChatModel(latency=args.latency, tokens_per_second=args.tokens_per_second)
+        server = ChatServer(build_chat_graph(llm, MemorySaver()), max_concurrency=args.max_concurrency,
+                            max_pending=args.max_pending)
+        runner = await start_server(server, "127.0.0.1", args.port)
+        url = f"http://127.0.0.1:{args.port}"
+
+    results = Results()
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        if args.transport == "ws":
+            users = [ws_user(session, url, args.turns, args.cancel_ratio, args.latency, results)
+                     for _ in range(args.users)]
+        else:
+            users = [http_user(session, url, args.turns, args.stream, args.cancel_ratio, args.latency, results)
+                     for _ in range(args.users)]
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.5)  # let the server record cancellations of abandoned requests
+        async with session.get(f"{url}/stats") as response:
+            server_stats = await response.json()
+
+    if runner is not None:
+        await runner.cleanup()
+        # Cancelled turns must not leave graph tasks behind on the server's loop.
+        leaked = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert not leaked, f"{len(leaked)} tasks still pending after shutdown: {leaked[:3]}"
+
+    done = len(results.latencies)
+    print(f"{args.users} users x {args.turns} turns over {args.transport}"
+          f"{' (streaming)' if args.stream or args.transport == 'ws' else ''}, fake latency {args.latency}s")
+    print(f"completed {done}, rejected {results.rejected}, cancelled {results.cancelled}, errors {results.errors} "
+          f"in {elapsed:.2f}s -> {done / elapsed:.1f} turns/s")
+    print(f"latency  p50 {percentile(results.latencies, 0.5) * 1000:.0f} ms   "
+          f"p99 {percentile(results.latencies, 0.99) * 1000:.0f} ms")
+    if results.first_token:
+        print(f"first token p50 {percentile(results.first_token, 0.5) * 1000:.0f} ms   "
+              f"p99 {percentile(results.first_token, 0.99) * 1000:.0f} ms")
+    if server is not None:
+        print(f"one blocking input() loop would serve {1 / args.latency:.1f} turns/s at best")
+    print(f"server: {server_stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="target a running serve.py instead of an in-process one")
+    parser.add_argument("--transport", choices=["http", "ws"], default="http")
+    parser.add_argument("--stream", action="store_true", help="stream tokens over HTTP (ws always streams)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--cancel-ratio", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=256)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
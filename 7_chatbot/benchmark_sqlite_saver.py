@@ -0,0 +1,101 @@
+"""Multi-threaded checkpoint throughput: stock SqliteSaver vs TunedSqliteSaver.
+
+Each worker thread chats on its own thread_id through the same graph shape
+as 4_chat_with_sqlite_checkpointer.py, with an instant fake chatbot node so
+only checkpointing is measured. Every turn reads the latest checkpoint and
+writes new ones. A read-only phase then calls ``get_state`` from all threads
+at once, and a retention pass shows the database shrinking.
+
+    python benchmark_sqlite_saver.py --threads 16 --turns 40
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph, add_messages
+
+from tuned_sqlite_saver import TunedSqliteSaver
+
+
+class BasicChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def chatbot(state: BasicChatState):
+    return {"messages": [AIMessage(content=f"Echo: {state['messages'][-1].content}")]}
+
+
+def build_app(checkpointer):
+    graph = StateGraph(BasicChatState)
+    graph.add_node("chatbot", chatbot)
+    graph.add_edge("chatbot", END)
+    graph.set_entry_point("chatbot")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def file_size(path):
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+
+def run(label, memory, path, threads, turns):
+    app = build_app(memory)
+
+    def chat(worker):
+        config = {"configurable": {"thread_id": f"user-{worker}"}}
+        for turn in range(turns):
+            app.invoke({"messages": [HumanMessage(content=f"message {turn} from user {worker}")]}, config=config)
+
+    def read(worker):
+        config = {"configurable": {"thread_id": f"user-{worker}"}}
+        for _ in range(turns):
+            app.get_state(config)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(chat, range(threads)))
+        write_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        list(pool.map(read, range(threads)))
+        read_seconds = time.perf_counter() - start
+
+    turns_total = threads * turns
+    print(f"{label:<8} chat {turns_total / write_seconds:>8.0f} turns/s   "
+          f"get_state {turns_total / read_seconds:>8.0f} reads/s   db {file_size(path) / 1e6:>6.2f} MB")
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--keep-last", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sqlite-saver-bench-") as workdir:
+        path = os.path.join(workdir, "stock.sqlite")
+        conn = sqlite3.connect(path, check_same_thread=False)
+        run("stock", SqliteSaver(conn), path, args.threads, args.turns)
+        conn.close()
+
+        path = os.path.join(workdir, "tuned.sqlite")
+        with TunedSqliteSaver(path, keep_last=args.keep_last, maintenance_interval=None) as memory:
+            app = run("tuned", memory, path, args.threads, args.turns)
+            print(f"         {memory.stats()}")
+
+            before = file_size(path)
+            start = time.perf_counter()
+            result = memory.run_maintenance()
+            print(f"retention keep_last={args.keep_last}: deleted {result['deleted_checkpoints']} checkpoints "
+                  f"in {time.perf_counter() - start:.2f}s, db {before / 1e6:.2f} MB -> {file_size(path) / 1e6:.2f} MB")
+            state = app.get_state({"configurable": {"thread_id": "user-0"}})
+            assert len(state.values["messages"]) == 2 * args.turns, "latest state must survive retention"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Concurrent ToolNode graphs against a rate-limited search stub: unlimited vs ToolLimiter.
+
+``--users`` threads each run one turn of the 2_chatbot_with_tools graph (the
+streaming fake model from benchmarks/fakes.py calls the search tool once, then
+answers). Questions are drawn from ``--distinct`` templates, so some users ask
+the same thing at the same time.
+
+The search tool is a local stub of a rate-limited provider: it admits
+``--provider-rate`` requests per second (burst ``--provider-burst``) and
+``--provider-concurrency`` at once, each taking ``--tool-latency`` seconds.
+Anything beyond that is answered with a 429, and the client backs off
+exponentially and retries, as an HTTP search client does.
+
+* unlimited:          tools passed to ToolNode as they are
+* limited:            ToolLimiter with the provider's limits, no coalescing
+* limited+coalesced:  the same, identical in-flight calls share one request
+
+    python benchmark_tool_limiter.py --users 40 --distinct 10
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+warnings.filterwarnings("ignore")
+sys.path.extend(str(Path(__file__).resolve().parent.parent / folder) for folder in ("benchmarks", "shared"))
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langchain_core.tools import BaseTool  # noqa: E402
+from langgraph.graph import END, StateGraph, add_messages  # noqa: E402
+from langgraph.prebuilt import ToolNode  # noqa: E402
+
+from fakes import ScriptedChatModel  # noqa: E402
+from tool_limiter import ToolLimiter, ToolLimits  # noqa: E402
+
+TOPICS = ["Chennai weather", "Bangalore traffic", "SpaceX launches", "LangGraph releases", "Tokyo population",
+          "Mumbai monsoon", "GPU prices", "Python 3.13 features", "Paris museums", "Nairobi startups",
+          "Oslo housing", "Lima cuisine", "Cairo history", "Perth beaches", "Hanoi street food"]
+
+
+class RateLimitedProvider:
+    """Server side of the stub: token bucket plus a concurrency cap; rejects (429) instead of queueing."""
+
+    def __init__(self, rate: float, burst: int, concurrency: int, latency: float):
+        self.rate = rate
+        self.capacity = float(burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.latency = latency
+        self.requests = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def request(self, query: str) -> str:
+        with self._lock:
+            self.requests += 1
+        if not self.slots.acquire(blocking=False):
+            return self._reject()
+        try:
+            if not self._take_token():
+                return self._reject()
+            time.sleep(self.latency)
+            return f"Results for '{query}'"
+        finally:
+            self.slots.release()
+
+    def _reject(self):
+        with self._lock:
+            self.rejected += 1
+        return None
+
+
+class StubSearchTool(BaseTool):
+    """Client of the stub provider with exponential backoff on 429."""
+
+    name: str = "tavily_search_results_json"
+    description: str = "A search engine. Input should be a search query."
+    provider: RateLimitedProvider
+    initial_backoff: float = 0.25
+    backoff_seconds: float = 0.0
+
+    def _run(self, query: str) -> str:
+        backoff = self.initial_backoff
+        while True:
+            result = self.provider.request(query)
+            if result is not None:
+                return result
+            self.backoff_seconds += backoff
+            time.sleep(backoff * (1 + random.random() * 0.2))
+            backoff = min(backoff * 2, 4.0)
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_app(llm, tools):
+    llm_with_tools = llm.bind_tools(tools=tools)
+
+    def chatbot(state: ChatState):
+        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+
+    def tools_router(state: ChatState):
+        last_message = state["messages"][-1]
+        return "tool_node" if getattr(last_message, "tool_calls", None) else END
+
+    graph = StateGraph(ChatState)
+    graph.add_node("chatbot", chatbot)
+    graph.add_node("tool_node", ToolNode(tools=tools))
+    graph.set_entry_point("chatbot")
+    graph.add_conditional_edges("chatbot", tools_router)
+    graph.add_edge("tool_node", "chatbot")
+    return graph.compile()
+
+
+def run_variant(name: str, args, questions):
+    random.seed(0)
+    provider = RateLimitedProvider(args.provider_rate, args.provider_burst, args.provider_concurrency,
+                                   args.tool_latency)
+    search_tool = StubSearchTool(provider=provider)
+    limiter = None
+    tools = [search_tool]
+    if name != "unlimited":
+        limiter = ToolLimiter(max_concurrency=args.provider_concurrency * 2,
+                              limits={search_tool.name: ToolLimits(max_concurrency=args.provider_concurrency,
+                                                                   rate=args.provider_rate,
+                                                                   burst=args.provider_burst)},
+                              coalesce=name == "limited+coalesced")
+        tools = limiter.wrap(tools)
+    app = build_app(ScriptedChatModel(latency=args.latency), tools)
+
+    def turn(question):
+        start = time.perf_counter()
+        result = app.invoke({"messages": [HumanMessage(content=question)]})
+        assert "Results for" in result["messages"][-2].content
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        latencies = list(executor.map(turn, questions))
+    wall = time.perf_counter() - start
+    return {"wall": wall, "p50": statistics.median(latencies), "max": max(latencies),
+            "requests": provider.requests, "rejected": provider.rejected,
+            "backoff": search_tool.backoff_seconds, "limiter": limiter}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=40, help="concurrent chat turns")
+    parser.add_argument("--distinct", type=int, default=10, help="distinct questions among the users")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="provider latency per request (s)")
+    parser.add_argument("--provider-rate", type=float, default=10.0, help="provider requests per second")
+    parser.add_argument("--provider-burst", type=int, default=5)
+    parser.add_argument("--provider-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    questions = [f"Latest news about {rng.choice(TOPICS[:args.distinct])}?" for _ in range(args.users)]
+    print(f"{args.users} concurrent turns, {len(set(questions))} distinct questions; provider: "
+          f"{args.provider_rate:g} req/s (burst {args.provider_burst}), {args.provider_concurrency} at once, "
+          f"{args.tool_latency}s per request")
+    print(f"{'variant':<19} {'wall s':>7} {'turn p50 s':>11} {'turn max s':>11} {'provider reqs':>14} "
+          f"{'429s':>6} {'backoff s':>10}")
+    limiters = {}
+    for name in ("unlimited", "limited", "limited+coalesced"):
+        r = run_variant(name, args, questions)
+        limiters[name] = r["limiter"]
+        print(f"{name:<19} {r['wall']:>7.2f} {r['p50']:>11.2f} {r['max']:>11.2f} {r['requests']:>14} "
+              f"{r['rejected']:>6} {r['backoff']:>10.2f}")
+    for name, limiter in limiters.items():
+        if limiter is not None:
+            print(f"\n{name}: queue wait vs execution per tool")
+            print(limiter.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Offline stand-in for ChatGroq with configurable latency and streaming speed.
+
+``FakeChatModel`` answers every prompt with a canned reply after ``latency``
+seconds. With ``tokens_per_second`` set it streams the reply word by word, so
+``astream(..., stream_mode="messages")`` behaves like a real provider. The
+async path sleeps with ``asyncio.sleep`` and never blocks the event loop.
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+DEFAULT_REPLY = "Sure! Here is a short, friendly answer to your question with one practical tip you can try today."
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.2
+    tokens_per_second: float = 0.0
+    reply: str = DEFAULT_REPLY
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools, **kwargs: Any):
+        return self
+
+    def _text(self, messages: List[BaseMessage]) -> str:
+        return f"({len(messages)} messages in context) {self.reply}"
+
+    def _pieces(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        text = self._text(messages)
+        time.sleep(self.latency + self._token_delay() * len(self._pieces(text)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        text = self._text(messages)
+        await asyncio.sleep(self.latency + self._token_delay() * len(self._pieces(text)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self.calls += 1
+        time.sleep(self.latency)
+        for piece in self._pieces(self._text(messages)):
+            time.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        for piece in self._pieces(self._text(messages)):
+            await asyncio.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
@@ -0,0 +1,208 @@
+"""Token-budgeted replacement for the ``add_messages`` reducer.
+
+``messages: Annotated[list, add_messages]`` grows with every turn, and the
+chatbots send all of it to the model. ``token_budget_reducer`` merges updates
+exactly like ``add_messages`` and then, once the history exceeds
+``max_tokens``:
+
+* keeps system messages and the most recent turns verbatim;
+* drops whole turns only (a turn starts at a ``HumanMessage``), so an
+  ``AIMessage`` with tool calls is never separated from its ``ToolMessage``s;
+* folds the dropped turns into one running-summary ``SystemMessage``. The
+  summarizer sees only the previous summary plus the turns being dropped,
+  never the whole history again.
+
+It trims down to ``target_ratio * max_tokens`` rather than just under the
+limit, so the summarizer runs once every few turns instead of on every turn.
+
+The reducer is a pure function, so its summarizer is too (extractive by
+default). For an LLM-written summary, add :func:`summarize_node` to the graph
+in front of the model: it makes the same trimming decision, calls the LLM
+with the node's config (traced, and awaited on the async path), and returns
+``RemoveMessage``s for the dropped turns plus the new summary. The reducer
+then only acts as a hard cap above the node's budget.
+"""
+import json
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import add_messages
+
+SUMMARY_ID = "conversation-summary"
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+Summarizer = Callable[[str, Sequence[BaseMessage]], str]
+
+summary_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You keep a concise running summary of a conversation between a user and an assistant. "
+                   "Extend the summary with the new messages. Keep names, numbers, decisions and open questions; "
+                   "drop small talk. Answer with the updated summary only."),
+        ("human", "Current summary:\n{summary}\n\nNew messages:\n{messages}"),
+    ]
+)
+
+
+def approximate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """About 4 characters per token plus a small per-message overhead; no tokenizer needed."""
+    chars = 0
+    for message in messages:
+        chars += len(message.content) if isinstance(message.content, str) else len(json.dumps(message.content))
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            chars += len(tool_call["name"]) + len(json.dumps(tool_call["args"]))
+    return chars // 4 + 3 * len(messages)
+
+
+def _transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            lines.append(f"tool result: {message.content}")
+        elif isinstance(message, AIMessage) and message.tool_calls:
+            calls = ", ".join(f"{call['name']}({json.dumps(call['args'])})" for call in message.tool_calls)
+            lines.append(f"assistant called: {calls}" + (f"\nassistant: {message.content}" if message.content else ""))
+        else:
+            lines.append(f"{message.type}: {message.content}")
+    return "\n".join(lines)
+
+
+def extractive_summarizer(max_chars_per_message: int = 160, max_chars: int = 2000) -> Summarizer:
+    """LLM-free fallback: keeps the start of each dropped message, newest last."""
+
+    def summarize(summary: str, messages: Sequence[BaseMessage]) -> str:
+        lines = [line[:max_chars_per_message] for line in _transcript(messages).splitlines()]
+        text = "\n".join(filter(None, [summary, *lines]))
+        return text[-max_chars:]
+
+    return summarize
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns; each turn starts at a HumanMessage."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _plan_trim(messages: Sequence[BaseMessage], max_tokens: int, target_ratio: float, keep_last_turns: int,
+               count_tokens: Callable[[Sequence[BaseMessage]], int]):
+    """``(system, summary, kept_turns, dropped)`` when ``messages`` are over budget, else ``None``."""
+    if count_tokens(messages) <= max_tokens:
+        return None
+    system = [m for m in messages if isinstance(m, SystemMessage) and m.id != SUMMARY_ID]
+    summary = next((m for m in messages if m.id == SUMMARY_ID), None)
+    turns = split_turns([m for m in messages if not isinstance(m, SystemMessage)])
+
+    target = int(max_tokens * target_ratio)
+    fixed = count_tokens(system) + (count_tokens([summary]) if summary is not None else 0)
+    sizes = [count_tokens(turn) for turn in turns]
+    remaining = sum(sizes)
+    dropped: List[BaseMessage] = []
+    while len(turns) > keep_last_turns and fixed + remaining > target:
+        turn = turns.pop(0)
+        remaining -= sizes.pop(0)
+        dropped.extend(turn)
+    if not dropped:
+        return None
+    return system, summary, turns, dropped
+
+
+def _previous_summary(summary: Optional[BaseMessage]) -> str:
+    return summary.content[len(SUMMARY_PREFIX):] if summary is not None else ""
+
+
+def _summary_first(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Move a summary appended by :func:`summarize_node` to just after the leading system messages."""
+    position = next((i for i, m in enumerate(messages) if m.id == SUMMARY_ID), None)
+    if position is None:
+        return messages
+    head = 0
+    while head < len(messages) and isinstance(messages[head], SystemMessage) and messages[head].id != SUMMARY_ID:
+        head += 1
+    if position == head:
+        return messages
+    summary = messages[position]
+    rest = messages[:position] + messages[position + 1:]
+    return rest[:head] + [summary] + rest[head:]
+
+
+def token_budget_reducer(
+    max_tokens: int = 4000,
+    summarizer: Optional[Summarizer] = None,
+    target_ratio: float = 0.6,
+    keep_last_turns: int = 1,
+    count_tokens: Callable[[Sequence[BaseMessage]], int] = approximate_tokens,
+):
+    """Build a reducer to use in place of ``add_messages``.
+
+    Args:
+        max_tokens: history size that triggers trimming.
+        summarizer: ``(previous_summary, dropped_messages) -> summary``, a pure function
+            (it runs inside the reducer); defaults to :func:`extractive_summarizer`.
+            For an LLM summary use :func:`summarize_node` instead.
+        target_ratio: trim down to this fraction of ``max_tokens``.
+        keep_last_turns: turns that are always kept verbatim, whatever their size.
+        count_tokens: token counter for a list of messages.
+    """
+    summarizer = summarizer or extractive_summarizer()
+
+    def reducer(left, right):
+        merged = _summary_first(add_messages(left, right))
+        plan = _plan_trim(merged, max_tokens, target_ratio, keep_last_turns, count_tokens)
+        if plan is None:
+            return merged
+        system, summary, turns, dropped = plan
+        summary = SystemMessage(content=SUMMARY_PREFIX + summarizer(_previous_summary(summary), dropped),
+                                id=SUMMARY_ID)
+        return [*system, summary, *(message for turn in turns for message in turn)]
+
+    return reducer
+
+
+def summarize_node(
+    llm,
+    max_tokens: int = 4000,
+    target_ratio: float = 0.6,
+    keep_last_turns: int = 1,
+    count_tokens: Callable[[Sequence[BaseMessage]], int] = approximate_tokens,
+    key: str = "messages",
+) -> RunnableLambda:
+    """Graph node that folds the oldest turns into an LLM-written running summary.
+
+    Put it in front of the model node, with ``token_budget_reducer`` on the
+    messages channel (which keeps the summary at the top of the history) and a
+    reducer ``max_tokens`` above this one. Returns no update while ``state[key]``
+    is within ``max_tokens``.
+    """
+    chain = summary_prompt | llm
+
+    def plan(state):
+        trim = _plan_trim(state[key], max_tokens, target_ratio, keep_last_turns, count_tokens)
+        if trim is None:
+            return None
+        _, summary, _, dropped = trim
+        return dropped, {"summary": _previous_summary(summary) or "(none yet)", "messages": _transcript(dropped)}
+
+    def update(dropped: Sequence[BaseMessage], text: str) -> dict:
+        summary = SystemMessage(content=SUMMARY_PREFIX + text.strip(), id=SUMMARY_ID)
+        return {key: [*(RemoveMessage(id=message.id) for message in dropped), summary]}
+
+    def summarize(state, config: RunnableConfig):
+        trim = plan(state)
+        if trim is None:
+            return {}
+        return update(trim[0], chain.invoke(trim[1], config).content)
+
+    async def asummarize(state, config: RunnableConfig):
+        trim = plan(state)
+        if trim is None:
+            return {}
+        return update(trim[0], (await chain.ainvoke(trim[1], config)).content)
+
+    return RunnableLambda(summarize, afunc=asummarize, name="summarize")
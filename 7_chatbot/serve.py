@@ -0,0 +1,352 @@
+"""Async HTTP / WebSocket server for the chatbot graph.
+
+The numbered scripts in this folder serve one user per process from a
+blocking ``input()`` loop. This server runs many ``thread_id``s concurrently
+through ``ainvoke`` / ``astream`` on one event loop:
+
+* ``POST /chat``   ``{"thread_id": "...", "message": "...", "stream": false}``
+  returns ``{"thread_id", "reply"}``; with ``"stream": true`` the reply is sent
+  as newline-delimited JSON token events.
+* ``GET /ws``      WebSocket. Send ``{"type": "chat", "id", "thread_id", "message"}``
+  to start a turn (tokens come back as ``{"id", "type": "token"}`` events, then
+  ``"done"``) and ``{"type": "cancel", "id"}`` to cancel it.
+* ``GET /stats``   counters and current load.
+
+Backpressure: at most ``max_concurrency`` turns run at once and at most
+``max_pending`` more wait for a slot. Beyond that requests are rejected
+immediately with 429 (or an ``"error"`` event) instead of queueing without
+bound. Turns on the same ``thread_id`` run one at a time, in arrival order.
+
+Cancellation: an HTTP client that disconnects cancels its turn, and so does a
+WebSocket ``cancel`` message or a closed socket. A cancelled turn keeps the
+user message in the thread, but no reply is stored for it.
+
+    python serve.py --port 8080                       # ChatGroq, needs GROQ_API_KEY
+    python serve.py --port 8080 --fake-latency 0.5    # offline, see fake_llm.py
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from contextlib import aclosing, asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Annotated, AsyncIterator, Dict, Optional, Set, TypedDict
+
+from aiohttp import WSMsgType, web
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langgraph.graph import END, StateGraph
+
+from message_budget import token_budget_reducer
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from bounded_memory_saver import BoundedMemorySaver  # noqa: E402
+from delta_checkpointer import DeltaCheckpointSaver  # noqa: E402
+
+
+class Overloaded(Exception):
+    """Raised when both the running slots and the waiting queue are full."""
+
+
+# Tasks created while a turn's producer runs (tasks inherit the context of the
+# task that creates them, so this also catches the graph's own helper tasks).
+_turn_tasks: ContextVar[Optional[Set[asyncio.Task]]] = ContextVar("turn_tasks", default=None)
+
+
+def _track_turn_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    """Install a task factory that records tasks into ``_turn_tasks``.
+
+    ``astream(stream_mode="messages")`` starts a waiter task per step that
+    langgraph only cancels when the step finishes normally. A turn cancelled
+    mid-step would leave it pending until it is garbage-collected ("Task was
+    destroyed but it is pending!"), so ``stream_turn`` cancels whatever is
+    still recorded here once the producer has stopped.
+    """
+    previous = loop.get_task_factory()
+    if getattr(previous, "tracks_turn_tasks", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+        tasks = _turn_tasks.get()
+        if tasks is not None:
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        return task
+
+    factory.tracks_turn_tasks = True
+    loop.set_task_factory(factory)
+
+
+def build_chat_graph(llm, checkpointer):
+    """The 3_chat_with_in_memory_checkpointer.py graph with an async chatbot node."""
+    # The reducer runs inside the event loop, so it uses the extractive
+    # summarizer: an LLM summary here would block every other thread.
+    budgeted_messages = token_budget_reducer(max_tokens=4000)
+
+    class BasicChatState(TypedDict):
+        messages: Annotated[list, budgeted_messages]
+
+    async def chatbot(state: BasicChatState):
+        return {"messages": [await llm.ainvoke(state["messages"])]}
+
+    graph = StateGraph(BasicChatState)
+    graph.add_node("chatbot", chatbot)
+    graph.add_edge("chatbot", END)
+    graph.set_entry_point("chatbot")
+    return graph.compile(checkpointer=checkpointer)
+
+
+class ChatServer:
+    """Admission control, per-thread ordering and cancellation around a compiled graph."""
+
+    def __init__(self, graph, max_concurrency: int = 32, max_pending: int = 128,
+                 request_timeout: float = 120.0) -> None:
+        self.graph = graph
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._admitted = 0
+        self._running = 0
+        self._thread_locks: Dict[str, asyncio.Lock] = {}
+        self._thread_users: Dict[str, int] = {}
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.failed = 0
+
+    @asynccontextmanager
+    async def _turn(self, thread_id: str):
+        """Admit one turn: reject if overloaded, else wait for the thread and a free slot."""
+        if self._admitted >= self.max_concurrency + self.max_pending:
+            self.rejected += 1
+            raise Overloaded()
+        self._admitted += 1
+        self._thread_users[thread_id] = self._thread_users.get(thread_id, 0) + 1
+        lock = self._thread_locks.setdefault(thread_id, asyncio.Lock())
+        try:
+            async with lock, self._slots:
+                self._running += 1
+                try:
+                    yield
+                finally:
+                    self._running -= 1
+            self.completed += 1
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1  # also counts turns cancelled while still waiting
+            raise
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._admitted -= 1
+            self._thread_users[thread_id] -= 1
+            if not self._thread_users[thread_id]:
+                del self._thread_users[thread_id]
+                del self._thread_locks[thread_id]
+
+    def _config(self, thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def run_turn(self, thread_id: str, message: str) -> str:
+        async with self._turn(thread_id):
+            result = await asyncio.wait_for(
+                self.graph.ainvoke({"messages": [HumanMessage(content=message)]}, self._config(thread_id)),
+                self.request_timeout,
+            )
+            return result["messages"][-1].content
+
+    async def stream_turn(self, thread_id: str, message: str) -> AsyncIterator[str]:
+        """Yield reply tokens as the model produces them."""
+        async with self._turn(thread_id):
+            tokens: asyncio.Queue = asyncio.Queue()
+
+            async def produce():
+                stream = self.graph.astream({"messages": [HumanMessage(content=message)]}, self._config(thread_id),
+                                            stream_mode="messages")
+                # On cancellation, close the stream here, so the graph's own tasks are
+                # cancelled and awaited instead of being garbage-collected while pending.
+                async with aclosing(stream):
+                    async for chunk, metadata in stream:
+                        if isinstance(chunk, AIMessageChunk) and metadata.get("langgraph_node") == "chatbot" \
+                                and chunk.content:
+                            tokens.put_nowait(chunk.content)
+
+            _track_turn_tasks(asyncio.get_running_loop())
+            spawned: Set[asyncio.Task] = set()
+            reset = _turn_tasks.set(spawned)
+            try:
+                producer = asyncio.create_task(produce())
+            finally:
+                _turn_tasks.reset(reset)
+            producer.add_done_callback(lambda _: tokens.put_nowait(None))
+            deadline = time.monotonic() + self.request_timeout
+            try:
+                while True:
+                    token = await asyncio.wait_for(tokens.get(), max(0.0, deadline - time.monotonic()))
+                    if token is None:
+                        break
+                    yield token
+                producer.result()  # surface errors raised inside the graph
+            finally:
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+                leftovers = list(spawned)
+                for task in leftovers:
+                    task.cancel()
+                await asyncio.gather(*leftovers, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "waiting": self._admitted - self._running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+        }
+
+    # -- HTTP / WebSocket --------------------------------------------------
+
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        thread_id, message = str(body["thread_id"]), body["message"]
+        if not body.get("stream"):
+            try:
+                reply = await self.run_turn(thread_id, message)
+            except Overloaded:
+                return web.json_response({"error": "overloaded"}, status=429, headers={"Retry-After": "1"})
+            except asyncio.TimeoutError:
+                return web.json_response({"error": "timeout"}, status=504)
+            return web.json_response({"thread_id": thread_id, "reply": reply})
+
+        tokens = self.stream_turn(thread_id, message)
+        try:
+            first = await tokens.__anext__()
+        except Overloaded:
+            return web.json_response({"error": "overloaded"}, status=429, headers={"Retry-After": "1"})
+        except asyncio.TimeoutError:
+            return web.json_response({"error": "timeout"}, status=504)
+        except StopAsyncIteration:
+            first = None
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        try:
+            if first is not None:
+                await response.write(json.dumps({"type": "token", "content": first}).encode() + b"\n")
+                async for token in tokens:
+                    await response.write(json.dumps({"type": "token", "content": token}).encode() + b"\n")
+            await response.write(json.dumps({"type": "done"}).encode() + b"\n")
+        except asyncio.TimeoutError:
+            await response.write(json.dumps({"type": "error", "error": "timeout"}).encode() + b"\n")
+        finally:
+            await tokens.aclose()
+        await response.write_eof()
+        return response
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(request_id: str, thread_id: str, message: str) -> None:
+            reply = []
+            try:
+                async for token in self.stream_turn(thread_id, message):
+                    reply.append(token)
+                    await ws.send_json({"id": request_id, "type": "token", "content": token})
+                await ws.send_json({"id": request_id, "type": "done", "content": "".join(reply)})
+            except Overloaded:
+                await ws.send_json({"id": request_id, "type": "error", "error": "overloaded"})
+            except asyncio.TimeoutError:
+                await ws.send_json({"id": request_id, "type": "error", "error": "timeout"})
+            except asyncio.CancelledError:
+                if not ws.closed:
+                    await ws.send_json({"id": request_id, "type": "cancelled"})
+            finally:
+                tasks.pop(request_id, None)
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                event = json.loads(msg.data)
+                if event.get("type") == "chat":
+                    request_id = str(event["id"])
+                    tasks[request_id] = asyncio.create_task(
+                        run(request_id, str(event["thread_id"]), event["message"]))
+                elif event.get("type") == "cancel" and str(event.get("id")) in tasks:
+                    tasks[str(event["id"])].cancel()
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return ws
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/chat", self.handle_chat)
+        app.router.add_get("/ws", self.handle_ws)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+
+async def start_server(server: ChatServer, host: str = "127.0.0.1", port: int = 8080) -> web.AppRunner:
+    # handler_cancellation cancels the handler (and the graph run) when the client disconnects
+    runner = web.AppRunner(server.make_app(), handler_cancellation=True)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=128)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--fake-latency", type=float, default=None,
+                        help="serve a FakeChatModel with this latency instead of ChatGroq")
+    parser.add_argument("--fake-tokens-per-second", type=float, default=50.0)
+    args = parser.parse_args()
+
+    if args.fake_latency is not None:
+        from fake_llm import FakeChatModel
+        llm = FakeChatModel(latency=args.fake_latency, tokens_per_second=args.fake_tokens_per_second)
+    else:
+        from dotenv import load_dotenv
+        from langchain_groq import ChatGroq
+        load_dotenv()
+        llm = ChatGroq(model="llama-3.1-8b-instant")
+
+    memory = DeltaCheckpointSaver(BoundedMemorySaver(max_bytes=256 * 1024 * 1024, idle_ttl=3600))
+    server = ChatServer(build_chat_graph(llm, memory), max_concurrency=args.max_concurrency,
+                        max_pending=args.max_pending, request_timeout=args.request_timeout)
+
+    async def serve():
+        runner = await start_server(server, args.host, args.port)
+        print(f"Serving on http://{args.host}:{args.port} (POST /chat, GET /ws, GET /stats)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
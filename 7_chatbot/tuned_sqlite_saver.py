@@ -0,0 +1,363 @@
+"""A SqliteSaver tuned for many concurrent conversations.
+
+The stock ``SqliteSaver`` shares one connection behind one lock: every read
+waits for every write, and every checkpoint write is its own transaction and
+fsync. ``TunedSqliteSaver`` keeps the same schema and SQL but
+
+* runs the database in WAL mode with ``synchronous=NORMAL``;
+* sends all writes through a single writer thread that group-commits whatever
+  is queued (up to ``batch_size`` write calls) in one transaction, while each
+  caller still blocks until its own write is durable;
+* gives every reading thread its own connection, so reads never wait for the
+  writer or for each other;
+* optionally enforces retention (keep the last ``keep_last`` checkpoints per
+  thread, drop checkpoints older than ``max_age`` seconds) and reclaims the
+  freed space from a background timer. Retention never deletes a checkpoint
+  that a surviving ``DeltaCheckpointSaver`` delta still needs: each
+  checkpoint's ``delta_depth`` metadata says how far back its chain goes.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Number of 100-ns intervals between the UUID epoch (1582-10-15) and the Unix epoch.
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+_EXPIRED_TABLE_SQL = "CREATE TEMP TABLE IF NOT EXISTS expired_checkpoints (id INTEGER PRIMARY KEY)"
+
+_KEEP_LAST_SQL = """
+INSERT OR IGNORE INTO expired_checkpoints
+SELECT rowid FROM (
+    SELECT rowid, ROW_NUMBER() OVER (
+        PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+    ) AS position
+    FROM checkpoints
+) WHERE position > ?
+"""
+
+_MAX_AGE_SQL = "INSERT OR IGNORE INTO expired_checkpoints SELECT rowid FROM checkpoints WHERE checkpoint_id < ?"
+
+# A checkpoint with delta_depth > 0 is a delta on its parent: keep the parents
+# of every surviving checkpoint, recursively, until the chain reaches a snapshot.
+_KEEP_DELTA_BASES_SQL = """
+WITH RECURSIVE needed(id, thread_id, checkpoint_ns, parent_checkpoint_id, depth) AS (
+    SELECT rowid, thread_id, checkpoint_ns, parent_checkpoint_id,
+           COALESCE(json_extract(CAST(metadata AS TEXT), '$.delta_depth'), 0)
+    FROM checkpoints WHERE rowid NOT IN (SELECT id FROM expired_checkpoints)
+    UNION
+    SELECT c.rowid, c.thread_id, c.checkpoint_ns, c.parent_checkpoint_id,
+           COALESCE(json_extract(CAST(c.metadata AS TEXT), '$.delta_depth'), 0)
+    FROM checkpoints c JOIN needed n
+      ON c.thread_id = n.thread_id AND c.checkpoint_ns = n.checkpoint_ns
+     AND c.checkpoint_id = n.parent_checkpoint_id
+    WHERE n.depth > 0
+)
+DELETE FROM expired_checkpoints WHERE id IN (SELECT id FROM needed)
+"""
+
+_ORPHAN_WRITES_SQL = """
+DELETE FROM writes WHERE NOT EXISTS (
+    SELECT 1 FROM checkpoints c
+    WHERE c.thread_id = writes.thread_id
+      AND c.checkpoint_ns = writes.checkpoint_ns
+      AND c.checkpoint_id = writes.checkpoint_id
+)
+"""
+
+
+def checkpoint_id_floor(timestamp: float) -> str:
+    """Smallest checkpoint id created at or after ``timestamp`` (Unix seconds).
+
+    LangGraph checkpoint ids are UUIDv6, whose string form sorts by creation
+    time, so age-based retention is a plain ``checkpoint_id < ?`` comparison.
+    """
+    ticks = int(timestamp * 10_000_000) + _UUID_EPOCH_OFFSET
+    value = ((ticks >> 12) & 0xFFFFFFFFFFFF) << 80 | 6 << 76 | (ticks & 0x0FFF) << 64
+    text = f"{value:032x}"
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+
+class _QueuedCursor:
+    """Cursor handed to the inherited ``put``/``put_writes``: it records the
+    statements and submits them to the writer queue when the block exits."""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, Any, bool]] = []
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> None:
+        self.statements.append((sql, parameters, False))
+
+    def executemany(self, sql: str, seq_of_parameters) -> None:
+        self.statements.append((sql, list(seq_of_parameters), True))
+
+
+class _Job:
+    __slots__ = ("statements", "action", "transactional", "future")
+
+    def __init__(self, statements=None, action=None, transactional=True):
+        self.statements = statements or []
+        self.action = action
+        self.transactional = transactional
+        self.future: Future = Future()
+
+
+class TunedSqliteSaver(SqliteSaver):
+    """SQLite checkpointer with WAL, group commit, per-thread readers and retention.
+
+    Args:
+        path: database file.
+        batch_size: most queued write jobs committed in one transaction.
+        keep_last: keep only the newest N checkpoints per thread (``None`` keeps all),
+            plus whatever older checkpoints their delta chains still need.
+        max_age: drop checkpoints older than this many seconds (``None`` keeps all),
+            with the same exception.
+        maintenance_interval: seconds between background retention/vacuum runs;
+            ``None`` disables the timer (call :meth:`run_maintenance` yourself).
+        serde: checkpoint serializer, as for ``SqliteSaver``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = 256,
+        keep_last: Optional[int] = None,
+        max_age: Optional[float] = None,
+        maintenance_interval: Optional[float] = 60.0,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        # SqliteSaver.__init__ only stores a shared connection; here ``conn`` is per thread.
+        BaseCheckpointSaver.__init__(self, serde=serde)
+        self.jsonplus_serde = JsonPlusSerializer()
+        self.lock = threading.Lock()
+        self.path = path
+        self.batch_size = batch_size
+        self.keep_last = keep_last
+        self.max_age = max_age
+
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self.committed_jobs = 0
+        self.transactions = 0
+        self.deleted_checkpoints = 0
+        self.maintenance_runs = 0
+
+        self._writer_conn = self._connect()
+        self._writer_conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only takes effect on a new file
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        SqliteSaver(self._writer_conn).setup()
+        self._writer_conn.execute(
+            "CREATE INDEX IF NOT EXISTS checkpoints_by_id ON checkpoints (checkpoint_id)"
+        )
+        self._writer_conn.commit()
+        self.is_setup = True
+
+        self._closed = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-checkpoint-writer", daemon=True)
+        self._writer.start()
+        self._maintenance: Optional[threading.Thread] = None
+        if maintenance_interval and (keep_last is not None or max_age is not None):
+            self._maintenance = threading.Thread(
+                target=self._maintenance_loop, args=(maintenance_interval,),
+                name="sqlite-checkpoint-maintenance", daemon=True,
+            )
+            self._maintenance.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at WAL checkpoints, no fsync per commit
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's read connection (the inherited read paths use it)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def setup(self) -> None:
+        """The schema is created in ``__init__``."""
+
+    def cursor(self, transaction: bool = True):
+        if not transaction:
+            return _ReadCursor(self.conn)
+        return _WriteCursor(self)
+
+    def _submit(self, job: _Job) -> Any:
+        if self._closed.is_set():
+            raise RuntimeError("TunedSqliteSaver is closed")
+        self._queue.put(job)
+        return job.future.result()
+
+    def _execute(self, conn: sqlite3.Connection, job: _Job) -> Any:
+        if job.action is not None:
+            return job.action(conn)
+        for sql, parameters, many in job.statements:
+            if many:
+                conn.executemany(sql, parameters)
+            else:
+                conn.execute(sql, parameters)
+        return None
+
+    def _write_loop(self) -> None:
+        conn = self._writer_conn
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            # Group commit: take whatever else queued up while the last batch was committing.
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)
+                    break
+                batch.append(job)
+
+            writes = [job for job in batch if job.action is None]
+            if writes:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for job in writes:
+                        self._execute(conn, job)
+                    conn.execute("COMMIT")
+                    self.transactions += 1
+                    self.committed_jobs += len(writes)
+                    for job in writes:
+                        job.future.set_result(None)
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    # One bad statement must not fail its neighbours: retry one job per transaction.
+                    for job in writes:
+                        self._run_alone(conn, job)
+            for job in batch:
+                if job.action is not None:
+                    self._run_alone(conn, job)
+
+    def _run_alone(self, conn: sqlite3.Connection, job: _Job) -> None:
+        try:
+            if not job.transactional:
+                job.future.set_result(self._execute(conn, job))
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            result = self._execute(conn, job)
+            conn.execute("COMMIT")
+            self.transactions += 1
+            self.committed_jobs += 1
+            job.future.set_result(result)
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            job.future.set_exception(exc)
+
+    def _apply_retention(self, conn: sqlite3.Connection) -> int:
+        conn.execute(_EXPIRED_TABLE_SQL)
+        conn.execute("DELETE FROM expired_checkpoints")
+        if self.keep_last is not None:
+            conn.execute(_KEEP_LAST_SQL, (self.keep_last,))
+        if self.max_age is not None:
+            conn.execute(_MAX_AGE_SQL, (checkpoint_id_floor(time.time() - self.max_age),))
+        conn.execute(_KEEP_DELTA_BASES_SQL)
+        deleted = conn.execute(
+            "DELETE FROM checkpoints WHERE rowid IN (SELECT id FROM expired_checkpoints)"
+        ).rowcount
+        if deleted:
+            conn.execute(_ORPHAN_WRITES_SQL)
+        return deleted
+
+    def run_maintenance(self) -> dict:
+        """Apply the retention policy now, then give the freed pages back to the OS."""
+        deleted = self._submit(_Job(action=self._apply_retention))
+        self.deleted_checkpoints += deleted
+        self.maintenance_runs += 1
+        if deleted:
+            # Runs on the writer thread between two batches, outside any transaction.
+            self._submit(_Job(action=self._vacuum, transactional=False))
+        return {"deleted_checkpoints": deleted}
+
+    @staticmethod
+    def _vacuum(conn: sqlite3.Connection) -> None:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            # executescript steps the pragma to completion; execute() would free a single page
+            conn.executescript("PRAGMA incremental_vacuum;")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def _maintenance_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.run_maintenance()
+            except Exception:
+                if self._closed.is_set():
+                    return
+
+    def stats(self) -> dict:
+        return {
+            "committed_writes": self.committed_jobs,
+            "transactions": self.transactions,
+            "writes_per_transaction": self.committed_jobs / self.transactions if self.transactions else 0.0,
+            "read_connections": len(self._readers),
+            "maintenance_runs": self.maintenance_runs,
+            "deleted_checkpoints": self.deleted_checkpoints,
+        }
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._maintenance is not None:
+            self._maintenance.join()  # before the writer stops, so a running pass can finish
+        self._queue.put(None)
+        self._writer.join()
+        self._writer_conn.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+    def __enter__(self) -> "TunedSqliteSaver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _ReadCursor:
+    def __init__(self, conn: sqlite3.Connection):
+        self._cursor = conn.cursor()
+
+    def __enter__(self) -> sqlite3.Cursor:
+        return self._cursor
+
+    def __exit__(self, *exc_info) -> None:
+        self._cursor.close()
+
+
+class _WriteCursor:
+    def __init__(self, saver: TunedSqliteSaver):
+        self._saver = saver
+        self._cursor = _QueuedCursor()
+
+    def __enter__(self) -> _QueuedCursor:
+        return self._cursor
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None and self._cursor.statements:
+            self._saver._submit(_Job(statements=self._cursor.statements))
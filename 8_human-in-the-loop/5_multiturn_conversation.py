@@ -1,11 +1,16 @@
+import sys
+from pathlib import Path
 from langgraph.graph import StateGraph, START, END, add_messages
 from langgraph.types import Command, interrupt
 from typing import TypedDict, Annotated, List
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 import uuid
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from bounded_memory_saver import BoundedMemorySaver  # noqa: E402
+from delta_checkpointer import DeltaCheckpointSaver  # noqa: E402
+
 llm = ChatGroq(model="llama-3.1-8b-instant")
 
 class State(TypedDict): 
@@ -98,7 +103,11 @@ graph.add_edge("model", "human_node")
 graph.set_finish_point("end_node")
 
 # Enable Interrupt mechanism
-checkpointer = MemorySaver()
+# Each checkpoint stores only the posts and feedback added since the previous one.
+# A session left waiting for feedback for over an hour spills to checkpoint_spill/
+# and is loaded back when the feedback arrives.
+checkpointer = DeltaCheckpointSaver(BoundedMemorySaver(idle_ttl=3600),
+                                    channels=("generated_post", "human_feedback"))
 app = graph.compile(checkpointer=checkpointer)
 
 thread_config = {"configurable": {
@@ -0,0 +1,331 @@
+"""Throughput-oriented batch evaluation for the RAG graphs.
+
+Running a few thousand evaluation questions one ``graph.invoke`` at a time
+embeds, retrieves and grades every question on its own. ``run_batch`` pushes
+a question set through the compiled graph with bounded concurrency instead:
+
+* ``BatchingEmbeddings`` wraps the embedding model used by the retriever (and
+  the semantic cache). ``embed_query`` calls from questions in flight at the
+  same time are coalesced into one ``embed_documents`` request.
+* Every result is appended to a JSONL file as soon as its question finishes,
+  and flushed. After a crash, running again with the same file skips the
+  questions already answered.
+* The report gives questions/second and a per-stage breakdown: node wall time
+  from ``shared/graph_metrics.py`` callbacks, plus embedding batches.
+
+    batching_embeddings = BatchingEmbeddings(embedding_function)
+    retriever = Chroma(..., embedding_function=batching_embeddings).as_retriever()
+    report = run_batch(graph, questions, "eval_results.jsonl", embeddings=batching_embeddings)
+    print(report)
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from graph_metrics import GraphMetrics  # noqa: E402
+
+
+class _Query:
+    __slots__ = ("text", "done", "vector", "error")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.done = threading.Event()
+        self.vector: Optional[List[float]] = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchingEmbeddings(Embeddings):
+    """Coalesces concurrent ``embed_query`` calls into batched ``embed_documents`` calls.
+
+    The first query of a batch waits up to ``max_wait`` seconds (or until
+    ``max_batch`` queries are queued) for others to join, then sends them all
+    in one request; identical texts in a batch are embedded once. A lone
+    caller therefore pays at most ``max_wait`` extra, so keep it small. While
+    ``max_in_flight`` requests are outstanding the next batch keeps
+    collecting, so batches grow with load instead of queueing behind each other.
+
+    Args:
+        embeddings: the model to wrap, e.g. ``OpenAIEmbeddings()``.
+        max_batch: most texts per ``embed_documents`` request.
+        max_wait: seconds a batch stays open for more queries.
+        max_in_flight: concurrent ``embed_documents`` requests.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_batch: int = 64, max_wait: float = 0.01,
+                 max_in_flight: int = 2):
+        self.embeddings = embeddings
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._queue: List[_Query] = []
+        self._gathering = False
+        self._full = threading.Event()
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.requests = 0
+        self.texts = 0
+        self.seconds = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        with self._lock:
+            self.requests += 1
+            self.texts += len(texts)
+            self.seconds += time.perf_counter() - start
+        return vectors
+
+    def _flush(self, batch: List[_Query]) -> None:
+        for start in range(0, len(batch), self.max_batch):
+            chunk = batch[start:start + self.max_batch]
+            texts = list(dict.fromkeys(query.text for query in chunk))
+            try:
+                vectors = dict(zip(texts, self.embed_documents(texts)))
+            except Exception as e:
+                for query in chunk:
+                    query.error = e
+                    query.done.set()
+                continue
+            for query in chunk:
+                query.vector = vectors[query.text]
+                query.done.set()
+
+    def embed_query(self, text: str) -> List[float]:
+        query = _Query(text)
+        with self._lock:
+            self._queue.append(query)
+            self.queries += 1
+            leader = not self._gathering
+            self._gathering = True
+            if len(self._queue) >= self.max_batch:
+                self._full.set()
+        if leader:
+            self._full.wait(self.max_wait)
+            with self._in_flight:
+                with self._lock:
+                    batch, self._queue = self._queue, []
+                    self._gathering = False
+                    self._full.clear()
+                self._flush(batch)
+        query.done.wait()
+        if query.error is not None:
+            raise query.error
+        return query.vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        # Waiting for the batch blocks, so it runs in the default thread pool.
+        return await asyncio.get_running_loop().run_in_executor(None, self.embed_query, text)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "requests": self.requests,
+                "texts": self.texts,
+                "mean_batch": self.texts / self.requests if self.requests else 0.0,
+                "seconds": self.seconds,
+            }
+
+
+@dataclass
+class BatchReport:
+    path: str
+    completed: int = 0
+    failed: int = 0
+    # Questions skipped because the output file already had their answer.
+    resumed: int = 0
+    seconds: float = 0.0
+    # node -> {"runs", "seconds", "mean_ms", "share"}; seconds are summed over
+    # questions, so with concurrency they add up to more than the wall time.
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    embeddings: Optional[Dict[str, Any]] = None
+
+    @property
+    def questions_per_second(self) -> float:
+        return (self.completed + self.failed) / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        lines = [f"batch eval: {self.completed} answered, {self.failed} failed, {self.resumed} resumed "
+                 f"in {self.seconds:.2f}s ({self.questions_per_second:.2f} questions/s) -> {self.path}",
+                 f"  {'stage':<24} {'runs':>6} {'total s':>9} {'mean ms':>9} {'share':>7}"]
+        for name, stage in self.stages.items():
+            lines.append(f"  {name:<24} {stage['runs']:>6} {stage['seconds']:>9.2f} {stage['mean_ms']:>9.1f} "
+                         f"{stage['share']:>6.1%}")
+        if self.embeddings:
+            e = self.embeddings
+            lines.append(f"  embeddings: {e['queries']} queries in {e['requests']} requests "
+                         f"(mean batch {e['mean_batch']:.1f}), {e['seconds']:.2f}s")
+        return "\n".join(lines)
+
+
+Question = Union[str, Dict[str, Any]]
+
+
+def default_input(question: str) -> Dict[str, Any]:
+    """Input of 2_classification_driven_agent; 4_advanced_multi_step_reasoning wants ``{"question": HumanMessage}``."""
+    return {"messages": [HumanMessage(content=question)]}
+
+
+def default_record(state: Dict[str, Any]) -> Dict[str, Any]:
+    record = {"answer": state["messages"][-1].content if state.get("messages") else None}
+    if "on_topic" in state:
+        record["on_topic"] = state["on_topic"]
+    if state.get("documents"):
+        record["sources"] = [doc.metadata.get("source") for doc in state["documents"]]
+    return record
+
+
+def _questions(questions: Iterable[Question]) -> List[Tuple[str, str]]:
+    items = []
+    for index, question in enumerate(questions):
+        if isinstance(question, str):
+            items.append((str(index), question))
+        else:
+            items.append((str(question.get("id", index)), question["question"]))
+    return items
+
+
+def answered_ids(path: str) -> Set[str]:
+    """Ids with an answer (no ``error``) in ``path``.
+
+    A line cut short by a crash is removed, so appending continues on a clean line.
+    """
+    if not os.path.exists(path):
+        return set()
+    ids: Set[str] = set()
+    with open(path, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid_end += len(line)
+            if "error" not in record:
+                ids.add(str(record["id"]))
+        f.truncate(valid_end)
+    return ids
+
+
+class _JsonlWriter:
+    def __init__(self, path: str, fsync: bool):
+        self._file = open(path, "a", encoding="utf-8")
+        self._fsync = fsync
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _stages(metrics: GraphMetrics) -> Dict[str, Dict[str, float]]:
+    entries = metrics.snapshot()["metrics"]["graph_node_duration_seconds"]
+    total = sum(entry["sum"] for entry in entries) or 1.0
+    stages = {}
+    for entry in sorted(entries, key=lambda entry: entry["sum"], reverse=True):
+        stages[entry["labels"]["node"]] = {
+            "runs": entry["count"],
+            "seconds": entry["sum"],
+            "mean_ms": entry["mean"] * 1000,
+            "share": entry["sum"] / total,
+        }
+    return stages
+
+
+def run_batch(
+    graph,
+    questions: Iterable[Question],
+    path: str,
+    to_input: Callable[[str], Dict[str, Any]] = default_input,
+    to_record: Callable[[Dict[str, Any]], Dict[str, Any]] = default_record,
+    max_concurrency: int = 8,
+    embeddings: Optional[BatchingEmbeddings] = None,
+    resume: bool = True,
+    fsync: bool = False,
+    thread_prefix: str = "eval-",
+) -> BatchReport:
+    """Answer ``questions`` with ``graph`` and append one JSON line per question to ``path``.
+
+    Args:
+        questions: strings (their position is the id) or dicts with
+            ``"question"`` and optionally ``"id"``.
+        to_input / to_record: build the graph input from a question and the
+            JSON fields written from the final state.
+        max_concurrency: questions in flight at once.
+        embeddings: the ``BatchingEmbeddings`` the graph uses, for the report.
+        resume: skip questions already answered in ``path`` (failed ones are
+            retried and their new line supersedes the old one).
+        fsync: also fsync every line, surviving an OS crash, not just a process crash.
+        thread_prefix: each question runs on thread ``thread_prefix + id``, so
+            graphs with a checkpointer do not share conversation state.
+    """
+    report = BatchReport(path=path)
+    items = _questions(questions)
+    done = answered_ids(path) if resume else set()
+    if not resume and os.path.exists(path):
+        os.remove(path)
+    pending = [(qid, question) for qid, question in items if qid not in done]
+    report.resumed = len(items) - len(pending)
+
+    metrics = GraphMetrics(label_threads=False)
+    handler = metrics.handler("batch_eval")
+    embeddings_before = embeddings.stats() if embeddings is not None else None
+    writer = _JsonlWriter(path, fsync)
+
+    def answer(qid: str, question: str) -> bool:
+        config = {"configurable": {"thread_id": f"{thread_prefix}{qid}"}, "callbacks": [handler]}
+        start = time.perf_counter()
+        try:
+            state = graph.invoke(to_input(question), config)
+            record = {"id": qid, "question": question, **to_record(state)}
+            ok = True
+        except Exception as e:
+            record = {"id": qid, "question": question, "error": f"{type(e).__name__}: {e}"}
+            ok = False
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        writer.write(record)
+        return ok
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch-eval") as executor:
+            futures = [executor.submit(answer, qid, question) for qid, question in pending]
+            for future in as_completed(futures):
+                if future.result():
+                    report.completed += 1
+                else:
+                    report.failed += 1
+    finally:
+        writer.close()
+    report.seconds = time.perf_counter() - start
+
+    report.stages = _stages(metrics)
+    if embeddings is not None:
+        after = embeddings.stats()
+        queries = after["queries"] - embeddings_before["queries"]
+        requests = after["requests"] - embeddings_before["requests"]
+        texts = after["texts"] - embeddings_before["texts"]
+        report.embeddings = {"queries": queries, "requests": requests, "texts": texts,
+                             "mean_batch": texts / requests if requests else 0.0,
+                             "seconds": after["seconds"] - embeddings_before["seconds"]}
+    return report
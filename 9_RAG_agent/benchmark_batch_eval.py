@@ -0,0 +1,202 @@
+"""Batch evaluation throughput: one invoke at a time vs run_batch, with and without embedding coalescing.
+
+The graph mirrors the classification-driven notebooks (question_classifier ->
+retrieve -> batched retrieval_grader -> generate_answer, or the off-topic
+reply) on FakeChatModel and HashingEmbeddings. The embedding "provider"
+charges ``--embed-latency`` per request plus a little per text and serves at
+most ``--embed-concurrency`` requests at once, like a rate-limited API.
+
+* sequential:          ``graph.invoke`` per question, as the notebooks do
+* run_batch:           ``--concurrency`` questions in flight, one embedding request per query
+* run_batch+coalesce:  the same with BatchingEmbeddings in front of the retriever
+
+Finally a crash is simulated (half the questions answered, last line cut
+off) and run_batch resumes from the file without redoing finished work.
+
+    python benchmark_batch_eval.py --questions 200 --concurrency 16
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import List, TypedDict
+
+from langchain.schema import Document
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.vectorstores import InMemoryVectorStore
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel, Field
+
+from batch_eval import BatchingEmbeddings, run_batch
+from document_grader import build_document_grader, grade_documents
+from fake_models import FakeChatModel, HashingEmbeddings
+from gym_docs import docs
+
+TEMPLATES = [
+    "What are the opening hours of Peak Performance Gym on {day}?",
+    "How much does the {plan} membership plan cost?",
+    "Which {level} yoga classes does the gym offer?",
+    "Can a personal trainer help me with {goal}?",
+    "Does the gym pool stay open on {day}?",
+    "What is the capital of {country}?",
+]
+FILLERS = {
+    "day": ["Monday", "Saturday", "Sunday", "holidays"],
+    "plan": ["Basic", "Standard", "Premium"],
+    "level": ["beginner", "intermediate", "advanced"],
+    "goal": ["rehabilitation", "sports training", "weight loss"],
+    "country": ["France", "Kenya", "Peru", "Japan"],
+}
+
+
+def make_questions(n: int) -> List[str]:
+    questions = []
+    for i in range(n):
+        template = TEMPLATES[i % len(TEMPLATES)]
+        values = {key: options[(i // len(TEMPLATES) + j) % len(options)]
+                  for j, (key, options) in enumerate(FILLERS.items())}
+        questions.append(template.format(**values) + f" (#{i})")
+    return questions
+
+
+class ProviderEmbeddings(HashingEmbeddings):
+    """HashingEmbeddings behind a provider that serves a limited number of requests at once."""
+
+    def __init__(self, concurrency: int, **kwargs):
+        super().__init__(**kwargs)
+        self._slots = threading.BoundedSemaphore(concurrency)
+
+    def embed_documents(self, texts):
+        with self._slots:
+            return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        with self._slots:
+            return super().embed_query(text)
+
+
+class GradeQuestion(BaseModel):
+    score: str = Field(description="Question is about gym? If yes -> 'Yes' if not -> 'No'")
+
+
+class State(TypedDict):
+    messages: List[BaseMessage]
+    documents: List[Document]
+    on_topic: str
+
+
+def build_graph(llm, retriever):
+    classifier = ChatPromptTemplate.from_messages(
+        [("system", "You are a classifier for Peak Performance Gym questions."), ("human", "User question: {question}")]
+    ) | llm.with_structured_output(GradeQuestion)
+    grader = build_document_grader(llm)
+    rag_chain = ChatPromptTemplate.from_template("Context: {context}\n\nQuestion: {question}") | llm
+
+    def question_classifier(state: State):
+        state["on_topic"] = classifier.invoke({"question": state["messages"][-1].content}).score
+        return state
+
+    def retrieve(state: State):
+        state["documents"] = retriever.invoke(state["messages"][-1].content)
+        return state
+
+    def retrieval_grader(state: State):
+        state["documents"] = grade_documents(grader, state["messages"][-1].content, state["documents"])
+        return state
+
+    def generate_answer(state: State):
+        question = state["messages"][-1].content
+        state["messages"].append(rag_chain.invoke({"context": state["documents"], "question": question}))
+        return state
+
+    def off_topic_response(state: State):
+        state["messages"].append(AIMessage(content="I'm sorry! I cannot answer this question!"))
+        return state
+
+    workflow = StateGraph(State)
+    for node in (question_classifier, retrieve, retrieval_grader, generate_answer, off_topic_response):
+        workflow.add_node(node.__name__, node)
+    workflow.set_entry_point("question_classifier")
+    workflow.add_conditional_edges("question_classifier", lambda s: s["on_topic"].lower(),
+                                   {"yes": "retrieve", "no": "off_topic_response"})
+    workflow.add_edge("retrieve", "retrieval_grader")
+    workflow.add_edge("retrieval_grader", "generate_answer")
+    workflow.add_edge("generate_answer", END)
+    workflow.add_edge("off_topic_response", END)
+    return workflow.compile()
+
+
+def setup(args, coalesce: bool):
+    llm = FakeChatModel(latency=args.latency)
+    provider = ProviderEmbeddings(args.embed_concurrency)
+    store = InMemoryVectorStore.from_documents(docs, provider)
+    # Indexing above is free; from here on every request costs what the provider charges.
+    provider.latency_per_call, provider.latency_per_text = args.embed_latency, 0.0005
+    provider.calls = provider.embedded_texts = 0
+    embeddings = BatchingEmbeddings(provider, max_batch=64, max_wait=0.01,
+                                    max_in_flight=args.embed_concurrency) if coalesce else None
+    if embeddings is not None:
+        store.embedding = embeddings
+    return build_graph(llm, store.as_retriever(search_kwargs={"k": 4})), llm, provider, embeddings
+
+
+def line(label, n, seconds, llm, provider):
+    print(f"{label:<20} {seconds:>8.2f} {n / seconds:>10.2f} {provider.calls:>13} {llm.calls:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=16, help="run_batch questions in flight")
+    parser.add_argument("--latency", type=float, default=0.03, help="fake LLM latency per call (s)")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="embedding latency per request (s)")
+    parser.add_argument("--embed-concurrency", type=int, default=2, help="requests the provider serves at once")
+    args = parser.parse_args()
+
+    questions = make_questions(args.questions)
+    workdir = tempfile.mkdtemp(prefix="batch-eval-bench-")
+    print(f"{len(questions)} questions; LLM {args.latency}s per call; embeddings {args.embed_latency}s per "
+          f"request, {args.embed_concurrency} at once; run_batch concurrency {args.concurrency}")
+    print(f"{'mode':<20} {'wall s':>8} {'questions/s':>10} {'embed requests':>13} {'LLM calls':>10}")
+
+    try:
+        graph, llm, provider, _ = setup(args, coalesce=False)
+        start = time.perf_counter()
+        for question in questions:
+            graph.invoke({"messages": [HumanMessage(content=question)]})
+        line("sequential", len(questions), time.perf_counter() - start, llm, provider)
+
+        reports = {}
+        for label, coalesce in (("run_batch", False), ("run_batch+coalesce", True)):
+            graph, llm, provider, embeddings = setup(args, coalesce)
+            path = os.path.join(workdir, f"{label}.jsonl")
+            reports[label] = run_batch(graph, questions, path, max_concurrency=args.concurrency,
+                                       embeddings=embeddings)
+            line(label, len(questions), reports[label].seconds, llm, provider)
+
+        print(f"\n{reports['run_batch+coalesce']}")
+
+        # Crash mid-run: half the answers are on disk and the last line is cut off.
+        graph, llm, provider, embeddings = setup(args, coalesce=True)
+        path = os.path.join(workdir, "resumed.jsonl")
+        half = len(questions) // 2
+        run_batch(graph, questions[:half], path, max_concurrency=args.concurrency, embeddings=embeddings)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"id": "999", "question": "interrupted')
+        llm.calls = 0
+        resumed = run_batch(graph, questions, path, max_concurrency=args.concurrency, embeddings=embeddings)
+        with open(path, encoding="utf-8") as f:
+            ids = [json.loads(record)["id"] for record in f]
+        assert sorted(ids, key=int) == [str(i) for i in range(len(questions))], "every question exactly once"
+        print(f"\nresume after a simulated crash: {resumed.resumed} answers kept, {resumed.completed} answered now "
+              f"({llm.calls} LLM calls), {len(ids)} lines, no duplicates")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
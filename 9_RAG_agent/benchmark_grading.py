@@ -0,0 +1,102 @@
+"""Benchmark the retrieval_grader stage against a fake LLM with injected latency.
+
+Compares the original per-document loop (new prompt per document, one
+sequential ``invoke`` each) with batched grading, with and without early
+stopping (the early stop grades in retrieval order, a window at a time).
+
+    python benchmark_grading.py --latency 0.3 --max-concurrency 4
+"""
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from document_grader import (
+    GRADER_SYSTEM_PROMPT,
+    GradeDocument,
+    agrade_documents,
+    build_document_grader,
+    grade_documents,
+)
+from fake_models import FakeChatModel
+from gym_docs import docs
+
+QUESTIONS = [
+    "What are the opening hours of Peak Performance Gym on weekends?",
+    "How much does the Premium membership plan cost?",
+    "Who is the head trainer and what does she specialize in?",
+]
+
+
+def grade_sequentially(llm, question, documents):
+    """The notebook's original retrieval_grader loop."""
+    structured_llm = llm.with_structured_output(GradeDocument)
+    relevant_docs = []
+    for doc in documents:
+        human_message = HumanMessage(
+            content=f"User question: {question}\n\nRetrieved document:\n{doc.page_content}"
+        )
+        grade_prompt = ChatPromptTemplate.from_messages([SystemMessage(content=GRADER_SYSTEM_PROMPT), human_message])
+        result = (grade_prompt | structured_llm).invoke({})
+        if result.score.strip().lower() == "yes":
+            relevant_docs.append(doc)
+    return relevant_docs
+
+
+def measure(label, run, llm, k):
+    llm.calls = 0
+    start = time.perf_counter()
+    found = [run(question) for question in QUESTIONS]
+    elapsed = (time.perf_counter() - start) / len(QUESTIONS)
+    relevant = sum(len(docs_) for docs_ in found) / len(QUESTIONS)
+    print(f"{label:<28} k={k} {elapsed * 1000:>8.1f} ms/question "
+          f"{llm.calls / len(QUESTIONS):>5.1f} calls/question {relevant:>4.1f} relevant")
+    return found, llm.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM latency per call (s)")
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--stop-after", type=int, default=1)
+    args = parser.parse_args()
+
+    llm = FakeChatModel(latency=args.latency)
+    grader = build_document_grader(llm)
+
+    for k in (4, len(docs)):
+        documents = docs[:k]
+        sequential, _ = measure("sequential (original)", lambda q: grade_sequentially(llm, q, documents), llm, k)
+        batched, all_calls = measure(
+            "batch",
+            lambda q: grade_documents(grader, q, documents, max_concurrency=args.max_concurrency),
+            llm, k,
+        )
+        assert batched == sequential, "batched grading must keep the same documents in the same order"
+        measure(
+            "abatch",
+            lambda q: asyncio.run(agrade_documents(grader, q, documents, max_concurrency=args.max_concurrency)),
+            llm, k,
+        )
+        stopped, stopped_calls = measure(
+            f"batch, stop after {args.stop_after}",
+            lambda q: grade_documents(grader, q, documents, max_concurrency=args.max_concurrency,
+                                      stop_after=args.stop_after),
+            llm, k,
+        )
+        measure(
+            f"abatch, stop after {args.stop_after}",
+            lambda q: asyncio.run(agrade_documents(grader, q, documents, max_concurrency=args.max_concurrency,
+                                                   stop_after=args.stop_after)),
+            llm, k,
+        )
+        # Retrieval order: early stopping keeps the first relevant documents of the full grading.
+        assert all(found == full[:args.stop_after] for found, full in zip(stopped, batched))
+        assert stopped_calls < all_calls, "early stopping should skip grading calls"
+        print()
+
+
+if __name__ == "__main__":
+    main()
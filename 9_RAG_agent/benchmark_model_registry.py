@@ -0,0 +1,165 @@
+"""Measure per-invocation model setup with and without the shared ModelRegistry.
+
+Starts a local stub of the OpenAI chat completions endpoint, then runs the
+same node calls the notebooks make (a structured classifier call and a
+tool-bound agent call) in two ways:
+
+* per-call: build ``ChatOpenAI`` / ``with_structured_output`` / ``bind_tools``
+  inside every call, as the notebooks used to;
+* registry: get the models from a ``ModelRegistry`` warmed at startup.
+
+It reports the setup time per call, how many TCP connections each pattern
+opened against the stub, and checks the time the registry reports as saved
+against the measured difference.
+
+    python benchmark_model_registry.py --calls 50
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.tools import tool
+from pydantic import BaseModel, Field
+
+from model_registry import ModelRegistry
+
+
+class GradeQuestion(BaseModel):
+    score: str = Field(description="Question is about the specified topics? If yes -> 'Yes' if not -> 'No'")
+
+
+@tool
+def retriever_tool(query: str) -> str:
+    """Information related to Peak Performance Gym."""
+    return ""
+
+
+@tool
+def off_topic() -> str:
+    """Catch all Questions NOT related to Peak Performance Gym."""
+    return "Forbidden - do not respond to the user"
+
+
+TOOLS = [retriever_tool, off_topic]
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests += 1
+        self._send({"object": "list", "data": [{"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "stub"}]})
+
+    def do_POST(self):
+        self.server.requests += 1
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        message = {"role": "assistant", "content": "ok"}
+        tools = request.get("tools") or []
+        if request.get("response_format", {}).get("type") == "json_schema":
+            # with_structured_output on gpt-4o uses OpenAI structured outputs
+            message = {"role": "assistant", "content": json.dumps({"score": "Yes"})}
+        elif any(t["function"]["name"] == "GradeQuestion" for t in tools):
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{"id": "call_1", "type": "function",
+                                "function": {"name": "GradeQuestion", "arguments": json.dumps({"score": "Yes"})}}],
+            }
+        self._send({
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": request["model"],
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+        })
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(label, server, calls, get_classifier, get_agent):
+    server.connections = 0
+    setup = 0.0
+    start = time.perf_counter()
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        classifier = get_classifier()
+        agent = get_agent()
+        setup += time.perf_counter() - t0
+        classifier.invoke("User question: Who founded the gym?")
+        agent.invoke("Who is the owner and what are the timings?")
+    total = time.perf_counter() - start
+    print(f"{label:<10} setup {setup / calls * 1000:>7.2f} ms/call   "
+          f"total {total / calls * 1000:>7.2f} ms/call   connections opened {server.connections}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    from langchain_openai import ChatOpenAI
+
+    server = start_stub_server()
+    endpoint = {"base_url": f"http://127.0.0.1:{server.server_port}/v1", "api_key": "stub", "max_retries": 0}
+
+    per_call_total = run(
+        "per-call", server, args.calls,
+        lambda: ChatOpenAI(model="gpt-4o", **endpoint).with_structured_output(GradeQuestion),
+        lambda: ChatOpenAI(**endpoint).bind_tools(TOOLS),
+    )
+
+    registry = ModelRegistry()
+    server.connections = 0
+    warm_seconds = registry.warm({"model": "gpt-4o", **endpoint}, endpoint)
+    print(f"registry warm-up: {warm_seconds * 1000:.1f} ms, connections opened {server.connections}")
+    registry_total = run(
+        "registry", server, args.calls,
+        lambda: registry.structured(GradeQuestion, model="gpt-4o", **endpoint),
+        lambda: registry.with_tools(TOOLS, **endpoint),
+    )
+
+    stats = registry.stats()
+    print(f"registry stats: {stats}")
+    # Model construction, private HTTP clients and new connections are all part of the
+    # measured difference; the registry's estimate has to account for most of it.
+    measured = (per_call_total - registry_total) / args.calls
+    reported = stats["saved_seconds"] / args.calls
+    print(f"time removed per call: {measured * 1000:.2f} ms measured, {reported * 1000:.2f} ms reported by the registry")
+    assert 0.5 * measured <= reported <= 1.5 * measured, "saved_seconds does not match the measured saving"
+
+    async def async_call_then_close():
+        await registry.with_tools(TOOLS, **endpoint).ainvoke("Who is the owner?")
+        await registry.aclose()
+
+    asyncio.run(async_call_then_close())
+    assert registry.http_client.is_closed and registry.http_async_client.is_closed
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Replay a stream of repeated and reworded questions through the advanced RAG
+graph with and without the semantic answer cache, using fake models.
+
+The graph mirrors 4_advanced_multi_step_reasoning.ipynb (classifier ->
+retrieve -> batched grader -> generate) with FakeChatModel/HashingEmbeddings
+standing in for OpenAI, so every cache miss costs the same four-plus LLM
+round trips as the notebook. Halfway through, one document is edited to show
+the cache invalidating itself.
+
+    python benchmark_semantic_cache.py --latency 0.2 --threshold 0.7
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from typing import List, TypedDict
+
+from langchain.schema import Document
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel, Field
+
+from document_grader import build_document_grader, grade_documents
+from fake_models import FakeChatModel, HashingEmbeddings
+from gym_docs import docs
+from semantic_cache import SemanticAnswerCache
+from vector_index import index_version, load_persistent_index
+
+QUESTIONS = [
+    "Who founded Peak Performance Gym?",
+    "What are the weekend hours of the gym?",
+    "Who is the founder of Peak Performance Gym?",
+    "How much does the Premium membership cost?",
+    "What are the gym hours on the weekend?",
+    "Peak Performance Gym founder?",
+    "What does the Premium membership plan cost?",
+    "Which yoga classes does the gym offer?",
+]
+
+
+class GradeQuestion(BaseModel):
+    score: str = Field(description="Question is about the specified topics? If yes -> 'Yes' if not -> 'No'")
+
+
+class State(TypedDict):
+    question: str
+    messages: List[BaseMessage]
+    documents: List[Document]
+    on_topic: str
+    cache_hit: bool
+
+
+def build_graph(llm, retriever, cache, index_version):
+    classifier = ChatPromptTemplate.from_messages(
+        [("system", "You are a classifier for Peak Performance Gym questions."), ("human", "User question: {question}")]
+    ) | llm.with_structured_output(GradeQuestion)
+    grader = build_document_grader(llm)
+    rag_chain = ChatPromptTemplate.from_template("Context: {context}\n\nQuestion: {question}") | llm
+
+    def semantic_cache_lookup(state: State):
+        state["cache_hit"] = False
+        if cache is not None:
+            cache.bind_index(index_version())
+            hit = cache.lookup(state["question"])
+            if hit is not None:
+                state["messages"].append(AIMessage(content=hit.answer))
+                state["cache_hit"] = True
+        return state
+
+    def question_classifier(state: State):
+        state["on_topic"] = classifier.invoke({"question": state["question"]}).score
+        return state
+
+    def retrieve(state: State):
+        state["documents"] = retriever.invoke(state["question"])
+        return state
+
+    def retrieval_grader(state: State):
+        state["documents"] = grade_documents(grader, state["question"], state["documents"])
+        return state
+
+    def generate_answer(state: State):
+        answer = rag_chain.invoke({"context": state["documents"], "question": state["question"]}).content
+        state["messages"].append(AIMessage(content=answer))
+        if cache is not None:
+            cache.store(state["question"], answer)
+        return state
+
+    workflow = StateGraph(State)
+    for node in (semantic_cache_lookup, question_classifier, retrieve, retrieval_grader, generate_answer):
+        workflow.add_node(node.__name__, node)
+    workflow.set_entry_point("semantic_cache_lookup")
+    workflow.add_conditional_edges("semantic_cache_lookup", lambda s: "cached" if s["cache_hit"] else "miss",
+                                   {"cached": END, "miss": "question_classifier"})
+    workflow.add_conditional_edges("question_classifier", lambda s: s["on_topic"].lower(),
+                                   {"yes": "retrieve", "no": END})
+    workflow.add_edge("retrieve", "retrieval_grader")
+    workflow.add_edge("retrieval_grader", "generate_answer")
+    workflow.add_edge("generate_answer", END)
+    return workflow.compile()
+
+
+def replay(label, graph, llm, questions):
+    llm.calls = 0
+    start = time.perf_counter()
+    for question in questions:
+        graph.invoke({"question": question, "messages": [], "documents": [], "on_topic": ""})
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {elapsed / len(questions) * 1000:>8.1f} ms/question   "
+          f"{llm.calls / len(questions):>4.1f} LLM calls/question")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per call (s)")
+    parser.add_argument("--threshold", type=float, default=0.7,
+                        help="similarity threshold (hashing embeddings score paraphrases lower than OpenAI's)")
+    args = parser.parse_args()
+
+    llm = FakeChatModel(latency=args.latency)
+    embedding_function = HashingEmbeddings()
+    workdir = tempfile.mkdtemp(prefix="semantic-cache-bench-")
+    try:
+        db, report = load_persistent_index(docs, embedding_function, persist_directory=f"{workdir}/index",
+                                           cache_directory=f"{workdir}/embeddings")
+        retriever = db.as_retriever(search_kwargs={"k": 4})
+
+        replay("no cache", build_graph(llm, retriever, None, lambda: ""), llm, QUESTIONS)
+
+        cache = SemanticAnswerCache(embedding_function, threshold=args.threshold, index_version=report.version)
+        graph = build_graph(llm, retriever, cache, lambda: index_version(f"{workdir}/index"))
+        replay("semantic cache", graph, llm, QUESTIONS)
+        print(f"  {cache.stats()}")
+
+        edited = list(docs)
+        edited[1] = Document(page_content=docs[1].page_content.replace("9:00 PM", "10:00 PM"),
+                             metadata=docs[1].metadata)
+        # re-ingest through the directory only: the graph picks the new version up from the manifest
+        load_persistent_index(edited, embedding_function, persist_directory=f"{workdir}/index",
+                              cache_directory=f"{workdir}/embeddings")
+        replay("after index edit", graph, llm, QUESTIONS)
+        print(f"  {cache.stats()}")
+
+        # An answer generated while the index changed is not stored in the freshly invalidated cache.
+        race = SemanticAnswerCache(embedding_function, threshold=args.threshold, index_version="v1")
+        assert race.lookup(QUESTIONS[0]) is None
+        race.bind_index("v2")
+        race.store(QUESTIONS[0], "answer built from the v1 index")
+        assert race.stats()["entries"] == 0 and race.stats()["stale_stores"] == 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
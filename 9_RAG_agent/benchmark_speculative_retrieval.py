@@ -0,0 +1,156 @@
+"""Speculative retrieval next to topic classification, against fake models.
+
+The graph mirrors the classification-driven notebooks: question_classifier ->
+retrieve -> retrieval_grader -> generate_answer, or off_topic_response. The
+fake classifier and graders cost ``--latency`` per call and every retrieval
+embeds the question for ``--retrieval-latency`` (a remote embedding API).
+
+* sequential:        retrieve waits for the classifier (the notebooks' default)
+* spec retrieve:     retrieve runs while the classifier is in flight
+* spec retrieve+grade: grading runs speculatively as well
+
+For on-topic questions the table shows the latency saved; for off-topic ones
+it shows the work thrown away (embedding and grader calls the sequential
+graph never makes).
+
+    python benchmark_speculative_retrieval.py --latency 0.4 --retrieval-latency 0.25
+"""
+import argparse
+import statistics
+import time
+from typing import List, TypedDict
+
+from langchain.schema import Document
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.vectorstores import InMemoryVectorStore
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel, Field
+
+from document_grader import build_document_grader, grade_documents
+from fake_models import FakeChatModel, HashingEmbeddings
+from gym_docs import docs
+from speculative_retrieval import SpeculativeRetrieval
+
+ON_TOPIC = [
+    "Who is the owner and what are the timings?",
+    "How much does the Premium membership plan cost?",
+    "Which yoga classes does the gym offer?",
+    "Who is the head trainer at Peak Performance Gym?",
+    "Does the gym have a swimming pool and sauna?",
+]
+OFF_TOPIC = [
+    "What does the company Apple do?",
+    "How will the weather be tomorrow?",
+    "Who won the football world cup in 2022?",
+]
+
+
+class GradeQuestion(BaseModel):
+    score: str = Field(description="Question is about gym? If yes -> 'Yes' if not -> 'No'")
+
+
+class State(TypedDict):
+    question: str
+    messages: List[BaseMessage]
+    documents: List[Document]
+    on_topic: str
+
+
+def build_graph(llm, retriever, mode: str):
+    classifier = ChatPromptTemplate.from_messages(
+        [("system", "You are a classifier for Peak Performance Gym questions."), ("human", "User question: {question}")]
+    ) | llm.with_structured_output(GradeQuestion)
+    grader = build_document_grader(llm)
+    rag_chain = ChatPromptTemplate.from_template("Context: {context}\n\nQuestion: {question}") | llm
+
+    def question_classifier(state: State):
+        state["on_topic"] = classifier.invoke({"question": state["question"]}).score
+        return state
+
+    def retrieve(state: State):
+        state["documents"] = retriever.invoke(state["question"])
+        return state
+
+    def retrieval_grader(state: State):
+        state["documents"] = grade_documents(grader, state["question"], state["documents"])
+        return state
+
+    def generate_answer(state: State):
+        answer = rag_chain.invoke({"context": state["documents"], "question": state["question"]}).content
+        state["messages"].append(AIMessage(content=answer))
+        return state
+
+    def off_topic_response(state: State):
+        state["messages"].append(AIMessage(content="I'm sorry! I cannot answer this question!"))
+        return state
+
+    speculation = SpeculativeRetrieval(
+        [retrieve, retrieval_grader] if mode == "spec retrieve+grade" else [retrieve],
+        question=lambda state: state["question"],
+        on_topic=lambda state: state["on_topic"].lower() == "yes",
+        enabled=mode != "sequential",
+    )
+    workflow = StateGraph(State)
+    workflow.add_node("question_classifier", speculation.classifier(question_classifier))
+    workflow.add_node("retrieve", speculation.step(retrieve))
+    workflow.add_node("retrieval_grader", speculation.step(retrieval_grader))
+    workflow.add_node("generate_answer", generate_answer)
+    workflow.add_node("off_topic_response", off_topic_response)
+    workflow.set_entry_point("question_classifier")
+    workflow.add_conditional_edges("question_classifier", lambda s: s["on_topic"].lower(),
+                                   {"yes": "retrieve", "no": "off_topic_response"})
+    workflow.add_edge("retrieve", "retrieval_grader")
+    workflow.add_edge("retrieval_grader", "generate_answer")
+    workflow.add_edge("generate_answer", END)
+    workflow.add_edge("off_topic_response", END)
+    return workflow.compile(), speculation
+
+
+def run(mode: str, questions, args):
+    llm = FakeChatModel(latency=args.latency)
+    embeddings = HashingEmbeddings()
+    retriever = InMemoryVectorStore.from_documents(docs, embeddings).as_retriever(search_kwargs={"k": args.k})
+    # Only the per-question embedding is charged; indexing happened above for free.
+    embeddings.latency_per_call = args.retrieval_latency
+    embeddings.calls = 0
+    graph, speculation = build_graph(llm, retriever, mode)
+    latencies, answers = [], []
+    for question in questions:
+        start = time.perf_counter()
+        result = graph.invoke({"question": question, "messages": [], "documents": [], "on_topic": ""})
+        latencies.append(time.perf_counter() - start)
+        # Document ids are random per vector store, so compare what was retrieved rather than the prompt text.
+        answers.append(([doc.page_content for doc in result["documents"]], result["on_topic"]))
+    # Let discarded speculation finish so its work is counted.
+    speculation.close(wait=True)
+    return {"latency": statistics.mean(latencies), "llm_calls": llm.calls / len(questions),
+            "embed_calls": embeddings.calls / len(questions), "answers": answers, "stats": speculation.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.4, help="fake LLM latency per call (s)")
+    parser.add_argument("--retrieval-latency", type=float, default=0.25, help="query embedding latency (s)")
+    parser.add_argument("--k", type=int, default=4, help="documents retrieved (and graded) per question")
+    args = parser.parse_args()
+
+    print(f"LLM {args.latency}s per call, retrieval {args.retrieval_latency}s, k={args.k}")
+    print(f"{'path':<10} {'mode':<20} {'ms/question':>11} {'saved ms':>9} {'LLM calls':>10} {'embeds':>7} "
+          f"{'wasted s':>9}")
+    for path, questions in (("on-topic", ON_TOPIC), ("off-topic", OFF_TOPIC)):
+        baseline = None
+        for mode in ("sequential", "spec retrieve", "spec retrieve+grade"):
+            r = run(mode, questions, args)
+            if baseline is None:
+                baseline = r
+            assert r["answers"] == baseline["answers"], "speculation must not change the documents used"
+            saved = (baseline["latency"] - r["latency"]) * 1000
+            print(f"{path:<10} {mode:<20} {r['latency'] * 1000:>11.1f} {saved:>9.1f} {r['llm_calls']:>10.1f} "
+                  f"{r['embed_calls']:>7.1f} {r['stats']['wasted_seconds']:>9.2f}")
+            if mode != "sequential":
+                print(f"{'':<10}   {r['stats']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Cold vs warm start-up of the RAG vector index with a deterministic local embedding function.
+
+Scenarios, each simulating a notebook restart:
+
+* from_documents: the original ``Chroma.from_documents`` (re-embeds everything);
+* cold:  persistent index, empty directories;
+* warm:  restart with the same documents;
+* edit:  restart after one document changed and one was added;
+* rebuild: index directory lost (a fresh path), embedding cache kept.
+
+    python benchmark_vector_index.py --docs 300 --latency-per-text 0.002
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+from fake_models import HashingEmbeddings
+from gym_docs import docs as gym_docs
+from vector_index import index_version, load_persistent_index
+
+
+def make_corpus(size: int):
+    corpus = []
+    for i in range(size):
+        base = gym_docs[i % len(gym_docs)]
+        corpus.append(Document(page_content=f"{base.page_content} (branch {i // len(gym_docs)})",
+                               metadata={"source": f"{i}-{base.metadata['source']}"}))
+    return corpus
+
+
+def report_line(label, seconds, embeddings, extra=""):
+    print(f"{label:<15} {seconds * 1000:>9.1f} ms   embedded {embeddings.embedded_texts:>5} texts "
+          f"in {embeddings.calls:>3} calls   {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=300)
+    parser.add_argument("--latency-per-call", type=float, default=0.05)
+    parser.add_argument("--latency-per-text", type=float, default=0.002)
+    args = parser.parse_args()
+
+    def embeddings():
+        return HashingEmbeddings(latency_per_call=args.latency_per_call, latency_per_text=args.latency_per_text)
+
+    corpus = make_corpus(args.docs)
+    workdir = tempfile.mkdtemp(prefix="rag-index-bench-")
+    persist_directory = f"{workdir}/chroma_index"
+    cache_directory = f"{workdir}/embedding_cache"
+    try:
+        embedding_function = embeddings()
+        start = time.perf_counter()
+        Chroma.from_documents(corpus, embedding_function, collection_name="from_documents")
+        report_line("from_documents", time.perf_counter() - start, embedding_function)
+
+        edited = list(corpus)
+        edited[0] = Document(page_content=edited[0].page_content + " Renovated in 2024.",
+                             metadata=edited[0].metadata)
+        edited.append(Document(page_content="Peak Performance Gym now offers a kids' swimming programme on Saturdays.",
+                               metadata={"source": "kids.txt"}))
+
+        for label, documents, index_directory in [
+            ("cold", corpus, persist_directory),
+            ("warm", corpus, persist_directory),
+            ("edit", edited, persist_directory),
+            # chromadb caches its client per path, so a deleted directory cannot be reopened
+            # in the same process; a new path stands in for a lost index.
+            ("rebuild", edited, f"{workdir}/chroma_index_rebuilt"),
+        ]:
+            embedding_function = embeddings()
+            db, report = load_persistent_index(documents, embedding_function,
+                                               persist_directory=index_directory,
+                                               cache_directory=cache_directory)
+            report_line(label, report.seconds, embedding_function, str(report))
+            assert index_version(index_directory) == report.version
+            hits = db.similarity_search("What are the gym hours on weekends?", k=1)
+            assert hits and "weekends" in hits[0].page_content
+            del db
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Deterministic local stand-ins for the OpenAI models used in the RAG notebooks.
+
+They never touch the network: every call sleeps for an injected latency and
+answers with a simple word-overlap heuristic, so benchmarks are repeatable.
+"""
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+GYM_TOPIC_WORDS = frozenset({
+    "gym", "peak", "performance", "founder", "founded", "owner", "hours", "timings", "open",
+    "membership", "plan", "plans", "price", "classes", "class", "yoga", "trainer", "trainers",
+    "facilities", "equipment", "pool", "sauna", "cancelation", "cancellation",
+})
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"the", "a", "an", "is", "are", "and", "or", "of", "to", "in", "on", "at",
+                        "what", "who", "when", "how", "does", "do", "for", "it", "he", "she"})
+
+
+def content_words(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def _as_messages(prompt_value) -> List[BaseMessage]:
+    return prompt_value.to_messages() if hasattr(prompt_value, "to_messages") else list(prompt_value)
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+def heuristic_score(messages: List[BaseMessage]) -> str:
+    """'Yes'/'No' answer for the grader and classifier prompts.
+
+    A document is relevant when it shares at least two content words with the
+    question; a question is on-topic when it mentions a gym topic word.
+    """
+    text = _prompt_text(messages)
+    if "Retrieved document:" in text:
+        question_part, document_part = text.split("Retrieved document:", 1)
+        question_part = question_part.split("User question:", 1)[-1]
+        overlap = content_words(question_part) & content_words(document_part)
+        return "Yes" if len(overlap) >= 2 else "No"
+    question_part = text.split("User question:", 1)[-1]
+    return "Yes" if content_words(question_part) & GYM_TOPIC_WORDS else "No"
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with injected latency that supports ``with_structured_output``.
+
+    Plain calls echo the last message; structured calls fill every field of
+    the schema with :func:`heuristic_score`. ``calls`` counts model round trips
+    and ``max_in_flight`` records the highest observed concurrency.
+    """
+
+    latency: float = 0.2
+    calls: int = 0
+    max_in_flight: int = 0
+    _in_flight: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        return f"Answer based on: {str(messages[-1].content)[:200]}"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        self._enter()
+        try:
+            time.sleep(self.latency)
+        finally:
+            self._exit()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._exit()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+    def with_structured_output(self, schema, **kwargs: Any):
+        def structured(messages: List[BaseMessage]):
+            score = heuristic_score(messages)
+            return schema(**{field: score for field in schema.model_fields})
+
+        def invoke(prompt_value):
+            messages = _as_messages(prompt_value)
+            self._enter()
+            try:
+                time.sleep(self.latency)
+            finally:
+                self._exit()
+            return structured(messages)
+
+        async def ainvoke(prompt_value):
+            messages = _as_messages(prompt_value)
+            self._enter()
+            try:
+                await asyncio.sleep(self.latency)
+            finally:
+                self._exit()
+            return structured(messages)
+
+        return RunnableLambda(invoke, afunc=ainvoke, name="FakeStructuredOutput")
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings (feature hashing, L2-normalised).
+
+    Texts sharing words get similar vectors, which is enough for retrieval and
+    similarity thresholds in offline runs. ``latency_per_call`` and
+    ``latency_per_text`` simulate the cost of a remote embedding API;
+    ``calls`` and ``embedded_texts`` count the work actually done.
+    """
+
+    def __init__(self, size: int = 256, latency_per_call: float = 0.0, latency_per_text: float = 0.0):
+        self.size = size
+        self.model = f"hashing-{size}"
+        self.latency_per_call = latency_per_call
+        self.latency_per_text = latency_per_text
+        self.calls = 0
+        self.embedded_texts = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for word in content_words(text):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def _account(self, count: int) -> float:
+        with self._lock:
+            self.calls += 1
+            self.embedded_texts += count
+        return self.latency_per_call + self.latency_per_text * count
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self._account(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self._account(1))
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self._account(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self._account(1))
+        return self._vector(text)
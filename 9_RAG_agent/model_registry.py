@@ -0,0 +1,203 @@
+"""Process-wide registry of chat model clients shared by the graph nodes.
+
+The RAG notebooks used to build a new ``ChatOpenAI`` (and re-run
+``bind_tools`` / ``with_structured_output``) inside every node call, paying
+client construction, schema conversion and a fresh HTTP connection pool on
+each invocation. The registry builds every configured, tool-bound or
+structured model once, routes all of them through one pooled ``httpx``
+client, and can open connections ahead of the first request with ``warm()``.
+
+``stats()["saved_seconds"]`` estimates the setup each reuse avoided: building
+the model, building the private HTTP clients it would otherwise create, and
+opening a new connection to its endpoint. The client cost is timed when the
+registry creates its pooled clients. The connection cost is timed by
+``warm()``, as the first request on a pooled client minus a second request that
+reuses its connection, so it is only counted for warmed endpoints.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+import httpx
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _tool_key(tool: Any) -> Hashable:
+    name = getattr(tool, "name", None) or getattr(tool, "__name__", None)
+    return name if name is not None else repr(tool)
+
+
+def _default_factory(**kwargs: Any):
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(**kwargs)
+
+
+class ModelRegistry:
+    """Create each distinct model configuration once and hand out the same instance.
+
+    Args:
+        model_factory: callable building a chat model from keyword arguments;
+            defaults to ``ChatOpenAI``.
+        max_connections: size of the shared HTTP connection pool.
+        share_http_client: pass one pooled ``httpx.Client``/``httpx.AsyncClient``
+            to every model so they reuse keep-alive connections.
+    """
+
+    def __init__(
+        self,
+        model_factory: Optional[Callable[..., Any]] = None,
+        max_connections: int = 20,
+        share_http_client: bool = True,
+    ):
+        self._factory = model_factory or _default_factory
+        self._models: Dict[Hashable, Any] = {}
+        self._setup_seconds: Dict[Hashable, float] = {}
+        self._endpoints: Dict[Hashable, str] = {}
+        self._base: Dict[Hashable, Hashable] = {}
+        self.client_seconds = 0.0
+        self.connect_seconds: Dict[str, float] = {}
+        # Re-entrant: with_tools()/structured() build on top of chat() while holding the lock.
+        self._lock = threading.RLock()
+        self.created = 0
+        self.reused = 0
+        self.saved_seconds = 0.0
+        self.http_client: Optional[httpx.Client] = None
+        self.http_async_client: Optional[httpx.AsyncClient] = None
+        if share_http_client:
+            start = time.perf_counter()
+            limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            self.http_client = httpx.Client(limits=limits, timeout=httpx.Timeout(60.0, connect=5.0))
+            self.http_async_client = httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(60.0, connect=5.0))
+            # Without the shared pool, every model built per call creates this pair itself.
+            self.client_seconds = time.perf_counter() - start
+
+    def _get_or_create(self, key: Hashable, build: Callable[[], Any], base: Optional[Hashable] = None):
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self.reused += 1
+                endpoint = self._endpoints.get(self._base.get(key, key))
+                self.saved_seconds += (self._setup_seconds[key] + self.client_seconds
+                                       + self.connect_seconds.get(endpoint, 0.0))
+                return model
+            base_built = base is not None and base in self._models
+            start = time.perf_counter()
+            model = build()
+            seconds = time.perf_counter() - start
+            if base is not None:
+                self._base[key] = base
+                if base_built:
+                    # Rebuilding this per call would rebuild the chat model under it too.
+                    seconds += self._setup_seconds[base]
+            self._setup_seconds[key] = seconds
+            self._models[key] = model
+            self.created += 1
+            return model
+
+    def chat(self, **kwargs: Any):
+        """Return the shared chat model for these constructor arguments."""
+        key = ("chat", _freeze(kwargs))
+
+        def build():
+            client_kwargs = dict(kwargs)
+            if self.http_client is not None:
+                client_kwargs.setdefault("http_client", self.http_client)
+                client_kwargs.setdefault("http_async_client", self.http_async_client)
+            model = self._factory(**client_kwargs)
+            root_client = getattr(model, "root_client", None)
+            if root_client is not None:
+                self._endpoints[key] = str(root_client.base_url)
+            return model
+
+        return self._get_or_create(key, build)
+
+    def with_tools(self, tools: Sequence[Any], bind_kwargs: Optional[dict] = None, **kwargs: Any):
+        """Return the shared ``chat(**kwargs).bind_tools(tools)`` runnable."""
+        bind_kwargs = bind_kwargs or {}
+        key = ("tools", _freeze(kwargs), tuple(_tool_key(tool) for tool in tools), _freeze(bind_kwargs))
+        return self._get_or_create(key, lambda: self.chat(**kwargs).bind_tools(tools, **bind_kwargs),
+                                   base=("chat", _freeze(kwargs)))
+
+    def structured(self, schema: Any, **kwargs: Any):
+        """Return the shared ``chat(**kwargs).with_structured_output(schema)`` runnable."""
+        key = ("structured", _freeze(kwargs), _tool_key(schema))
+        return self._get_or_create(key, lambda: self.chat(**kwargs).with_structured_output(schema),
+                                   base=("chat", _freeze(kwargs)))
+
+    def warm(self, *configs: dict, ping: bool = True) -> float:
+        """Build the given chat configurations up front and open pooled connections.
+
+        ``ping`` sends one cheap request per distinct endpoint (``GET /models``)
+        so the first real node call does not pay TCP/TLS setup, and a second one
+        on the open connection: the difference is the connection setup that
+        every reuse of a model on that endpoint saves. Failures are ignored:
+        warming is an optimization, not a health check.
+        Returns the seconds spent warming.
+        """
+        start = time.perf_counter()
+        models = [self.chat(**config) for config in (configs or ({},))]
+        if ping:
+            pinged = set()
+            for model in models:
+                root_client = getattr(model, "root_client", None)
+                if root_client is None or str(root_client.base_url) in pinged:
+                    continue
+                pinged.add(str(root_client.base_url))
+                client = root_client.with_options(max_retries=0, timeout=5.0)
+                try:
+                    first = time.perf_counter()
+                    client.models.list()
+                    second = time.perf_counter()
+                    client.models.list()
+                    reused = time.perf_counter() - second
+                except Exception:
+                    continue
+                self.connect_seconds[str(root_client.base_url)] = max(0.0, (second - first) - reused)
+        return time.perf_counter() - start
+
+    def stats(self) -> dict:
+        return {
+            "models": len(self._models),
+            "created": self.created,
+            "reused": self.reused,
+            "setup_seconds": sum(self._setup_seconds.values()),
+            "client_seconds": self.client_seconds,
+            "connect_seconds": dict(self.connect_seconds),
+            "saved_seconds": self.saved_seconds,
+        }
+
+    def close(self) -> None:
+        """Close both pooled clients. Inside a running event loop use :meth:`aclose` instead."""
+        if self.http_async_client is not None and not self.http_async_client.is_closed:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(self.http_async_client.aclose())
+            else:
+                raise RuntimeError("ModelRegistry.close() called inside an event loop; await aclose() instead")
+        if self.http_client is not None:
+            self.http_client.close()
+
+    async def aclose(self) -> None:
+        """Close both pooled clients from async code."""
+        if self.http_async_client is not None:
+            await self.http_async_client.aclose()
+        if self.http_client is not None:
+            self.http_client.close()
+
+
+# The registry the notebooks share.
+registry = ModelRegistry()
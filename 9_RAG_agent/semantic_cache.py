@@ -0,0 +1,162 @@
+"""Semantic answer cache for the multi-step RAG graph.
+
+Questions that were effectively answered before ("what are the timings?",
+"when is the gym open?") still pay for classification, retrieval, grading
+and generation. The cache embeds the rephrased question, compares it with
+the questions it has answered (cosine similarity) and returns the stored
+answer when the best match clears ``threshold``.
+
+Entries are evicted least-recently-used beyond ``max_entries`` and expire
+after ``ttl`` seconds. Answers are only valid for the document index they
+were generated from, so the cache is bound to an index version and empties
+itself when that version changes. Pass the live version
+(``vector_index.index_version``) to :meth:`bind_index` before each lookup,
+so re-ingesting documents while the graph is running invalidates the cache.
+A miss remembers the version it was looked up under, and :meth:`store` drops
+the answer if the index changed in between: it was built from the old index.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class CacheHit:
+    answer: str
+    question: str
+    similarity: float
+
+
+@dataclass
+class _Entry:
+    question: str
+    answer: str
+    vector: np.ndarray
+    created_at: float
+
+
+def _normalize(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class SemanticAnswerCache:
+    """Answers keyed by question embedding, looked up by nearest neighbour.
+
+    Args:
+        embedding_function: any LangChain ``Embeddings``; ``embed_query`` is
+            called once per lookup.
+        threshold: minimum cosine similarity for a hit. Paraphrases under
+            OpenAI embeddings typically score above 0.9.
+        max_entries: LRU capacity.
+        ttl: seconds an answer stays valid (``None`` keeps it until evicted).
+        index_version: version of the document index the answers come from.
+    """
+
+    def __init__(
+        self,
+        embedding_function,
+        threshold: float = 0.92,
+        max_entries: int = 256,
+        ttl: Optional[float] = 24 * 3600,
+        index_version: str = "",
+    ):
+        self.embedding_function = embedding_function
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.index_version = index_version
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Vector and index version of recent misses, so storing their answer does not embed the
+        # question again, and an answer built from an index that changed since is not stored.
+        self._pending: "OrderedDict[str, Tuple[np.ndarray, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+
+    def bind_index(self, index_version: str) -> None:
+        """Drop every answer if the document index changed since they were cached."""
+        with self._lock:
+            if index_version == self.index_version:
+                return
+            self.index_version = index_version
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def _expire(self, now: float) -> None:
+        if self.ttl is None:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    def lookup(self, question: str) -> Optional[CacheHit]:
+        """Return the cached answer of the most similar question, if it is similar enough."""
+        vector = _normalize(self.embedding_function.embed_query(question))
+        with self._lock:
+            self.lookups += 1
+            self._expire(time.time())
+            best_key, best_similarity = None, -1.0
+            if self._entries:
+                keys = list(self._entries)
+                similarities = np.stack([self._entries[key].vector for key in keys]) @ vector
+                best = int(np.argmax(similarities))
+                best_key, best_similarity = keys[best], float(similarities[best])
+            if best_key is not None and best_similarity >= self.threshold:
+                self.hits += 1
+                self._entries.move_to_end(best_key)
+                entry = self._entries[best_key]
+                return CacheHit(answer=entry.answer, question=entry.question, similarity=best_similarity)
+            self._pending[question] = (vector, self.index_version)
+            while len(self._pending) > self.max_entries:
+                self._pending.popitem(last=False)
+            return None
+
+    def store(self, question: str, answer: str) -> None:
+        """Cache ``answer`` under ``question``, the text that missed in :meth:`lookup`."""
+        with self._lock:
+            pending = self._pending.pop(question, None)
+        if pending is None:
+            vector, version = _normalize(self.embedding_function.embed_query(question)), None
+        else:
+            vector, version = pending
+        with self._lock:
+            if version is not None and version != self.index_version:
+                self.stale_stores += 1
+                return
+            self._entries[question] = _Entry(question, answer, vector, time.time())
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "misses": self.lookups - self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_stores": self.stale_stores,
+                "index_version": self.index_version,
+            }
@@ -0,0 +1,217 @@
+"""Speculative retrieval alongside topic classification.
+
+In the classification-driven RAG graphs ``retrieve`` cannot start until the
+gpt-4o ``question_classifier`` has answered, although nearly every question
+turns out to be on-topic. With speculation enabled, the wrapped classifier
+node hands a copy of the state to a background thread that runs the
+retrieval steps (``retrieve``, optionally ``retrieval_grader``) while the
+classifier call is in flight:
+
+* on-topic: the wrapped ``retrieve``/``retrieval_grader`` nodes pick up the
+  speculative result (waiting for it if it is still running) instead of
+  doing the work again;
+* off-topic: the result is discarded, and steps that have not started yet
+  are skipped.
+
+Results are held here, keyed by question, rather than in the graph state,
+so the state stays serialisable for checkpointers and the graph keeps its
+shape. A node whose question has no speculation pending (for example
+``retrieve`` after ``refine_question``) simply runs as before.
+"""
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+Node = Callable[[dict], Any]
+
+
+class _Speculation:
+    def __init__(self, steps: int):
+        self.futures: List[Future] = [Future() for _ in range(steps)]
+        self.durations: List[Optional[float]] = [None] * steps
+        self.users = 0
+        self.discarded = False
+
+
+class SpeculativeRetrieval:
+    """Run retrieval steps in parallel with the classifier and keep them only for on-topic questions.
+
+    Args:
+        steps: the nodes to speculate, in graph order, e.g. ``[retrieve]`` or
+            ``[retrieve, retrieval_grader]``. They get a shallow copy of the
+            state, so they must assign state keys rather than mutate shared
+            values in place (the notebook nodes do).
+        question: returns the question a state is about; speculation is
+            matched to the later nodes by this value.
+        on_topic: decides from the classifier's output state whether the
+            speculative result is used.
+        enabled: with ``False`` every wrapper returns the node unchanged.
+        max_workers: background threads shared by all graph runs.
+        max_pending: speculations kept for runs that never reach their steps
+            (e.g. a run that failed after classification); oldest go first.
+    """
+
+    def __init__(
+        self,
+        steps: Sequence[Node],
+        question: Callable[[dict], str],
+        on_topic: Callable[[dict], bool],
+        enabled: bool = True,
+        max_workers: int = 4,
+        max_pending: int = 64,
+    ):
+        self.steps = list(steps)
+        self.question = question
+        self.on_topic = on_topic
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-speculation")
+        self._pending: "OrderedDict[str, _Speculation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.speculated = 0
+        self.used = 0
+        self.discarded = 0
+        self.steps_used = 0
+        self.steps_wasted = 0
+        self.steps_skipped = 0
+        self.saved_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    # --- background side -------------------------------------------------
+
+    def _run(self, speculation: _Speculation, state: dict) -> None:
+        for index, step in enumerate(self.steps):
+            if speculation.discarded:
+                for future in speculation.futures[index:]:
+                    future.cancel()
+                with self._lock:
+                    self.steps_skipped += len(self.steps) - index
+                return
+            before = dict(state)
+            started = time.perf_counter()
+            try:
+                state = dict(step(state) or state)
+            except Exception as e:
+                # The node runs again for real when the graph reaches it, and fails there if it must.
+                for future in speculation.futures[index:]:
+                    future.set_exception(e)
+                return
+            finally:
+                speculation.durations[index] = time.perf_counter() - started
+            changed = {key: value for key, value in state.items() if before.get(key) is not value}
+            # Under the lock, so a concurrent _discard counts this step either here or there, never twice.
+            with self._lock:
+                if speculation.discarded:
+                    self.steps_wasted += 1
+                    self.wasted_seconds += speculation.durations[index]
+                speculation.futures[index].set_result(changed)
+
+    def _start(self, state: dict) -> None:
+        key = self.question(state)
+        with self._lock:
+            speculation = self._pending.get(key)
+            if speculation is None:
+                speculation = _Speculation(len(self.steps))
+                self._pending[key] = speculation
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                # Copy the context so the steps run under the classifier's trace and config.
+                context = contextvars.copy_context()
+                self._executor.submit(context.run, self._run, speculation, dict(state))
+                self.speculated += 1
+            speculation.users += 1
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            speculation = self._pending.get(key)
+            if speculation is None:
+                return
+            speculation.users -= 1
+            if speculation.users > 0:
+                return
+            del self._pending[key]
+            speculation.discarded = True
+            self.discarded += 1
+            # Steps that already finished were wasted; a running step is counted when it ends.
+            for future, duration in zip(speculation.futures, speculation.durations):
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    self.steps_wasted += 1
+                    self.wasted_seconds += duration
+
+    # --- graph side ------------------------------------------------------
+
+    def classifier(self, node: Node) -> Node:
+        """Wrap the classifier node so the speculative steps start before it runs."""
+        if not self.enabled or not self.steps:
+            return node
+
+        def classify(state: dict):
+            key = self.question(state)
+            self._start(state)
+            try:
+                result = node(state)
+            except BaseException:
+                self._discard(key)
+                raise
+            if not self.on_topic(state if result is None else result):
+                self._discard(key)
+            return result
+
+        classify.__name__ = getattr(node, "__name__", "classify")
+        return classify
+
+    def step(self, node: Node) -> Node:
+        """Wrap one of ``steps`` so it uses the speculative result for its question when there is one."""
+        if not self.enabled or node not in self.steps:
+            return node
+        index = self.steps.index(node)
+        last = index == len(self.steps) - 1
+
+        def speculative_step(state: dict):
+            key = self.question(state)
+            with self._lock:
+                speculation = self._pending.get(key)
+                if speculation is not None and last:
+                    speculation.users -= 1
+                    if speculation.users <= 0:
+                        del self._pending[key]
+            if speculation is None:
+                return node(state)
+            future = speculation.futures[index]
+            waited = time.perf_counter()
+            try:
+                changed = future.result()
+            except Exception:
+                return node(state)
+            waited = time.perf_counter() - waited
+            with self._lock:
+                self.steps_used += 1
+                if index == 0:
+                    self.used += 1
+                self.saved_seconds += max(0.0, speculation.durations[index] - waited)
+            state.update(changed)
+            return state
+
+        speculative_step.__name__ = getattr(node, "__name__", "step")
+        return speculative_step
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "speculated": self.speculated,
+                "used": self.used,
+                "discarded": self.discarded,
+                "steps_used": self.steps_used,
+                "steps_wasted": self.steps_wasted,
+                "steps_skipped": self.steps_skipped,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "wasted_seconds": round(self.wasted_seconds, 3),
+                "pending": len(self._pending),
+            }
+
+    def close(self, wait: bool = False) -> None:
+        """Stop the background threads; ``wait=True`` lets running steps finish (and be counted) first."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
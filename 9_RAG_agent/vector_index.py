@@ -0,0 +1,163 @@
+"""Persistent Chroma index with a content-hash embedding cache.
+
+``Chroma.from_documents(docs, embedding_function)`` re-embeds the whole corpus
+into a fresh in-memory collection every time a notebook starts. Here the
+collection lives in ``persist_directory`` next to a manifest of the content
+hash of every indexed document. On start-up the manifest is diffed against
+the current ``docs``: only added or changed documents are embedded, removed
+ones are deleted, and everything else is loaded from disk. Embeddings are
+also cached by text hash in ``cache_directory`` (``CacheBackedEmbeddings``),
+so rebuilding the collection never pays for a text it has embedded before.
+
+``index_version(persist_directory)`` reads the version of whatever was last
+synced into the directory (by this or any other process), so caches derived
+from retrieval results can check it on every use instead of trusting the
+version from start-up.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.schema import Document
+from langchain.storage import LocalFileStore
+from langchain_community.vectorstores import Chroma
+
+MANIFEST_FILE = "manifest.json"
+
+# manifest path -> ((inode, mtime_ns, size), version), so index_version() only re-reads a changed manifest
+_versions: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+
+
+@dataclass
+class IndexSyncReport:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    rebuilt: bool = False
+    seconds: float = 0.0
+    # Changes whenever the indexed documents or the embedding model change;
+    # caches derived from retrieval results use it to invalidate themselves.
+    version: str = ""
+
+    def __str__(self) -> str:
+        return (f"index sync: {len(self.added)} added, {len(self.removed)} removed, "
+                f"{self.unchanged} unchanged{' (rebuilt)' if self.rebuilt else ''} in {self.seconds:.2f}s")
+
+
+def document_id(doc: Document) -> str:
+    """Content hash of a document; a changed document gets a new id."""
+    payload = json.dumps({"page_content": doc.page_content, "metadata": doc.metadata},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def embedding_namespace(embedding_function) -> str:
+    """Identify the embedding model so vectors from different models never mix."""
+    model = getattr(embedding_function, "model", None) or getattr(embedding_function, "model_name", None)
+    name = f"{type(embedding_function).__name__}-{model}" if model else type(embedding_function).__name__
+    # also used as a LocalFileStore key prefix, which only allows path-safe characters
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+def _read_manifest(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)  # atomic, so a crash never leaves a half-written manifest
+
+
+def _version(namespace: str, doc_ids) -> str:
+    return hashlib.sha256("\n".join([namespace, *sorted(doc_ids)]).encode("utf-8")).hexdigest()[:16]
+
+
+def index_version(persist_directory: str = "chroma_index") -> str:
+    """Version of the index as currently synced to ``persist_directory``; ``""`` if there is none.
+
+    Same value as ``IndexSyncReport.version`` of the last ``load_persistent_index``
+    that wrote the directory. One ``stat`` per call while the manifest is unchanged.
+    """
+    manifest_path = os.path.join(persist_directory, MANIFEST_FILE)
+    try:
+        stat = os.stat(manifest_path)
+    except FileNotFoundError:
+        return ""
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)  # the manifest is replaced, never edited in place
+    cached = _versions.get(manifest_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    manifest = _read_manifest(manifest_path)
+    version = _version(manifest["embedding"], manifest.get("documents", {})) if manifest.get("embedding") else ""
+    _versions[manifest_path] = (key, version)
+    return version
+
+
+def load_persistent_index(
+    docs: List[Document],
+    embedding_function,
+    persist_directory: str = "chroma_index",
+    cache_directory: Optional[str] = "embedding_cache",
+    collection_name: str = "gym_docs",
+) -> Tuple[Chroma, IndexSyncReport]:
+    """Open (or create) the persisted collection and bring it in line with ``docs``."""
+    start = time.perf_counter()
+    os.makedirs(persist_directory, exist_ok=True)
+    namespace = embedding_namespace(embedding_function)
+
+    embeddings = embedding_function
+    if cache_directory:
+        embeddings = CacheBackedEmbeddings.from_bytes_store(
+            embedding_function, LocalFileStore(cache_directory), namespace=namespace
+        )
+
+    db = Chroma(collection_name=collection_name, embedding_function=embeddings,
+                persist_directory=persist_directory)
+
+    manifest_path = os.path.join(persist_directory, MANIFEST_FILE)
+    manifest = _read_manifest(manifest_path)
+    indexed = manifest.get("documents", {}) if manifest.get("collection") == collection_name else {}
+
+    report = IndexSyncReport()
+    # A different embedding model, or a collection that no longer matches its
+    # manifest (deleted by hand, interrupted write), is rebuilt from scratch.
+    if manifest.get("embedding") != namespace or db._collection.count() != len(indexed):
+        if indexed or db._collection.count():
+            report.rebuilt = True
+            db.delete_collection()
+            db = Chroma(collection_name=collection_name, embedding_function=embeddings,
+                        persist_directory=persist_directory)
+        indexed = {}
+
+    current = {}
+    for doc in docs:
+        current.setdefault(document_id(doc), doc)
+
+    report.removed = [doc_id for doc_id in indexed if doc_id not in current]
+    report.added = [doc_id for doc_id in current if doc_id not in indexed]
+    report.unchanged = len(current) - len(report.added)
+
+    if report.removed:
+        db.delete(ids=report.removed)
+    if report.added:
+        db.add_documents([current[doc_id] for doc_id in report.added], ids=report.added)
+
+    report.version = _version(namespace, current)
+    _write_manifest(manifest_path, {
+        "collection": collection_name,
+        "embedding": namespace,
+        "documents": {doc_id: doc.metadata.get("source", "") for doc_id, doc in current.items()},
+    })
+    report.seconds = time.perf_counter() - start
+    return db, report
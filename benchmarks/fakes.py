@@ -0,0 +1,205 @@
+"""Deterministic offline stand-ins for every provider the tutorials call.
+
+* :class:`ScriptedChatModel` replaces ChatOpenAI / ChatGroq / Gemini. It supports
+  ``bind_tools`` (forced or free tool choice), ``with_structured_output`` (via
+  LangChain's tool-calling implementation), text-format ReAct prompts and
+  token streaming. Arguments for tool calls and structured output are
+  synthesized from the JSON schema, and fields can be scripted per schema.
+* ``FakeSearchTool`` (4_reflexion_agent_system/fake_search.py) replaces Tavily.
+* ``HashingEmbeddings`` (9_RAG_agent/fake_models.py) replaces OpenAIEmbeddings.
+
+Every fake sleeps for an injected latency and records how long it waited, so
+the runner can subtract simulated provider time from wall time.
+"""
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from itertools import count
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+ROOT = Path(__file__).resolve().parent.parent
+for _folder in ("shared", "2_basic_reflection_system", "4_reflexion_agent_system", "6_react_agent", "7_chatbot",
+                "9_RAG_agent", "10_multi_agent_architecture"):
+    if str(ROOT / _folder) not in sys.path:
+        sys.path.append(str(ROOT / _folder))
+
+from fake_models import HashingEmbeddings  # noqa: E402
+from fake_search import FakeSearchTool  # noqa: E402
+
+__all__ = ["FakeSearchTool", "HashingEmbeddings", "ScriptedChatModel", "synthesize"]
+
+_REACT_TOOLS = re.compile(r"should be one of \[([^\]]*)\]")
+
+
+def _last_human(messages: Sequence[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return str(message.content)
+    return str(messages[-1].content) if messages else ""
+
+
+def synthesize(schema: Dict[str, Any], hint: str, field: str = "value",
+               choose=lambda field, options: options[0]) -> Any:
+    """Deterministic value for a JSON schema; strings mention ``hint``."""
+    if "enum" in schema:
+        return choose(field, list(schema["enum"]))
+    if "anyOf" in schema:
+        return synthesize(schema["anyOf"][0], hint, field, choose)
+    kind = schema.get("type", "string")
+    if kind == "object":
+        return {name: synthesize(sub, hint, name, choose) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [synthesize(schema.get("items", {}), f"{hint} ({i + 1})", field, choose) for i in range(2)]
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return True
+    return choose(field, [f"{field} for: {hint[:60]}"])
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model with scripted, schema-aware answers and injected latency.
+
+    * Forced tool choice (``tool_choice`` set, as ``with_structured_output`` does):
+      always calls the first bound tool.
+    * Free tool choice: calls the first bound tool until a ``ToolMessage`` follows
+      the last human message, then answers in text.
+    * ReAct text prompts (``Action Input:``): one ``Action`` on the first tool named
+      in the prompt, then a ``Final Answer`` once an observation is present.
+
+    ``choices`` scripts field values by ``"Schema.field"`` (or just ``"field"``):
+    either a constant or a callable receiving the prompt messages, so answers
+    stay the same however often a graph is re-run. Unscripted enum fields take
+    their first option.
+    """
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    reply: str = "Here is a concise, well-structured answer that covers the key points of the request."
+    choices: Dict[str, Any] = {}
+    calls: int = 0
+    waited: float = 0.0
+    _ids: Any = PrivateAttr(default_factory=lambda: count(1))
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def bind_tools(self, tools, *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    # -- answers -------------------------------------------------------------
+
+    def _choose(self, schema_name: str, messages: List[BaseMessage]):
+        def choose(field: str, options: List[Any]) -> Any:
+            key = next((k for k in (f"{schema_name}.{field}", field) if k in self.choices), None)
+            if key is None:
+                return options[0]
+            script = self.choices[key]
+            return script(messages) if callable(script) else script
+        return choose
+
+    def _tool_call(self, tool: Dict[str, Any], messages: List[BaseMessage]) -> Dict[str, Any]:
+        function = tool["function"]
+        args = synthesize(function.get("parameters", {}), _last_human(messages),
+                          choose=self._choose(function["name"], messages))
+        return {"name": function["name"], "args": args, "id": f"call_{next(self._ids)}", "type": "tool_call"}
+
+    def _respond(self, messages: List[BaseMessage], tools=None, tool_choice=None) -> AIMessage:
+        hint = _last_human(messages)
+        text = "\n".join(str(message.content) for message in messages)
+        if tools:
+            answered = False
+            for message in reversed(messages):
+                if isinstance(message, ToolMessage):
+                    answered = True
+                if isinstance(message, HumanMessage):
+                    break
+            if tool_choice not in (None, "none", "auto") or not answered:
+                return AIMessage(content="", tool_calls=[self._tool_call(tools[0], messages)])
+        if "Action Input:" in text:
+            if "Observation:" in text.split("Question:")[-1]:
+                return AIMessage(content=f"Thought: I now know the final answer\nFinal Answer: {self.reply}")
+            names = _REACT_TOOLS.search(text)
+            tool = names.group(1).split(",")[0].strip() if names else "search"
+            return AIMessage(content=f"Thought: I should look this up.\nAction: {tool}\nAction Input: {hint[:80]}")
+        return AIMessage(content=f"{self.reply} ({len(messages)} messages in context)")
+
+    def _with_usage(self, message: AIMessage, messages: List[BaseMessage]) -> AIMessage:
+        """Word counts standing in for the provider's token usage."""
+        prompt = sum(len(str(m.content).split()) for m in messages)
+        completion = len(str(message.content).split()) + sum(len(json.dumps(call["args"]).split())
+                                                             for call in message.tool_calls)
+        message.usage_metadata = {"input_tokens": prompt, "output_tokens": completion,
+                                  "total_tokens": prompt + completion}
+        return message
+
+    def _delay(self, message: AIMessage) -> float:
+        words = len(str(message.content).split()) if self.tokens_per_second else 0
+        delay = self.latency + (words / self.tokens_per_second if words else 0.0)
+        with self._lock:
+            self.calls += 1
+            self.waited += delay
+        return delay
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, tools=None, tool_choice=None, **kwargs: Any) -> ChatResult:
+        message = self._with_usage(self._respond(messages, tools, tool_choice), messages)
+        time.sleep(self._delay(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, tools=None, tool_choice=None, **kwargs: Any) -> ChatResult:
+        message = self._with_usage(self._respond(messages, tools, tool_choice), messages)
+        await asyncio.sleep(self._delay(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, message: AIMessage) -> List[AIMessageChunk]:
+        if message.tool_calls:
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)])]
+        else:
+            words = str(message.content).split(" ")
+            chunks = [AIMessageChunk(content=word + (" " if i < len(words) - 1 else ""))
+                      for i, word in enumerate(words)]
+        chunks[-1].usage_metadata = message.usage_metadata  # providers report usage on the last chunk
+        return chunks
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, tools=None, tool_choice=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        message = self._with_usage(self._respond(messages, tools, tool_choice), messages)
+        chunks = self._chunks(message)
+        delay = self._delay(message)
+        time.sleep(self.latency)
+        for chunk in chunks:
+            time.sleep((delay - self.latency) / len(chunks))
+            if run_manager:
+                run_manager.on_llm_new_token(str(chunk.content), chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, tools=None, tool_choice=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._with_usage(self._respond(messages, tools, tool_choice), messages)
+        chunks = self._chunks(message)
+        delay = self._delay(message)
+        await asyncio.sleep(self.latency)
+        for chunk in chunks:
+            await asyncio.sleep((delay - self.latency) / len(chunks))
+            if run_manager:
+                await run_manager.on_llm_new_token(str(chunk.content), chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
@@ -0,0 +1,189 @@
+"""Startup profile of the tutorial entry points: what a cold worker spends importing.
+
+For every entry point (a tutorial script that no sibling script or notebook imports), the
+script's top-level import statements are run in a fresh interpreter under
+``python -X importtime`` from the script's folder. Local modules it imports
+run completely, as they would at start-up; the script's own graph invocation
+and ``input()`` loops do not, so no API calls are made. Dummy provider keys
+are set so clients can be constructed offline.
+
+Reported per entry point: wall time of the interpreter (median of
+``--repeat``), import time, and the packages that import time went to
+(self time summed per top-level package). ``--top`` also lists the slowest
+modules by cumulative time.
+
+    python profile_startup.py                               # every entry point
+    python profile_startup.py 6_react_agent/react_graph.py --top 15
+    python profile_startup.py --compare HEAD~1              # cold start before (HEAD~1) and after (working tree)
+"""
+import argparse
+import ast
+import io
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+SKIP_PREFIXES = ("benchmark_", "evaluate_", "fake_", "profile_")
+DUMMY_KEYS = ("OPENAI_API_KEY", "TAVILY_API_KEY", "GOOGLE_API_KEY", "GROQ_API_KEY")
+
+
+@dataclass
+class Profile:
+    entry_point: str
+    wall: float = 0.0
+    imports: float = 0.0
+    packages: Dict[str, float] = field(default_factory=dict)
+    modules: List[Tuple[str, float]] = field(default_factory=list)  # (module, cumulative s)
+    error: Optional[str] = None
+
+
+_NOTEBOOK_IMPORT = re.compile(r"^\s*(?:from|import)\s+([A-Za-z_]\w*)", re.MULTILINE)
+
+
+def _imported_names(path: Path) -> set:
+    if path.suffix == ".ipynb":
+        cells = json.loads(path.read_text(encoding="utf-8"))["cells"]
+        return {name for cell in cells if cell["cell_type"] == "code"
+                for name in _NOTEBOOK_IMPORT.findall("".join(cell["source"]))}
+    names = set()
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def discover_entry_points(root: Path = ROOT) -> List[str]:
+    """Tutorial scripts relative to ``root``, leaving out benchmarks, fakes and modules a sibling imports."""
+    entry_points = []
+    for folder in sorted(root.glob("[0-9]*_*"), key=lambda p: int(p.name.split("_")[0])):
+        scripts = [p for p in sorted(folder.glob("*.py")) if not p.name.startswith(SKIP_PREFIXES)]
+        helpers = set().union(*(_imported_names(p) for p in scripts + sorted(folder.glob("*.ipynb"))))
+        entry_points += [str(p.relative_to(root)) for p in scripts if p.stem not in helpers]
+    return entry_points
+
+
+def import_statements(path: Path) -> str:
+    """The module-level import statements of ``path`` (those inside ``try`` blocks included)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    statements = []
+
+    def collect(body):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                statements.append(ast.unparse(node))
+            elif isinstance(node, ast.Try):
+                collect(node.body)
+    collect(tree.body)
+    return "\n".join(statements)
+
+
+def _parse_importtime(stderr: str) -> Tuple[float, Dict[str, float], List[Tuple[str, float]]]:
+    packages: Dict[str, float] = defaultdict(float)
+    modules = []
+    total = 0.0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        module = name.strip()
+        self_s, cumulative_s = int(self_us) / 1e6, int(cumulative_us) / 1e6
+        packages[module.split(".")[0]] += self_s
+        modules.append((module, cumulative_s))
+        total += self_s
+    return total, dict(packages), modules
+
+
+def profile(root: Path, entry_point: str, repeat: int = 3, timeout: float = 120.0) -> Profile:
+    path = root / entry_point
+    result = Profile(entry_point)
+    env = dict(os.environ, PYTHONWARNINGS="ignore", ANONYMIZED_TELEMETRY="False")
+    for key in DUMMY_KEYS:
+        env.setdefault(key, "dummy-key-for-startup-profiling")
+    code = import_statements(path)
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=path.parent, env=env,
+                                       capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            result.error = f"timed out after {timeout:.0f}s (network access at import?)"
+            return result
+        walls.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+            result.error = errors[-1] if errors else f"exit status {completed.returncode}"
+            return result
+        imports, packages, modules = _parse_importtime(completed.stderr)
+        if not result.packages or imports < result.imports:  # keep the quietest run's breakdown
+            result.imports, result.packages, result.modules = imports, packages, modules
+    result.wall = statistics.median(walls)
+    return result
+
+
+def _checkout(ref: str, destination: Path) -> Path:
+    archive = subprocess.run(["git", "-C", str(ROOT), "archive", "--format=tar", ref], capture_output=True, check=True)
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(destination)
+    return destination
+
+
+def print_profile(result: Profile, packages: int, top: int) -> None:
+    if result.error:
+        print(f"{result.entry_point:<52} failed: {result.error}")
+        return
+    heaviest = sorted(result.packages.items(), key=lambda item: -item[1])[:packages]
+    print(f"{result.entry_point:<52} {result.wall:>7.2f} {result.imports:>9.2f}  "
+          + ", ".join(f"{name} {seconds:.2f}" for name, seconds in heaviest))
+    for module, cumulative in sorted(result.modules, key=lambda item: -item[1])[:top]:
+        print(f"    {cumulative:>7.3f}s  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entry_points", nargs="*", help="scripts relative to the repository root (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--packages", type=int, default=4, help="heaviest packages listed per entry point")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules (cumulative)")
+    parser.add_argument("--compare", metavar="REF", help="git ref to compare the working tree against")
+    args = parser.parse_args()
+
+    entry_points = args.entry_points or discover_entry_points()
+    if not args.compare:
+        print(f"{'entry point':<52} {'wall s':>7} {'import s':>9}  heaviest packages (self s)")
+        for entry_point in entry_points:
+            print_profile(profile(ROOT, entry_point, args.repeat), args.packages, args.top)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_root = _checkout(args.compare, Path(tmp))
+        print(f"cold start, wall s (median of {args.repeat}): {args.compare} vs working tree")
+        print(f"{'entry point':<52} {'before':>7} {'after':>7} {'change':>8}")
+        for entry_point in entry_points:
+            before = profile(before_root, entry_point, args.repeat) if (before_root / entry_point).exists() else None
+            after = profile(ROOT, entry_point, args.repeat)
+            cells = []
+            for result in (before, after):
+                cells.append("-" if result is None else "error" if result.error else f"{result.wall:.2f}")
+            change = f"{after.wall / before.wall - 1:+.0%}" if before and not before.error and not after.error else ""
+            print(f"{entry_point:<52} {cells[0]:>7} {cells[1]:>7} {change:>8}")
+            for label, result in (("before", before), ("after", after)):
+                if result is not None and result.error:
+                    print(f"    {label}: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
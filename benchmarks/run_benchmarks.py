@@ -0,0 +1,236 @@
+"""Offline benchmark suite for the tutorial graphs (see scenarios.py).
+
+No API keys needed: every model, search tool and embedding is a
+deterministic fake from fakes.py. For each scenario the runner reports:
+
+* ``build_ms``          building and compiling the graph
+* ``latency_ms``        end-to-end time of one workload (median of ``--repeat``; ``latency_min_ms`` too)
+* ``simulated_ms``      part of that spent sleeping in fakes (``--latency`` / ``--tool-latency``)
+* ``supersteps``        supersteps executed, counted from the checkpoints written (subgraphs included)
+* ``overhead_per_superstep_ms``  (latency - simulated) / supersteps: framework plus node code
+* ``peak_memory_kb``    tracemalloc peak while the workload runs
+* ``checkpoints`` / ``checkpoint_bytes``  checkpoints written and serialized bytes held by the saver
+  (the tutorial's own saver if it has one, else a MemorySaver added for this measurement)
+* ``llm_calls`` / ``tool_calls``  fake model and search calls per workload
+
+    python run_benchmarks.py run                              # all scenarios -> results/latest.json
+    python run_benchmarks.py run reflexion supervisor --repeat 20 --output results/after.json
+    python run_benchmarks.py compare results/before.json results/after.json --threshold 0.1
+    python run_benchmarks.py list
+
+``compare`` prints every metric side by side and exits with status 1 when a
+metric got worse by more than ``--threshold`` (relative), ignoring timing
+differences below ``--noise-ms``.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from importlib.metadata import version
+from typing import Any, Dict, List
+
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+from scenarios import SCENARIOS, Fakes, Scenario  # noqa: E402
+
+TIME_METRICS = ("build_ms", "latency_ms", "overhead_per_superstep_ms")
+LOWER_IS_BETTER = TIME_METRICS + ("peak_memory_kb", "checkpoint_bytes", "checkpoints", "supersteps",
+                                  "llm_calls", "tool_calls")
+
+
+def _stored_bytes(saver) -> int:
+    """Serialized bytes held by a MemorySaver (also behind DeltaCheckpointSaver / BoundedMemorySaver)."""
+    while hasattr(saver, "saver"):
+        saver = saver.saver
+
+    def size(value: Any) -> int:
+        if isinstance(value, (bytes, str)):
+            return len(value)
+        if isinstance(value, (tuple, list)):
+            return sum(size(item) for item in value)
+        if isinstance(value, dict):
+            return sum(size(item) for item in value.values())
+        return 0
+
+    return size({thread: dict(namespaces) for thread, namespaces in saver.storage.items()}) \
+        + size(dict(saver.writes)) + size(dict(saver.blobs))
+
+
+def measure(scenario: Scenario, repeat: int, latency: float, tool_latency: float) -> Dict[str, Any]:
+    def checkpointer():
+        return scenario.own_checkpointer() if scenario.own_checkpointer else None
+
+    # warm-up: first-use imports and lazy initialisation stay out of the numbers
+    scenario.build(Fakes(latency, tool_latency), checkpointer())("warmup")
+
+    build_times, latencies, simulated = [], [], []
+    for i in range(repeat):
+        fakes = Fakes(latency, tool_latency)
+        gc.collect()
+        start = time.perf_counter()
+        run = scenario.build(fakes, checkpointer())
+        build_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        run(f"run-{i}")
+        latencies.append(time.perf_counter() - start)
+        simulated.append(fakes.waited)
+
+    run = scenario.build(Fakes(latency, tool_latency), checkpointer())
+    gc.collect()
+    tracemalloc.start()
+    run("memory")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    fakes = Fakes(latency, tool_latency)
+    saver = scenario.own_checkpointer() if scenario.own_checkpointer else MemorySaver()
+    scenario.build(fakes, saver)("checkpoints")
+    checkpoints = list(saver.list(None))
+    supersteps = sum(1 for item in checkpoints if item.metadata.get("source") == "loop")
+
+    latency_ms = statistics.median(latencies) * 1000
+    simulated_ms = statistics.median(simulated) * 1000
+    return {
+        "source": scenario.source,
+        "build_ms": round(statistics.median(build_times) * 1000, 3),
+        "latency_ms": round(latency_ms, 3),
+        "latency_min_ms": round(min(latencies) * 1000, 3),
+        "simulated_ms": round(simulated_ms, 3),
+        "supersteps": supersteps,
+        "overhead_per_superstep_ms": round((latency_ms - simulated_ms) / max(supersteps, 1), 4),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "checkpoints": len(checkpoints),
+        "checkpoint_bytes": _stored_bytes(saver),
+        "llm_calls": fakes.llm_calls,
+        "tool_calls": fakes.tool_calls,
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_command(args) -> int:
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"unknown scenarios: {', '.join(unknown)} (see `list`)", file=sys.stderr)
+        return 2
+
+    results = {}
+    print(f"{'scenario':<20} {'build ms':>9} {'latency ms':>11} {'steps':>6} {'ms/step':>8} "
+          f"{'peak KB':>9} {'ckpt KB':>9} {'llm':>4} {'tool':>5}")
+    for name in names:
+        metrics = measure(SCENARIOS[name], args.repeat, args.latency, args.tool_latency)
+        results[name] = metrics
+        print(f"{name:<20} {metrics['build_ms']:>9.2f} {metrics['latency_ms']:>11.2f} {metrics['supersteps']:>6} "
+              f"{metrics['overhead_per_superstep_ms']:>8.3f} {metrics['peak_memory_kb']:>9.1f} "
+              f"{metrics['checkpoint_bytes'] / 1024:>9.1f} {metrics['llm_calls']:>4} {metrics['tool_calls']:>5}")
+
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "langgraph": version("langgraph"),
+            "langchain_core": version("langchain-core"),
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "tool_latency": args.tool_latency,
+        },
+        "scenarios": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+    return 0
+
+
+def compare_command(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    for key in ("latency", "tool_latency"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(f"warning: runs used different --{key.replace('_', '-')} "
+                  f"({baseline['meta'].get(key)} vs {candidate['meta'].get(key)})")
+
+    regressions: List[str] = []
+    print(f"{'scenario':<20} {'metric':<26} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for name in sorted(set(baseline["scenarios"]) | set(candidate["scenarios"])):
+        before, after = baseline["scenarios"].get(name), candidate["scenarios"].get(name)
+        if before is None or after is None:
+            print(f"{name:<20} {'(only in ' + ('candidate' if before is None else 'baseline') + ')':<26}")
+            continue
+        for metric in LOWER_IS_BETTER:
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            worse = change > args.threshold
+            if metric in TIME_METRICS and abs(new - old) < args.noise_ms:
+                worse = False
+            flag = "  REGRESSION" if worse else ""
+            if worse:
+                regressions.append(f"{name}.{metric}")
+            print(f"{name:<20} {metric:<26} {old:>12g} {new:>12g} {change:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nno regressions above {args.threshold:.0%}")
+    return 0
+
+
+def list_command(args) -> int:
+    for name, scenario in SCENARIOS.items():
+        saver = " (own checkpointer)" if scenario.own_checkpointer else ""
+        print(f"{name:<20} {scenario.source}{saver}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="benchmark scenarios and write a JSON report")
+    run.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    run.add_argument("--repeat", type=int, default=10)
+    run.add_argument("--latency", type=float, default=0.0, help="fake LLM latency per call (s)")
+    run.add_argument("--tool-latency", type=float, default=0.0, help="fake search latency per query (s)")
+    run.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results", "latest.json"))
+    run.set_defaults(handler=run_command)
+
+    compare = commands.add_parser("compare", help="diff two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=0.10, help="relative increase counted as a regression")
+    compare.add_argument("--noise-ms", type=float, default=0.5, help="ignore timing differences smaller than this")
+    compare.set_defaults(handler=compare_command)
+
+    listing = commands.add_parser("list", help="show the available scenarios")
+    listing.set_defaults(handler=list_command)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,754 @@
+"""The tutorial graphs, rebuilt on top of the fakes in fakes.py.
+
+Every tutorial script invokes its graph (or waits on ``input()``) at import
+time and builds real provider clients, so the graphs are mirrored here node
+for node instead of imported. Helpers that live in importable modules
+(context_window, parallel_search, pipelined_search, the reflexion schema, the ReAct tool registry
+and output parser, document_grader, semantic_cache, the chatbot checkpointers
+and reducers) are the real ones.
+
+Each scenario is registered with :func:`scenario` and builds a *workload*:
+``build(fakes, checkpointer)`` compiles the graph and returns
+``run(thread_id)``, which drives one full, deterministic interaction.
+``checkpointer`` is ``None`` when the tutorial compiles without one (the
+runner then passes a MemorySaver only to measure checkpoint size). Scenarios
+whose tutorial brings its own saver declare it with ``own_checkpointer``.
+
+Not covered: 1_Introduction (``initialize_agent``, not a LangGraph graph),
+3_structured_outputs (no graph) and 11_streaming (streams the
+2_chatbot_with_tools graph, covered as ``chatbot_tools``).
+"""
+import datetime
+import operator
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional, Sequence, TypedDict, Union
+
+from langchain.agents import create_react_agent as create_text_react_agent
+from langchain.schema import Document
+from langchain.tools.retriever import create_retriever_tool
+from langchain_core.agents import AgentFinish
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langgraph.graph import END, START, MessageGraph, MessagesState, StateGraph, add_messages
+from langgraph.prebuilt import ToolNode, create_react_agent
+from langgraph.types import Command, interrupt
+from pydantic import BaseModel, Field
+
+from fakes import FakeSearchTool, HashingEmbeddings, ScriptedChatModel  # also puts the tutorial folders on sys.path
+
+from agent_streaming import ROUTING_CONFIG, agent_config
+from bounded_memory_saver import BoundedMemorySaver
+from context_window import make_stop_rule, window_messages
+from delta_checkpointer import DeltaCheckpointSaver
+from fast_router import FastRouter, keyword_rule, question_and_answer, rule, spoke
+from document_grader import build_document_grader, grade_documents
+from fake_models import heuristic_score
+from gym_docs import docs as gym_docs
+from message_budget import summarize_node, token_budget_reducer
+from multi_action_parser import MULTI_ACTION_REACT_PROMPT, MultiActionReActOutputParser
+from pipelined_search import SearchPrefetcher, prefetching_node
+from schema import AnswerQuestion, ReviseAnswer
+from semantic_cache import SemanticAnswerCache
+from tool_limiter import ToolLimiter, ToolLimits
+from tool_registry import ToolRegistry
+
+Workload = Callable[[str], Any]
+
+
+@dataclass
+class Fakes:
+    """Creates the fakes for one build and sums their counters."""
+
+    latency: float = 0.0
+    tool_latency: float = 0.0
+    models: List[ScriptedChatModel] = field(default_factory=list)
+    tools: List[FakeSearchTool] = field(default_factory=list)
+
+    def chat(self, **kwargs: Any) -> ScriptedChatModel:
+        model = ScriptedChatModel(latency=self.latency, **kwargs)
+        self.models.append(model)
+        return model
+
+    def search(self, **kwargs: Any) -> FakeSearchTool:
+        search = FakeSearchTool(default_latency=self.tool_latency, **kwargs)
+        self.tools.append(search)
+        return search
+
+    def embeddings(self) -> HashingEmbeddings:
+        return HashingEmbeddings()
+
+    @property
+    def llm_calls(self) -> int:
+        return sum(model.calls for model in self.models)
+
+    @property
+    def tool_calls(self) -> int:
+        return sum(len(search.calls) for search in self.tools)
+
+    @property
+    def waited(self) -> float:
+        return (sum(model.waited for model in self.models)
+                + sum(search.default_latency * len(search.calls) for search in self.tools))
+
+
+@dataclass
+class Scenario:
+    name: str
+    source: str
+    build: Callable[[Fakes, Optional[Any]], Workload]
+    own_checkpointer: Optional[Callable[[], Any]] = None
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str, source: str, own_checkpointer: Optional[Callable[[], Any]] = None):
+    def register(build):
+        SCENARIOS[name] = Scenario(name, source, build, own_checkpointer)
+        return build
+    return register
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+# -- 5_state_deepdive -------------------------------------------------------
+
+@scenario("state_counter", "5_state_deepdive/2_complex_state.py")
+def build_state_counter(fakes: Fakes, checkpointer) -> Workload:
+    class SimpleState(TypedDict):
+        count: int
+        sum: Annotated[int, operator.add]
+        history: Annotated[List[int], operator.concat]
+
+    def increment(state: SimpleState):
+        new_count = state["count"] + 1
+        return {"count": new_count, "sum": new_count, "history": [new_count]}
+
+    graph = StateGraph(SimpleState)
+    graph.add_node("increment", increment)
+    graph.set_entry_point("increment")
+    graph.add_conditional_edges("increment", lambda state: "continue" if state["count"] < 5 else "stop",
+                                {"continue": "increment", "stop": END})
+    app = graph.compile(checkpointer=checkpointer)
+    return lambda thread_id: app.invoke({"count": 0, "sum": 0, "history": []}, _config(thread_id))
+
+
+# -- 2_basic_reflection_system ----------------------------------------------
+
+@scenario("reflection", "2_basic_reflection_system/basic.py")
+def build_reflection(fakes: Fakes, checkpointer) -> Workload:
+    llm = fakes.chat()
+    generation_chain = ChatPromptTemplate.from_messages([
+        ("system", "You are a twitter techie influencer assistant tasked with writing excellent twitter posts."),
+        MessagesPlaceholder(variable_name="messages"),
+    ]) | llm
+    reflection_chain = ChatPromptTemplate.from_messages([
+        ("system", "You are a viral twitter influencer grading a tweet. Generate critique and recommendations."),
+        MessagesPlaceholder(variable_name="messages"),
+    ]) | llm
+    stop_rule = make_stop_rule(max_drafts=2)
+
+    def generate_node(state):
+        return generation_chain.invoke({"messages": window_messages(state, keep_pairs=1)})
+
+    def reflect_node(state):
+        response = reflection_chain.invoke({"messages": window_messages(state, keep_pairs=1)})
+        return [HumanMessage(content=response.content)]
+
+    graph = MessageGraph()
+    graph.add_node("generate", generate_node)
+    graph.add_node("reflect", reflect_node)
+    graph.set_entry_point("generate")
+    graph.add_conditional_edges("generate", lambda state: END if stop_rule(state) else "reflect",
+                                {"reflect": "reflect", END: END})
+    graph.add_edge("reflect", "generate")
+    app = graph.compile(checkpointer=checkpointer)
+    return lambda thread_id: app.invoke(HumanMessage(content="AI Agents taking over content creation"),
+                                        _config(thread_id))
+
+
+# -- 4_reflexion_agent_system -----------------------------------------------
+
+@scenario("reflexion", "4_reflexion_agent_system/reflexion_graph.py")
+def build_reflexion(fakes: Fakes, checkpointer) -> Workload:
+    llm = fakes.chat()
+    search = fakes.search()
+    actor_prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are expert AI researcher.\nCurrent time: {time}\n\n1. {first_instruction}\n"
+                   "2. Reflect and critique your answer.\n3. List 1-3 search queries."),
+        MessagesPlaceholder(variable_name="messages"),
+        ("system", "Answer the user's question above using the required format."),
+    ]).partial(time=lambda: datetime.datetime.now().isoformat())
+    first_responder_chain = actor_prompt.partial(first_instruction="Provide a detailed ~250 word answer") \
+        | llm.bind_tools(tools=[AnswerQuestion], tool_choice="AnswerQuestion")
+    revisor_chain = actor_prompt.partial(first_instruction="Revise your previous answer using the new information.") \
+        | llm.bind_tools(tools=[ReviseAnswer], tool_choice="ReviseAnswer")
+
+    prefetcher = SearchPrefetcher(search, max_workers=8, timeout=10.0)
+
+    def execute_tools(state: List[BaseMessage]) -> List[BaseMessage]:
+        last = state[-1]
+        if not isinstance(last, AIMessage) or not last.tool_calls:
+            return []
+        return prefetcher.tool_messages(last.tool_calls)
+
+    def event_loop(state: List[BaseMessage]) -> str:
+        return END if sum(isinstance(item, ToolMessage) for item in state) > 2 else "execute_tools"
+
+    graph = MessageGraph()
+    graph.add_node("draft", prefetching_node(first_responder_chain, prefetcher))
+    graph.add_node("execute_tools", execute_tools)
+    graph.add_node("revisor", prefetching_node(revisor_chain, prefetcher,
+                                               prefetch_if=lambda state: event_loop(state) == "execute_tools"))
+    graph.add_edge("draft", "execute_tools")
+    graph.add_edge("execute_tools", "revisor")
+    graph.add_conditional_edges("revisor", event_loop, {"execute_tools": "execute_tools", END: END})
+    graph.set_entry_point("draft")
+    app = graph.compile(checkpointer=checkpointer)
+    return lambda thread_id: app.invoke("Write about how small business can leverage AI to grow", _config(thread_id))
+
+
+# -- 6_react_agent ----------------------------------------------------------
+
+@tool
+def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
+    """Returns the current date and time in the specified format"""
+    return datetime.datetime.now().strftime(format)
+
+
+@scenario("react_agent", "6_react_agent/react_graph.py")
+def build_react_agent(fakes: Fakes, checkpointer) -> Workload:
+    llm = fakes.chat()
+    tools = [fakes.search(), get_system_time]
+    react_agent_runnable = create_text_react_agent(tools=tools, llm=llm, prompt=MULTI_ACTION_REACT_PROMPT,
+                                                   output_parser=MultiActionReActOutputParser())
+    tool_registry = ToolRegistry(tools)
+
+    class AgentState(TypedDict):
+        input: str
+        agent_outcome: Any
+        intermediate_steps: Annotated[list, operator.add]
+
+    def reason_node(state: AgentState):
+        return {"agent_outcome": react_agent_runnable.invoke(state)}
+
+    def act_node(state: AgentState, config: RunnableConfig):
+        agent_outcome = state["agent_outcome"]
+        agent_actions = agent_outcome if isinstance(agent_outcome, list) else [agent_outcome]
+        return {"intermediate_steps": tool_registry.run_all(agent_actions, config)}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("reason_node", reason_node)
+    graph.set_entry_point("reason_node")
+    graph.add_node("act_node", act_node)
+    graph.add_conditional_edges("reason_node",
+                                lambda state: END if isinstance(state["agent_outcome"], AgentFinish) else "act_node")
+    graph.add_edge("act_node", "reason_node")
+    app = graph.compile(checkpointer=checkpointer)
+    return lambda thread_id: app.invoke({"input": "How many days ago was the latest SpaceX launch?",
+                                         "agent_outcome": None, "intermediate_steps": []}, _config(thread_id))
+
+
+# -- 7_chatbot --------------------------------------------------------------
+
+def _tool_chat_graph(llm, tools, state_schema, checkpointer=None, **compile_kwargs):
+    llm_with_tools = llm.bind_tools(tools=tools)
+
+    def chatbot(state):
+        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+
+    def tools_router(state):
+        last_message = state["messages"][-1]
+        return "tool_node" if getattr(last_message, "tool_calls", None) else END
+
+    graph = StateGraph(state_schema)
+    graph.add_node("chatbot", chatbot)
+    graph.add_node("tool_node", ToolNode(tools=tools))
+    graph.set_entry_point("chatbot")
+    graph.add_conditional_edges("chatbot", tools_router)
+    graph.add_edge("tool_node", "chatbot")
+    return graph.compile(checkpointer=checkpointer, **compile_kwargs)
+
+
+class MessagesOnly(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _limited_search(fakes: Fakes):
+    """``[search_tool]`` behind the tool limiter the tool-calling tutorials use."""
+    tool_limiter = ToolLimiter(max_concurrency=8,
+                               limits={"tavily_search_results_json": ToolLimits(max_concurrency=4, rate=5)})
+    return tool_limiter.wrap([fakes.search()])
+
+
+@scenario("chatbot_tools", "7_chatbot/2_chatbot_with_tools.py")
+def build_chatbot_tools(fakes: Fakes, checkpointer) -> Workload:
+    app = _tool_chat_graph(fakes.chat(), _limited_search(fakes), MessagesOnly, checkpointer)
+
+    def run(thread_id):
+        for turn, text in enumerate(["What's the weather in Chennai?", "And in Bangalore?"]):
+            app.invoke({"messages": [HumanMessage(content=text)]}, _config(f"{thread_id}-{turn}"))
+    return run
+
+
+SPILL_DIRECTORY = os.path.join(tempfile.gettempdir(), "langgraph-benchmark-spill")
+
+
+def _chat_memory_saver():
+    return DeltaCheckpointSaver(BoundedMemorySaver(max_bytes=256 * 1024 * 1024, idle_ttl=3600,
+                                                   spill_directory=SPILL_DIRECTORY))
+
+
+@scenario("chatbot_memory", "7_chatbot/3_chat_with_in_memory_checkpointer.py", own_checkpointer=_chat_memory_saver)
+def build_chatbot_memory(fakes: Fakes, checkpointer) -> Workload:
+    llm = fakes.chat()
+    summarize = summarize_node(llm, max_tokens=4000)
+    budgeted_messages = token_budget_reducer(max_tokens=8000)
+
+    class BasicChatState(TypedDict):
+        messages: Annotated[list, budgeted_messages]
+
+    def chatbot(state: BasicChatState):
+        return {"messages": [llm.invoke(state["messages"])]}
+
+    graph = StateGraph(BasicChatState)
+    graph.add_node("summarize", summarize)
+    graph.add_node("chatbot", chatbot)
+    graph.add_edge("summarize", "chatbot")
+    graph.add_edge("chatbot", END)
+    graph.set_entry_point("summarize")
+    app = graph.compile(checkpointer=checkpointer)
+
+    def run(thread_id):
+        for turn in range(20):
+            app.invoke({"messages": [HumanMessage(content=f"Turn {turn}: tell me more about AI agents.")]},
+                       _config(thread_id))
+    return run
+
+
+# -- 8_human-in-the-loop ----------------------------------------------------
+
+def _linkedin_saver():
+    return DeltaCheckpointSaver(BoundedMemorySaver(idle_ttl=3600, spill_directory=SPILL_DIRECTORY),
+                                channels=("generated_post", "human_feedback"))
+
+
+def _approval_saver():
+    return DeltaCheckpointSaver(BoundedMemorySaver(idle_ttl=3600, spill_directory=SPILL_DIRECTORY))
+
+
+@scenario("human_in_the_loop", "8_human-in-the-loop/5_multiturn_conversation.py", own_checkpointer=_linkedin_saver)
+def build_human_in_the_loop(fakes: Fakes, checkpointer) -> Workload:
+    llm = fakes.chat()
+
+    class State(TypedDict):
+        linkedin_topic: str
+        generated_post: Annotated[List[str], add_messages]
+        human_feedback: Annotated[List[str], add_messages]
+
+    def model(state: State):
+        feedback = state["human_feedback"] if "human_feedback" in state else ["No Feedback yet"]
+        prompt = f"LinkedIn Topic: {state['linkedin_topic']}\nHuman Feedback: {feedback[-1] if feedback else 'none'}"
+        response = llm.invoke([SystemMessage(content="You are an expert LinkedIn content writer"),
+                               HumanMessage(content=prompt)])
+        return {"generated_post": [AIMessage(content=response.content)], "human_feedback": feedback}
+
+    def human_node(state: State):
+        user_feedback = interrupt({"generated_post": state["generated_post"],
+                                   "message": "Provide feedback or type 'done' to finish"})
+        if user_feedback.lower() == "done":
+            return Command(update={"human_feedback": state["human_feedback"] + ["Finalised"]}, goto="end_node")
+        return Command(update={"human_feedback": state["human_feedback"] + [user_feedback]}, goto="model")
+
+    def end_node(state: State):
+        return {"generated_post": state["generated_post"], "human_feedback": state["human_feedback"]}
+
+    graph = StateGraph(State)
+    graph.add_node("model", model)
+    graph.add_node("human_node", human_node)
+    graph.add_node("end_node", end_node)
+    graph.add_edge(START, "model")
+    graph.add_edge("model", "human_node")
+    graph.set_finish_point("end_node")
+    app = graph.compile(checkpointer=checkpointer)
+
+    def run(thread_id):
+        config = _config(thread_id)
+        for _ in app.stream({"linkedin_topic": "AI agents", "generated_post": [], "human_feedback": []}, config):
+            pass
+        for feedback in ["Make it shorter", "Add a call to action", "done"]:
+            app.invoke(Command(resume=feedback), config)
+    return run
+
+
+@scenario("approval", "8_human-in-the-loop/4_approval.ipynb", own_checkpointer=_approval_saver)
+def build_approval(fakes: Fakes, checkpointer) -> Workload:
+    app = _tool_chat_graph(fakes.chat(), _limited_search(fakes), MessagesOnly, checkpointer,
+                           interrupt_before=["tool_node"])
+
+    def run(thread_id):
+        config = _config(thread_id)
+        for _ in app.stream({"messages": [HumanMessage(content="What is the current weather in Chennai?")]},
+                            config, stream_mode="values"):
+            pass
+        for _ in app.stream(None, config, stream_mode="values"):
+            pass
+    return run
+
+
+# -- 9_RAG_agent ------------------------------------------------------------
+
+class GradeQuestion(BaseModel):
+    """Boolean value to check whether a question is related to the Peak Performance Gym"""
+
+    score: str = Field(description="Question is about gym? If yes -> 'Yes' if not -> 'No'")
+
+
+def _retriever(fakes: Fakes, **search_kwargs):
+    store = InMemoryVectorStore.from_documents(gym_docs, fakes.embeddings())
+    return store.as_retriever(search_type="mmr", search_kwargs={"k": 3, **search_kwargs})
+
+
+def _rag_model(fakes: Fakes) -> ScriptedChatModel:
+    # classifier and grader answers come from the same word-overlap heuristic as 9_RAG_agent/fake_models.py
+    return fakes.chat(choices={"score": heuristic_score})
+
+
+@scenario("rag_classification", "9_RAG_agent/2_classification_driven_agent.ipynb")
+def build_rag_classification(fakes: Fakes, checkpointer) -> Workload:
+    llm = _rag_model(fakes)
+    retriever = _retriever(fakes)
+    rag_chain = ChatPromptTemplate.from_template(
+        "Answer the question based only on the following context: {context}\nQuestion: {question}") | llm
+    grader_llm = ChatPromptTemplate.from_messages([
+        ("system", "You are a classifier that determines whether a user's question is about Peak Performance Gym."),
+        ("human", "User question: {question}"),
+    ]) | llm.with_structured_output(GradeQuestion)
+
+    class AgentState(TypedDict):
+        messages: list
+        documents: list
+        on_topic: str
+
+    def question_classifier(state: AgentState):
+        state["on_topic"] = grader_llm.invoke({"question": state["messages"][-1].content}).score
+        return state
+
+    def retrieve(state: AgentState):
+        state["documents"] = retriever.invoke(state["messages"][-1].content)
+        return state
+
+    def generate_answer(state: AgentState):
+        question = state["messages"][-1].content
+        state["messages"].append(rag_chain.invoke({"context": state["documents"], "question": question}))
+
+    def off_topic_response(state: AgentState):
+        state["messages"].append(AIMessage(content="I'm sorry! I cannot answer this question!"))
+        return state
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("topic_decision", question_classifier)
+    workflow.add_node("off_topic_response", off_topic_response)
+    workflow.add_node("retrieve", retrieve)
+    workflow.add_node("generate_answer", generate_answer)
+    workflow.add_conditional_edges("topic_decision",
+                                   lambda state: "on_topic" if state["on_topic"].lower() == "yes" else "off_topic",
+                                   {"on_topic": "retrieve", "off_topic": "off_topic_response"})
+    workflow.add_edge("retrieve", "generate_answer")
+    workflow.add_edge("generate_answer", END)
+    workflow.add_edge("off_topic_response", END)
+    workflow.set_entry_point("topic_decision")
+    app = workflow.compile(checkpointer=checkpointer)
+
+    def run(thread_id):
+        for turn, text in enumerate(["Who is the owner and what are the timings?", "What does the company Apple do?"]):
+            app.invoke({"messages": [HumanMessage(content=text)]}, _config(f"{thread_id}-{turn}"))
+    return run
+
+
+@tool
+def off_topic():
+    """Catch all Questions NOT related to Peak Performance Gym's history, hours, membership plans, fitness classes, trainers, or facilities"""
+    return "Forbidden - do not respond to the user"
+
+
+@scenario("rag_tool_calling", "9_RAG_agent/3_rag_powered_tool_calling.ipynb")
+def build_rag_tool_calling(fakes: Fakes, checkpointer) -> Workload:
+    retriever_tool = create_retriever_tool(
+        _retriever(fakes), "retriever_tool",
+        "Information related to Gym History & Founder, Operating Hours, Membership Plans, Fitness Classes, "
+        "Personal Trainers, and Facilities & Equipment of Peak Performance Gym")
+    tools = [retriever_tool, off_topic]
+    model = fakes.chat().bind_tools(tools)
+
+    def agent(state):
+        return {"messages": [model.invoke(state["messages"])]}
+
+    def should_continue(state) -> Literal["tools", END]:
+        return "tools" if state["messages"][-1].tool_calls else END
+
+    workflow = StateGraph(MessagesOnly)
+    workflow.add_node("agent", agent)
+    workflow.add_node("tools", ToolNode(tools))
+    workflow.add_edge(START, "agent")
+    workflow.add_conditional_edges("agent", should_continue)
+    workflow.add_edge("tools", "agent")
+    app = workflow.compile(checkpointer=checkpointer)
+
+    def run(thread_id):
+        for turn, text in enumerate(["How will the weather be tomorrow?", "Who is the owner and what are the timings?"]):
+            app.invoke({"messages": [HumanMessage(content=text)]}, _config(f"{thread_id}-{turn}"))
+    return run
+
+
+def _rag_saver():
+    return BoundedMemorySaver(max_bytes=256 * 1024 * 1024, idle_ttl=3600, spill_directory=SPILL_DIRECTORY)
+
+
+@scenario("rag_advanced", "9_RAG_agent/4_advanced_multi_step_reasoning.ipynb", own_checkpointer=_rag_saver)
+def build_rag_advanced(fakes: Fakes, checkpointer) -> Workload:
+    llm = _rag_model(fakes)
+    embedding_function = fakes.embeddings()
+    retriever = _retriever(fakes)
+    rag_chain = ChatPromptTemplate.from_template(
+        "Chathistory: {history}\n\nContext: {context}\n\nQuestion: {question}") | llm
+    classifier = ChatPromptTemplate.from_messages([
+        ("system", "You are a classifier that determines whether a user's question is about Peak Performance Gym."),
+        ("human", "User question: {question}"),
+    ]) | llm.with_structured_output(GradeQuestion)
+    document_grader = build_document_grader(llm)
+    answer_cache = SemanticAnswerCache(embedding_function, threshold=0.92, max_entries=256, ttl=24 * 3600)
+
+    class AgentState(TypedDict):
+        messages: List[BaseMessage]
+        documents: List[Document]
+        on_topic: str
+        rephrased_question: str
+        proceed_to_generate: bool
+        rephrase_count: int
+        question: HumanMessage
+        cache_hit: bool
+        cache_question: str
+
+    def question_rewriter(state: AgentState):
+        state.update(documents=[], on_topic="", rephrased_question="", proceed_to_generate=False,
+                     rephrase_count=0, cache_hit=False, cache_question="")
+        if state.get("messages") is None:
+            state["messages"] = []
+        if state["question"] not in state["messages"]:
+            state["messages"].append(state["question"])
+        if len(state["messages"]) > 1:
+            messages = [SystemMessage(content="Rephrase the user's question to be a standalone question."),
+                        *state["messages"][:-1], HumanMessage(content=state["question"].content)]
+            state["rephrased_question"] = llm.invoke(messages).content.strip()
+        else:
+            state["rephrased_question"] = state["question"].content
+        return state
+
+    def semantic_cache_lookup(state: AgentState):
+        state["cache_question"] = state["rephrased_question"]
+        hit = answer_cache.lookup(state["cache_question"])
+        if hit is not None:
+            state["messages"].append(AIMessage(content=hit.answer))
+            state["cache_hit"] = True
+        return state
+
+    def question_classifier(state: AgentState):
+        state["on_topic"] = classifier.invoke({"question": state["rephrased_question"]}).score.strip()
+        return state
+
+    def retrieve(state: AgentState):
+        state["documents"] = retriever.invoke(state["rephrased_question"])
+        return state
+
+    def retrieval_grader(state: AgentState):
+        state["documents"] = grade_documents(document_grader, state["rephrased_question"], state["documents"],
+                                             max_concurrency=4)
+        state["proceed_to_generate"] = len(state["documents"]) > 0
+        return state
+
+    def proceed_router(state: AgentState):
+        if state.get("proceed_to_generate", False):
+            return "generate_answer"
+        return "cannot_answer" if state.get("rephrase_count", 0) >= 2 else "refine_question"
+
+    def refine_question(state: AgentState):
+        response = llm.invoke([SystemMessage(content="Slightly refine the user's question to improve retrieval."),
+                               HumanMessage(content=f"Original question: {state['rephrased_question']}")])
+        state["rephrased_question"] = response.content.strip()
+        state["rephrase_count"] = state.get("rephrase_count", 0) + 1
+        return state
+
+    def generate_answer(state: AgentState):
+        generation = rag_chain.invoke({"history": state["messages"], "context": state["documents"],
+                                       "question": state["rephrased_question"]}).content.strip()
+        state["messages"].append(AIMessage(content=generation))
+        answer_cache.store(state["cache_question"], generation)
+        return state
+
+    def cannot_answer(state: AgentState):
+        state["messages"].append(AIMessage(content="I'm sorry, but I cannot find the information you're looking for."))
+        return state
+
+    def off_topic_response(state: AgentState):
+        state["messages"].append(AIMessage(content="I'm sorry! I cannot answer this question!"))
+        return state
+
+    workflow = StateGraph(AgentState)
+    for node in (question_rewriter, semantic_cache_lookup, question_classifier, off_topic_response, retrieve,
+                 retrieval_grader, generate_answer, refine_question, cannot_answer):
+        workflow.add_node(node.__name__, node)
+    workflow.add_edge("question_rewriter", "semantic_cache_lookup")
+    workflow.add_conditional_edges("semantic_cache_lookup",
+                                   lambda state: "cached" if state.get("cache_hit") else "question_classifier",
+                                   {"cached": END, "question_classifier": "question_classifier"})
+    workflow.add_conditional_edges("question_classifier",
+                                   lambda state: "retrieve" if state["on_topic"].lower() == "yes" else "off_topic_response",
+                                   {"retrieve": "retrieve", "off_topic_response": "off_topic_response"})
+    workflow.add_edge("retrieve", "retrieval_grader")
+    workflow.add_conditional_edges("retrieval_grader", proceed_router,
+                                   {"generate_answer": "generate_answer", "refine_question": "refine_question",
+                                    "cannot_answer": "cannot_answer"})
+    workflow.add_edge("refine_question", "retrieve")
+    workflow.add_edge("generate_answer", END)
+    workflow.add_edge("cannot_answer", END)
+    workflow.add_edge("off_topic_response", END)
+    workflow.set_entry_point("question_rewriter")
+    app = workflow.compile(checkpointer=checkpointer)
+
+    def run(thread_id):
+        # the notebook's sequence: off-topic, unanswerable, answer + follow-up, paraphrase (cache hit)
+        for suffix, text in [("1", "What does the company Apple do?"),
+                             ("2", "What is the cancelation policy for Peak Performance Gym memberships?"),
+                             ("3", "Who founded Peak Performance Gym?"),
+                             ("3", "When did he start it?"),
+                             ("4", "Who founded Peak Performance Gym?")]:
+            app.invoke({"question": HumanMessage(content=text)}, _config(f"{thread_id}-{suffix}"))
+    return run
+
+
+# -- 10_multi_agent_architecture --------------------------------------------
+
+@scenario("subgraph", "10_multi_agent_architecture/1_subgraphs.ipynb")
+def build_subgraph(fakes: Fakes, checkpointer) -> Workload:
+    search_app = _tool_chat_graph(fakes.chat(), _limited_search(fakes), MessagesOnly)
+
+    parent_graph = StateGraph(MessagesOnly)
+    parent_graph.add_node("search_agent", search_app)
+    parent_graph.add_edge(START, "search_agent")
+    parent_graph.add_edge("search_agent", END)
+    app = parent_graph.compile(checkpointer=checkpointer)
+    return lambda thread_id: app.invoke({"messages": [HumanMessage(content="How is the weather in Chennai?")]},
+                                        _config(thread_id))
+
+
+class Supervisor(BaseModel):
+    next: Literal["enhancer", "researcher", "coder", "researcher_and_coder"] = Field(
+        description="Which specialist to activate next; 'researcher_and_coder' runs both in parallel.")
+    reason: str = Field(description="Justification for the routing decision.")
+
+
+class Validator(BaseModel):
+    next: Literal["supervisor", "FINISH"] = Field(description="'supervisor' to continue or 'FINISH' to terminate.")
+    reason: str = Field(description="The reason for the decision.")
+
+
+RESEARCH_INTENT = [r"\bfind\b", r"\bsearch\b", r"\blook up\b", r"\bweather\b", r"\bpopulation\b",
+                   r"\bnews\b", r"\blatest\b", r"\bcurrent\b", r"\btoday\b", r"\bwho\b", r"\bhistory\b"]
+
+
+def _supervisor_route(messages: Sequence[BaseMessage]) -> str:
+    """Enhancer first, then researcher, coder for computational requests, or both for a mix."""
+    if not any(getattr(message, "name", None) == "enhancer" for message in messages):
+        return "enhancer"
+    question = next((str(m.content) for m in messages if isinstance(m, HumanMessage)), "").lower()
+    if "fibonacci" in question:
+        return "researcher_and_coder" if "population" in question else "coder"
+    return "researcher"
+
+
+def _specialist_answer(messages: Sequence[BaseMessage]) -> str:
+    """The last specialist answer, or both answers merged after a parallel researcher/coder hop."""
+    answers = []
+    for message in reversed(messages):
+        if getattr(message, "name", None) not in ("researcher", "coder"):
+            break
+        answers.append(message)
+    if len(answers) > 1:
+        return "\n\n".join(f"{message.name}: {message.content}" for message in reversed(answers))
+    return str(messages[-1].content)
+
+
+@tool
+def python_repl(command: str) -> str:
+    """A Python shell. Use this to execute python commands."""
+    return "6765\n"
+
+
+@scenario("supervisor", "10_multi_agent_architecture/2_supervisor_multiagent_workflow.ipynb")
+def build_supervisor(fakes: Fakes, checkpointer) -> Workload:
+    llm = fakes.chat(choices={"Supervisor.next": _supervisor_route, "Validator.next": "FINISH"})
+    tavily_search = fakes.search()
+    research_agent = create_react_agent(llm, tools=[tavily_search], prompt="You are an Information Specialist.")
+    code_agent = create_react_agent(llm, tools=[python_repl], prompt="You are a coder and analyst.")
+    supervisor_router = FastRouter(Supervisor, llm.with_structured_output(Supervisor), rules=[
+        rule("enhancer", lambda messages: not spoke(messages, "enhancer"), "enhancer first"),
+        keyword_rule("coder", r"\bfibonacci\b", r"\bfactorial\b", r"\bcalculat", r"\bcompute\b", r"\bpython\b",
+                     unless=RESEARCH_INTENT, when=lambda messages: not spoke(messages, "coder")),
+    ])
+    validator_router = FastRouter(Validator, llm.with_structured_output(Validator), featurize=question_and_answer)
+
+    def supervisor_node(state: MessagesState) -> Union[
+        Command[Literal["enhancer", "researcher", "coder"]],
+        Command[List[Literal["researcher", "coder"]]],  # researcher_and_coder: both in parallel
+    ]:
+        messages = [{"role": "system", "content": "You are a workflow supervisor."}] + state["messages"]
+        response = supervisor_router.invoke(messages, config=ROUTING_CONFIG)
+        goto = ["researcher", "coder"] if response.next == "researcher_and_coder" else response.next
+        return Command(update={"messages": [HumanMessage(content=response.reason, name="supervisor")]}, goto=goto)
+
+    def enhancer_node(state: MessagesState) -> Command[Literal["supervisor"]]:
+        messages = [{"role": "system", "content": "You are a Query Refinement Specialist."}] + state["messages"]
+        enhanced_query = llm.invoke(messages, config=agent_config("enhancer"))
+        return Command(update={"messages": [HumanMessage(content=enhanced_query.content, name="enhancer")]},
+                       goto="supervisor")
+
+    def research_node(state: MessagesState) -> Command[Literal["validator"]]:
+        result = research_agent.invoke(state, config=agent_config("researcher"))
+        return Command(update={"messages": [HumanMessage(content=result["messages"][-1].content, name="researcher")]},
+                       goto="validator")
+
+    def code_node(state: MessagesState) -> Command[Literal["validator"]]:
+        result = code_agent.invoke(state, config=agent_config("coder"))
+        return Command(update={"messages": [HumanMessage(content=result["messages"][-1].content, name="coder")]},
+                       goto="validator")
+
+    def validator_node(state: MessagesState) -> Command[Literal["supervisor", "__end__"]]:
+        messages = [{"role": "system", "content": "Your task is to ensure reasonable quality."},
+                    {"role": "user", "content": state["messages"][0].content},
+                    {"role": "assistant", "content": _specialist_answer(state["messages"])}]
+        response = validator_router.invoke(messages, config=ROUTING_CONFIG)
+        goto = END if response.next == "FINISH" else response.next
+        return Command(update={"messages": [HumanMessage(content=response.reason, name="validator")]}, goto=goto)
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("supervisor", supervisor_node)
+    graph.add_node("enhancer", enhancer_node)
+    graph.add_node("researcher", research_node)
+    graph.add_node("coder", code_node)
+    graph.add_node("validator", validator_node)
+    graph.add_edge(START, "supervisor")
+    app = graph.compile(checkpointer=checkpointer)
+
+    def run(thread_id):
+        for turn, text in enumerate(["Weather in Chennai", "Give me the 20th fibonacci number",
+                                     "Find the population of Chennai, and separately give me the 20th fibonacci number"]):
+            app.invoke({"messages": [("user", text)]}, _config(f"{thread_id}-{turn}"))
+    return run
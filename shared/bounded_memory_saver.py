@@ -0,0 +1,245 @@
+"""MemorySaver with a memory cap: idle or least-recently-used threads spill to disk.
+
+``MemorySaver`` keeps every checkpoint of every thread for the life of the
+process. ``BoundedMemorySaver`` stores the same (already serialized) data but
+tracks the payload size of each thread. Once the total passes ``max_bytes``
+(or a thread has been idle longer than ``idle_ttl`` seconds) whole threads
+are evicted, least recently used first, into one file per thread under
+``spill_directory``. The next call that touches such a thread (``get_tuple``,
+``list``, ``put`` or ``put_writes`` with its ``thread_id``) loads it back, so
+a conversation that resumes after hours continues exactly where it stopped.
+The async methods run the sync ones in a worker thread (``asyncio.to_thread``)
+so a spill or reload never blocks the event loop serving other threads.
+
+``list(None)`` without a ``thread_id`` only sees resident threads.
+"""
+import asyncio
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+
+
+def _payload_size(value: Any) -> int:
+    """Bytes held by one stored entry (serialized payloads plus short strings)."""
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_payload_size(item) for item in value)
+    return 0
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer that evicts whole threads to a local file store.
+
+    Args:
+        max_bytes: cap on resident checkpoint payload bytes across all threads.
+        idle_ttl: evict threads not touched for this many seconds (``None`` disables).
+        spill_directory: where evicted threads are written, one pickle file each.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        idle_ttl: Optional[float] = None,
+        spill_directory: str = "checkpoint_spill",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_directory = spill_directory
+        os.makedirs(spill_directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._last_access: "OrderedDict[Any, float]" = OrderedDict()  # LRU order, oldest first
+        self._thread_bytes: Dict[Any, int] = {}
+        self._write_keys: Dict[Any, Set[tuple]] = {}
+        self._blob_keys: Dict[Any, Set[tuple]] = {}
+        self.resident_bytes = 0
+        self.lru_evictions = 0
+        self.ttl_evictions = 0
+        self.reloads = 0
+        self.spilled_bytes = 0
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def _spill_path(self, thread_id: Any) -> str:
+        digest = hashlib.sha1(repr(thread_id).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_directory, f"{digest}.pkl")
+
+    def _account(self, thread_id: Any, delta: int) -> None:
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + delta
+        self.resident_bytes += delta
+
+    def _touch(self, thread_id: Any) -> None:
+        """Mark ``thread_id`` as just used, loading it back from disk if it was evicted."""
+        if thread_id not in self._last_access:
+            self._reload(thread_id)
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _reload(self, thread_id: Any) -> None:
+        path = self._spill_path(thread_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        for checkpoint_ns, checkpoints in data["storage"].items():
+            self.storage[thread_id][checkpoint_ns].update(checkpoints)
+        self.writes.update(data["writes"])
+        self.blobs.update(data["blobs"])
+        self._write_keys[thread_id] = set(data["writes"])
+        self._blob_keys[thread_id] = set(data["blobs"])
+        self._account(thread_id, data["bytes"])
+        os.remove(path)
+        self.reloads += 1
+
+    def _evict(self, thread_id: Any) -> None:
+        if not self._thread_bytes.get(thread_id):
+            self._last_access.pop(thread_id, None)  # nothing stored (e.g. a lookup of an unknown thread)
+            self.storage.pop(thread_id, None)
+            return
+        data = {
+            "storage": {ns: dict(checkpoints) for ns, checkpoints in self.storage.get(thread_id, {}).items()},
+            "writes": {key: self.writes[key] for key in self._write_keys.get(thread_id, ())},
+            "blobs": {key: self.blobs[key] for key in self._blob_keys.get(thread_id, ())},
+            "bytes": self._thread_bytes.get(thread_id, 0),
+        }
+        path = self._spill_path(thread_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.spilled_bytes += os.path.getsize(path)
+
+        self.storage.pop(thread_id, None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self.resident_bytes -= self._thread_bytes.pop(thread_id, 0)
+        self._last_access.pop(thread_id, None)
+
+    def _enforce(self, keep: Any = None) -> None:
+        """Evict idle threads, then LRU threads until under ``max_bytes``; never ``keep``."""
+        if self.idle_ttl is not None:
+            cutoff = time.monotonic() - self.idle_ttl
+            for thread_id, last_access in list(self._last_access.items()):
+                if last_access >= cutoff:
+                    break  # LRU order: everything after this is more recent
+                if thread_id != keep:
+                    self._evict(thread_id)
+                    self.ttl_evictions += 1
+        while self.resident_bytes > self.max_bytes:
+            victim = next((thread_id for thread_id in self._last_access if thread_id != keep), None)
+            if victim is None:
+                break  # only the active thread is left; it stays resident even if oversized
+            self._evict(victim)
+            self.lru_evictions += 1
+
+    # -- MemorySaver -------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config and "thread_id" in config.get("configurable", {}):
+                self._touch(config["configurable"]["thread_id"])
+            # materialize under the lock so an eviction cannot happen mid-iteration
+            results = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from results
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._touch(thread_id)
+            blob_keys = [(thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()]
+            before = sum(_payload_size(self.blobs.get(key)) for key in blob_keys)
+            before += _payload_size(self.storage[thread_id][checkpoint_ns].get(checkpoint["id"]))
+            result = super().put(config, checkpoint, metadata, new_versions)
+            after = sum(_payload_size(self.blobs.get(key)) for key in blob_keys)
+            after += _payload_size(self.storage[thread_id][checkpoint_ns].get(checkpoint["id"]))
+            self._blob_keys.setdefault(thread_id, set()).update(blob_keys)
+            self._account(thread_id, after - before)
+            self._enforce(keep=thread_id)
+            return result
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            self._touch(thread_id)
+            before = sum(_payload_size(entry) for entry in self.writes.get(key, {}).values())
+            super().put_writes(config, writes, task_id, task_path)
+            after = sum(_payload_size(entry) for entry in self.writes.get(key, {}).values())
+            self._write_keys.setdefault(thread_id, set()).add(key)
+            self._account(thread_id, after - before)
+            self._enforce(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            path = self._spill_path(thread_id)
+            if os.path.exists(path):
+                os.remove(path)
+            self.storage.pop(thread_id, None)
+            for key in self._write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            self.resident_bytes -= self._thread_bytes.pop(thread_id, 0)
+            self._last_access.pop(thread_id, None)
+
+    # -- async: the sync methods may hit the disk, so keep them off the event loop
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in results:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def evict_idle(self) -> None:
+        """Apply ``idle_ttl`` now (it is otherwise checked on every write)."""
+        with self._lock:
+            self._enforce()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resident_threads": len(self._last_access),
+                "resident_bytes": self.resident_bytes,
+                "spilled_threads": sum(1 for name in os.listdir(self.spill_directory) if name.endswith(".pkl")),
+                "lru_evictions": self.lru_evictions,
+                "ttl_evictions": self.ttl_evictions,
+                "reloads": self.reloads,
+                "spilled_bytes": self.spilled_bytes,
+            }
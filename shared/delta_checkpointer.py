@@ -0,0 +1,258 @@
+"""Delta-encoded checkpoints for ``add_messages`` state.
+
+With ``messages: Annotated[list, add_messages]`` every checkpoint holds the
+whole conversation, so a thread of n turns writes O(n^2) message bytes and
+every write re-serializes the full history. ``DeltaCheckpointSaver`` wraps
+any checkpointer (``MemorySaver``, ``SqliteSaver``, ``TunedSqliteSaver``...)
+and, for the configured channels, stores only what changed since the parent
+checkpoint: the appended messages and any replaced by id. Every
+``snapshot_every`` steps, or whenever messages were removed, it stores a full
+snapshot instead. Reads walk back to the nearest snapshot and replay the
+deltas; recently resolved lists are kept in an LRU so the usual
+"load latest, append, save" turn never touches older checkpoints.
+
+Every checkpoint written records in its metadata (``delta_depth``) how many
+ancestors its deltas lean on. ``TunedSqliteSaver`` retention reads it and
+never deletes a checkpoint that a surviving delta still needs; any other
+retention that deletes old checkpoints must do the same, or the chain back to
+the last snapshot is cut.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+DELTA_MARKER = "__delta__"
+# Metadata key: number of parent checkpoints this checkpoint's deltas depend on (0 for a snapshot).
+DEPTH_METADATA_KEY = "delta_depth"
+
+
+def _is_delta(value: Any) -> bool:
+    return isinstance(value, dict) and DELTA_MARKER in value
+
+
+def encode_delta(parent: Sequence[Any], current: Sequence[Any]) -> Optional[dict]:
+    """Messages appended to or replaced in ``parent``; ``None`` if anything was removed."""
+    if len(current) < len(parent):
+        return None
+    replace = [[i, message] for i, (old, message) in enumerate(zip(parent, current))
+               if old is not message and old != message]
+    return {"replace": replace, "append": list(current[len(parent):])}
+
+
+def apply_delta(base: Sequence[Any], delta: dict) -> List[Any]:
+    messages = list(base)
+    for i, message in delta["replace"]:
+        messages[i] = message
+    messages.extend(delta["append"])
+    return messages
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver):
+    """Checkpointer wrapper that delta-encodes message-list channels.
+
+    Args:
+        saver: the checkpointer that actually stores the checkpoints.
+        channels: state keys holding ``add_messages`` lists.
+        snapshot_every: longest chain of deltas before a full snapshot is written.
+        cache_size: resolved message lists kept in memory (one per recent checkpoint).
+    """
+
+    def __init__(
+        self,
+        saver: BaseCheckpointSaver,
+        channels: Sequence[str] = ("messages",),
+        snapshot_every: int = 20,
+        cache_size: int = 1024,
+    ) -> None:
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.channels = tuple(channels)
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        # (thread_id, checkpoint_ns, checkpoint_id, channel) -> (messages, depth)
+        self._cache: "OrderedDict[tuple, Tuple[tuple, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.snapshots = 0
+        self.deltas = 0
+        self.base_loads = 0
+
+    # -- cache -------------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(key: tuple) -> tuple:
+        # Savers hand the thread id back as given (MemorySaver) or as str (SqliteSaver).
+        return (str(key[0]), *key[1:])
+
+    def _cached(self, key: tuple) -> Optional[Tuple[tuple, int]]:
+        key = self._cache_key(key)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _remember(self, key: tuple, messages: Sequence[Any], depth: int) -> None:
+        key = self._cache_key(key)
+        with self._lock:
+            self._cache[key] = (tuple(messages), depth)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _ids(config: RunnableConfig) -> Tuple[Any, str, Optional[str]]:
+        """Thread id as given (the wrapped saver may key by it), namespace and checkpoint id."""
+        configurable = config["configurable"]
+        return (configurable["thread_id"], configurable.get("checkpoint_ns", ""),
+                configurable.get("checkpoint_id"))
+
+    @staticmethod
+    def _config(thread_id: Any, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint_id}}
+
+    # -- decoding ----------------------------------------------------------
+
+    def _resolve(self, thread_id: Any, checkpoint_ns: str, checkpoint_id: str,
+                 channel: str, value: Any) -> Tuple[List[Any], int]:
+        """Rebuild the full list for ``value`` as stored in checkpoint ``checkpoint_id``."""
+        key = (thread_id, checkpoint_ns, checkpoint_id, channel)
+        cached = self._cached(key)
+        if cached is not None:
+            return list(cached[0]), cached[1]
+        if not _is_delta(value):
+            messages, depth = list(value or []), 0
+        else:
+            base_key = (thread_id, checkpoint_ns, value["base"], channel)
+            base = self._cached(base_key)
+            if base is None:
+                self.base_loads += 1
+                base_tuple = self.saver.get_tuple(self._config(thread_id, checkpoint_ns, value["base"]))
+                if base_tuple is None:
+                    raise ValueError(f"Delta checkpoint {checkpoint_id} needs missing base {value['base']}; "
+                                     "retention removed a checkpoint this delta chain depends on")
+                base = self._resolve(thread_id, checkpoint_ns, value["base"], channel,
+                                     base_tuple.checkpoint["channel_values"].get(channel))
+            messages, depth = apply_delta(base[0], value), value["depth"]
+        self._remember(key, messages, depth)
+        return messages, depth
+
+    def _decode(self, checkpoint_tuple: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if checkpoint_tuple is None:
+            return None
+        values = checkpoint_tuple.checkpoint["channel_values"]
+        if not any(channel in values for channel in self.channels):
+            return checkpoint_tuple
+        thread_id, checkpoint_ns, checkpoint_id = self._ids(checkpoint_tuple.config)
+        values = dict(values)
+        for channel in self.channels:
+            if channel in values:
+                values[channel] = self._resolve(thread_id, checkpoint_ns, checkpoint_id, channel, values[channel])[0]
+        return checkpoint_tuple._replace(checkpoint={**checkpoint_tuple.checkpoint, "channel_values": values})
+
+    # -- encoding ----------------------------------------------------------
+
+    def _encode(self, config: RunnableConfig, checkpoint: Checkpoint) -> Tuple[Checkpoint, Optional[int]]:
+        """The checkpoint to store, and the longest delta chain behind it (``None`` if nothing was encoded)."""
+        values = checkpoint["channel_values"]
+        if not any(isinstance(values.get(channel), list) for channel in self.channels):
+            return checkpoint, None
+        thread_id, checkpoint_ns, parent_id = self._ids(config)
+        values = dict(values)
+        chain = 0
+        for channel in self.channels:
+            messages = values.get(channel)
+            if not isinstance(messages, list):
+                continue
+            parent = self._parent_messages(thread_id, checkpoint_ns, parent_id, channel)
+            delta = None
+            if parent is not None and parent[1] + 1 < self.snapshot_every:
+                delta = encode_delta(parent[0], messages)
+            if delta is None:
+                self.snapshots += 1
+                self._remember((thread_id, checkpoint_ns, checkpoint["id"], channel), messages, 0)
+            else:
+                self.deltas += 1
+                depth = parent[1] + 1
+                chain = max(chain, depth)
+                values[channel] = {DELTA_MARKER: 1, "base": parent_id, "depth": depth, **delta}
+                self._remember((thread_id, checkpoint_ns, checkpoint["id"], channel), messages, depth)
+        return {**checkpoint, "channel_values": values}, chain
+
+    def _prepare(self, config: RunnableConfig, checkpoint: Checkpoint,
+                 metadata: CheckpointMetadata) -> Tuple[Checkpoint, CheckpointMetadata]:
+        checkpoint, chain = self._encode(config, checkpoint)
+        if chain is not None:
+            metadata = {**metadata, DEPTH_METADATA_KEY: chain}
+        return checkpoint, metadata
+
+    def _parent_messages(self, thread_id: Any, checkpoint_ns: str, parent_id: Optional[str],
+                         channel: str) -> Optional[Tuple[tuple, int]]:
+        if parent_id is None:
+            return None
+        cached = self._cached((thread_id, checkpoint_ns, parent_id, channel))
+        if cached is not None:
+            return cached
+        parent = self.get_tuple(self._config(thread_id, checkpoint_ns, parent_id))
+        if parent is None:
+            return None
+        return self._cached((thread_id, checkpoint_ns, parent_id, channel))
+
+    # -- BaseCheckpointSaver -----------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._decode(self.saver.get_tuple(config))
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        for checkpoint_tuple in self.saver.list(config, filter=filter, before=before, limit=limit):
+            yield self._decode(checkpoint_tuple)
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        checkpoint, metadata = self._prepare(config, checkpoint, metadata)
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        self.saver.put_writes(config, writes, task_id, task_path)
+
+    # Same encoding for async callers. Resolving a chain that is not cached
+    # uses the wrapped saver's sync get_tuple (fine for MemorySaver/SqliteSaver).
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._decode(await self.saver.aget_tuple(config))
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        async for checkpoint_tuple in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield self._decode(checkpoint_tuple)
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        checkpoint, metadata = self._prepare(config, checkpoint, metadata)
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        return self.saver.get_next_version(current, channel)
+
+    def stats(self) -> dict:
+        return {
+            "snapshots": self.snapshots,
+            "deltas": self.deltas,
+            "base_loads": self.base_loads,
+            "cached_lists": len(self._cache),
+        }
@@ -0,0 +1,417 @@
+"""Per-node latency and token metrics for any compiled graph.
+
+``astream_events(version="v2")`` is built on LangChain callbacks. This module
+listens to the same callbacks (node start/end, chat model start/token/end,
+tool start/end) and folds them into histograms instead of printing them:
+
+* ``graph_node_duration_seconds``   wall time of every node run
+* ``graph_llm_duration_seconds``    chat model call latency
+* ``graph_llm_ttft_seconds``        time to first streamed token
+* ``graph_llm_tokens``              prompt / completion tokens per call (from
+  ``usage_metadata`` or ``response_metadata.token_usage``)
+* ``graph_tool_duration_seconds``   tool latency
+* ``graph_errors_total``            failed node / model / tool runs
+
+Every series is labelled with ``graph``, ``node`` and ``thread``. Nodes inside
+subgraphs are named by path (``search_agent/chatbot``). Recording is a dict
+lookup, a ``bisect`` and a few additions under a lock, and the handler runs
+inline, so it is cheap enough to leave on (see 11_streaming/benchmark_graph_metrics.py).
+
+    metrics = GraphMetrics()
+    app = instrument(app, metrics, graph="agent")      # or config={"callbacks": [metrics.handler("agent")]}
+    ...
+    print(metrics.to_prometheus())                     # text exposition format
+    JsonSnapshotWriter(metrics, "metrics.json", interval=60).start()
+    start_metrics_server(metrics, port=9464)           # GET /metrics
+"""
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+try:  # lets the handler ask chat models to stream, so time-to-first-token is measured on plain invoke()
+    from langchain_core.tracers._streaming import _StreamingCallbackHandler
+except ImportError:  # pragma: no cover - older langchain-core
+    _StreamingCallbackHandler = None
+
+try:
+    from langgraph.errors import GraphBubbleUp  # interrupts and Command(graph=PARENT) are control flow
+except ImportError:  # pragma: no cover
+    GraphBubbleUp = ()
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+OVERFLOW_LABEL = "__other__"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Prometheus-style histogram: per label set, bucket counts, sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series: Dict[LabelKey, List] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: LabelKey, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def quantile(self, series: List, q: float) -> Optional[float]:
+        """Estimate from the buckets (linear interpolation, like PromQL's histogram_quantile)."""
+        total = series[-1]
+        if not total:
+            return None
+        rank, cumulative, lower = q * total, 0, 0.0
+        for bound, count in zip(self.buckets, series):
+            if cumulative + count >= rank:
+                return lower + (bound - lower) * ((rank - cumulative) / count if count else 0.0)
+            cumulative += count
+            lower = bound
+        return self.buckets[-1]  # in the +Inf bucket
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.series: Dict[LabelKey, float] = {}
+
+    def inc(self, labels: LabelKey, value: float = 1.0) -> None:
+        self.series[labels] = self.series.get(labels, 0.0) + value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class GraphMetrics:
+    """Metric registry shared by any number of graphs and handlers.
+
+    Args:
+        label_threads: include ``thread`` in the labels (off: one series per graph/node).
+        max_threads: distinct thread label values kept before new threads are
+            reported as ``__other__``, to bound series cardinality.
+    """
+
+    def __init__(self, label_threads: bool = True, max_threads: int = 1000):
+        self.label_threads = label_threads
+        self.max_threads = max_threads
+        self._threads: set = set()
+        self._lock = threading.Lock()
+        self.node_duration = Histogram("graph_node_duration_seconds", "Wall time of graph node runs.",
+                                       LATENCY_BUCKETS)
+        self.llm_duration = Histogram("graph_llm_duration_seconds", "Chat model call latency.", LATENCY_BUCKETS)
+        self.llm_ttft = Histogram("graph_llm_ttft_seconds", "Time to first streamed token.", LATENCY_BUCKETS)
+        self.llm_tokens = Histogram("graph_llm_tokens", "Tokens per chat model call.", TOKEN_BUCKETS)
+        self.tool_duration = Histogram("graph_tool_duration_seconds", "Tool call latency.", LATENCY_BUCKETS)
+        self.errors = Counter("graph_errors_total", "Failed node, chat model and tool runs.")
+        self.metrics = (self.node_duration, self.llm_duration, self.llm_ttft, self.llm_tokens,
+                        self.tool_duration, self.errors)
+
+    def thread_label(self, thread_id: Any) -> str:
+        if thread_id is None:
+            return ""
+        value = str(thread_id)
+        if value in self._threads:
+            return value
+        with self._lock:
+            if len(self._threads) < self.max_threads:
+                self._threads.add(value)
+                return value
+        return OVERFLOW_LABEL
+
+    def observe(self, histogram: Histogram, labels: LabelKey, value: float) -> None:
+        with self._lock:
+            histogram.observe(labels, value)
+
+    def inc(self, counter: Counter, labels: LabelKey) -> None:
+        with self._lock:
+            counter.inc(labels)
+
+    def handler(self, graph: str = "graph", stream_tokens: bool = False) -> "GraphMetricsHandler":
+        """Callback handler labelling everything with ``graph``.
+
+        ``stream_tokens=True`` makes chat models stream even under ``invoke``
+        so time-to-first-token is recorded; under ``stream(stream_mode="messages")``
+        and ``astream_events`` they stream anyway.
+        """
+        if stream_tokens and _StreamingCallbackHandler is not None:
+            return StreamingGraphMetricsHandler(self, graph)
+        return GraphMetricsHandler(self, graph)
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in self.metrics:
+                metric.series.clear()
+            self._threads.clear()
+
+    # -- export --------------------------------------------------------------
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for labels, series in sorted(metric.series.items()):
+                    if metric.kind == "counter":
+                        lines.append(f"{metric.name}{_format_labels(labels)} {_format_number(series)}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, series):
+                        cumulative += count
+                        bucket = _format_labels(labels, 'le="%s"' % _format_number(bound))
+                        lines.append(f"{metric.name}_bucket{bucket} {cumulative}")
+                    bucket = _format_labels(labels, 'le="+Inf"')
+                    lines.append(f"{metric.name}_bucket{bucket} {series[-1]}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_number(series[-2])}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view: per series count, sum, mean and estimated p50/p95/p99."""
+        result: Dict[str, Any] = {"timestamp": time.time(), "metrics": {}}
+        with self._lock:
+            for metric in self.metrics:
+                entries = []
+                for labels, series in sorted(metric.series.items()):
+                    if metric.kind == "counter":
+                        entries.append({"labels": dict(labels), "value": series})
+                        continue
+                    count = series[-1]
+                    entries.append({
+                        "labels": dict(labels),
+                        "count": count,
+                        "sum": series[-2],
+                        "mean": series[-2] / count if count else None,
+                        "p50": metric.quantile(series, 0.50),
+                        "p95": metric.quantile(series, 0.95),
+                        "p99": metric.quantile(series, 0.99),
+                    })
+                result["metrics"][metric.name] = entries
+        return result
+
+
+def _node_path(metadata: Dict[str, Any]) -> str:
+    namespace = metadata.get("langgraph_checkpoint_ns", "")
+    if not namespace:
+        return metadata.get("langgraph_node", "")
+    return "/".join(part.split(":", 1)[0] for part in namespace.split("|"))
+
+
+def _token_usage(response: LLMResult) -> Tuple[Optional[int], Optional[int]]:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+    usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage")
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return None, None
+
+
+class GraphMetricsHandler(BaseCallbackHandler):
+    """Callback handler feeding a :class:`GraphMetrics` registry."""
+
+    run_inline = True  # no executor hop in async runs
+    raise_error = False
+
+    def __init__(self, metrics: GraphMetrics, graph: str = "graph"):
+        self.metrics = metrics
+        self.graph = graph
+        self._runs: Dict[UUID, list] = {}  # run_id -> [start, labels, first_token_seen]
+
+    def _labels(self, metadata: Optional[Dict[str, Any]], **extra: str) -> LabelKey:
+        metadata = metadata or {}
+        labels = [("graph", self.graph), ("node", _node_path(metadata))]
+        if self.metrics.label_threads:
+            labels.append(("thread", self.metrics.thread_label(metadata.get("thread_id"))))
+        labels.extend(extra.items())
+        return tuple(labels)
+
+    def _start(self, run_id: UUID, labels: LabelKey) -> None:
+        self._runs[run_id] = [time.perf_counter(), labels, False]
+
+    def _finish(self, run_id: UUID, histogram: Histogram, error: Optional[BaseException] = None,
+                kind: str = "") -> Optional[list]:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        self.metrics.observe(histogram, run[1], time.perf_counter() - run[0])
+        if error is not None and not isinstance(error, GraphBubbleUp):
+            self.metrics.inc(self.metrics.errors, run[1] + (("kind", kind),))
+        return run
+
+    # -- nodes -----------------------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None,
+                       **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # the node's own run: named after the node and tagged with its superstep
+        if node and kwargs.get("name") == node and not node.startswith("__") \
+                and any(tag.startswith("graph:step:") for tag in tags or ()):
+            self._start(run_id, self._labels(metadata))
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        if run_id in self._runs:
+            self._finish(run_id, self.metrics.node_duration)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        if run_id in self._runs:
+            self._finish(run_id, self.metrics.node_duration, error, "node")
+
+    # -- chat models -----------------------------------------------------------
+
+    def _model_label(self, serialized, metadata, kwargs) -> str:
+        return (metadata or {}).get("ls_model_name") or kwargs.get("name") \
+            or ((serialized or {}).get("id") or ["unknown"])[-1]
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None,
+                            **kwargs: Any) -> None:
+        self._start(run_id, self._labels(metadata, model=self._model_label(serialized, metadata, kwargs)))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None,
+                     **kwargs: Any) -> None:
+        self._start(run_id, self._labels(metadata, model=self._model_label(serialized, metadata, kwargs)))
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and not run[2]:
+            run[2] = True
+            self.metrics.observe(self.metrics.llm_ttft, run[1], time.perf_counter() - run[0])
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs: Any) -> None:
+        run = self._finish(run_id, self.metrics.llm_duration)
+        if run is None:
+            return
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens is not None:
+            self.metrics.observe(self.metrics.llm_tokens, run[1] + (("kind", "prompt"),), prompt_tokens)
+        if completion_tokens is not None:
+            self.metrics.observe(self.metrics.llm_tokens, run[1] + (("kind", "completion"),), completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, self.metrics.llm_duration, error, "llm")
+
+    # -- tools -----------------------------------------------------------------
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, tags=None, metadata=None,
+                      **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self._start(run_id, self._labels(metadata, tool=name))
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, self.metrics.tool_duration)
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, self.metrics.tool_duration, error, "tool")
+
+
+if _StreamingCallbackHandler is not None:
+    class StreamingGraphMetricsHandler(GraphMetricsHandler, _StreamingCallbackHandler):
+        """Same handler; its presence switches chat models to streaming."""
+
+        def tap_output_aiter(self, run_id, output):
+            return output
+
+        def tap_output_iter(self, run_id, output):
+            return output
+
+
+def instrument(app, metrics: GraphMetrics, graph: str = "graph", stream_tokens: bool = False):
+    """Return ``app`` with the metrics handler bound to every call."""
+    return app.with_config(callbacks=[metrics.handler(graph, stream_tokens=stream_tokens)])
+
+
+class JsonSnapshotWriter:
+    """Writes ``metrics.snapshot()`` to ``path`` every ``interval`` seconds (atomic replace)."""
+
+    def __init__(self, metrics: GraphMetrics, path: str, interval: float = 60.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.metrics.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self) -> "JsonSnapshotWriter":
+        self._thread = threading.Thread(target=self._loop, name="graph-metrics-snapshot", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the timer and write a final snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+
+def start_metrics_server(metrics: GraphMetrics, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` (Prometheus text) and ``GET /metrics.json`` from a daemon thread."""
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, content_type = metrics.to_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="graph-metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,228 @@
+"""Record/replay cache for LLM responses.
+
+Iterating on generation_chain, first_responder_chain, rag_chain and friends
+re-runs the same prompts against the real model every time.
+``RecordReplayCache`` is a LangChain ``BaseCache`` keyed exactly on (model and
+parameters, bound tools, messages). Responses are stored in a local SQLite file
+and evicted least recently used first once it grows past ``max_bytes``. Modes:
+
+* ``record``       return hits, call the model on a miss and record the response
+* ``replay``       return hits only; a miss raises ``LLMCacheMiss``, so a run is fully offline
+* ``passthrough``  neither read nor write, as if there were no cache
+
+``install_llm_cache()`` installs it as the global cache, so every chat model
+without an explicit ``cache`` goes through it. Streaming calls made with
+``.stream()`` bypass LangChain's cache.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+MODES = ("record", "replay", "passthrough")
+
+# Parts of a prompt that change on every run are masked before hashing, or no key would ever
+# replay: {time} in actor_prompt_template, and random uuids from Document / message reprs in RAG prompts.
+ISO_TIMESTAMP = r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[+-]\d{2}:?\d{2}|Z)?"
+UUID = r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+
+
+# Message fields that are never sent to the model but differ between runs: random ids assigned by
+# add_messages and callbacks, and response usage / metadata (on a hit LangChain adds total_cost=0).
+_UNSENT_FIELDS = ("id", "usage_metadata", "response_metadata")
+
+
+def _canonical_prompt(prompt: str) -> str:
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    for message in messages:
+        if isinstance(message, dict) and isinstance(message.get("kwargs"), dict):
+            for name in _UNSENT_FIELDS:
+                message["kwargs"].pop(name, None)
+    return json.dumps(messages, sort_keys=True)
+
+
+class LLMCacheMiss(LookupError):
+    """A call in replay mode that was never recorded."""
+
+
+def _dump_generations(generations: RETURN_VAL_TYPE) -> str:
+    records = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            records.append({"message": message_to_dict(generation.message),
+                            "generation_info": generation.generation_info})
+        else:
+            records.append({"text": generation.text, "generation_info": generation.generation_info})
+    return json.dumps(records)
+
+
+def _load_generations(payload: str) -> RETURN_VAL_TYPE:
+    generations = []
+    for record in json.loads(payload):
+        if "message" in record:
+            (message,) = messages_from_dict([record["message"]])
+            generations.append(ChatGeneration(message=message, generation_info=record["generation_info"]))
+        else:
+            generations.append(Generation(text=record["text"], generation_info=record["generation_info"]))
+    return generations
+
+
+class RecordReplayCache(BaseCache):
+    """SQLite-backed record/replay cache for LLM responses.
+
+    Args:
+        path: SQLite file, or ":memory:" to cache within the process only.
+        mode: "record", "replay" or "passthrough"; ``cache.mode`` can be changed while running.
+        max_bytes: cap on the total size of stored responses, evicted least recently used first.
+        volatile_patterns: regexes masked out of the prompt before hashing (ISO timestamps and uuids by default).
+    """
+
+    def __init__(self, path: str = "llm_cache.sqlite", mode: str = "record", max_bytes: int = 256 * 1024 * 1024,
+                 volatile_patterns: Sequence[str] = (ISO_TIMESTAMP, UUID)):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._volatile = [re.compile(pattern) for pattern in volatile_patterns]
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Passthrough never touches the database, so it is opened lazily and no file appears unasked.
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # The caller holds the lock.
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # Every replayed hit updates last_access; WAL + synchronous=NORMAL avoids an fsync per commit.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def key(self, prompt: str, llm_string: str) -> str:
+        """``prompt`` is the serialized message list; ``llm_string`` holds the model, its parameters and bound tools."""
+        prompt = _canonical_prompt(prompt)
+        for pattern in self._volatile:
+            prompt = pattern.sub("<volatile>", prompt)
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.mode == "passthrough":
+            return None
+        key = self.key(prompt, llm_string)
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT payload FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                self.hits += 1
+        if row is None:
+            if self.mode == "replay":
+                raise LLMCacheMiss(f"no recorded response in {self.path} for this call (key {key[:12]}); "
+                                   f"record it first with mode='record'")
+            return None
+        return _load_generations(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode != "record":
+            return
+        key = self.key(prompt, llm_string)
+        payload = _dump_generations(return_val)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self.recorded += 1
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # The caller holds the lock. Delete least recently used entries until the total fits again.
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def install_llm_cache(path: Optional[str] = None, mode: Optional[str] = None, **kwargs: Any) -> RecordReplayCache:
+    """Create a RecordReplayCache and install it as LangChain's global LLM cache.
+
+    ``path`` and ``mode`` default to the LLM_CACHE_PATH ("llm_cache.sqlite") and LLM_CACHE_MODE
+    ("passthrough") environment variables, so nothing changes unless they are set. For example, run
+    once with LLM_CACHE_MODE=record, then replay offline with LLM_CACHE_MODE=replay.
+    """
+    cache = RecordReplayCache(path or os.environ.get("LLM_CACHE_PATH", "llm_cache.sqlite"),
+                              mode or os.environ.get("LLM_CACHE_MODE", "passthrough"), **kwargs)
+    set_llm_cache(cache)
+    return cache
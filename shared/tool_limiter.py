@@ -0,0 +1,235 @@
+"""Concurrency caps, rate limits and request coalescing for tool calls.
+
+``ToolNode`` runs every tool call of a message at once, and concurrent graph
+runs (threads of a server, users of a notebook) each do the same, so a busy
+process can fire any number of ``TavilySearchResults`` requests at the same
+moment and run into the provider's rate limit. A :class:`ToolLimiter` wraps
+the tools so that, across every graph and thread sharing it,
+
+* at most ``max_concurrency`` tool calls run at once, and at most
+  ``ToolLimits.max_concurrency`` of each tool;
+* each tool starts at most ``ToolLimits.rate`` calls per second (token bucket
+  with ``burst`` capacity), waiting for a token instead of being rejected;
+* identical calls (same tool, same arguments) in flight at the same time are
+  sent once and the result is shared.
+
+The wrapped tools have the original names and schemas, so they go to
+``bind_tools`` and ``ToolNode`` unchanged:
+
+    tool_limiter = ToolLimiter(max_concurrency=8,
+                               limits={"tavily_search_results_json": ToolLimits(max_concurrency=4, rate=5)})
+    tools = tool_limiter.wrap([TavilySearchResults(max_results=2)])
+    ...
+    print(tool_limiter.report())   # queue wait vs execution time per tool
+
+Limits are enforced with threading primitives; async invocations run the
+wrapped tool in the default executor, so they share the same limits.
+"""
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Type
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+
+@dataclass
+class ToolLimits:
+    max_concurrency: Optional[int] = None
+    rate: Optional[float] = None  # calls started per second
+    burst: Optional[int] = None  # bucket capacity, defaults to max(1, rate)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; :meth:`reserve` takes a token and says how long to wait for it."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _ToolStats:
+    WINDOW = 4096  # timings kept per tool for the means and percentiles
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queue_wait: Deque[float] = deque(maxlen=self.WINDOW)
+        self.execution: Deque[float] = deque(maxlen=self.WINDOW)
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def call_key(tool_name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+    return tool_name, json.dumps(args, sort_keys=True, default=str)
+
+
+class ToolLimiter:
+    """Shared limits for a set of tools; see the module docstring.
+
+    Args:
+        max_concurrency: tool calls running at once across all tools (``None``: no cap).
+        limits: per-tool ``ToolLimits`` by tool name.
+        default_limits: limits for tools without an entry in ``limits``.
+        coalesce: share one execution between identical calls in flight.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = 8, limits: Optional[Dict[str, ToolLimits]] = None,
+                 default_limits: Optional[ToolLimits] = None, coalesce: bool = True):
+        self.max_concurrency = max_concurrency
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or ToolLimits()
+        self.coalesce = coalesce
+        self._global = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._semaphores: Dict[str, Optional[threading.BoundedSemaphore]] = {}
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+
+    def _controls(self, tool_name: str) -> Tuple[Optional[threading.BoundedSemaphore], Optional[TokenBucket]]:
+        with self._lock:
+            if tool_name not in self._semaphores:
+                limits = self.limits.get(tool_name, self.default_limits)
+                self._semaphores[tool_name] = \
+                    threading.BoundedSemaphore(limits.max_concurrency) if limits.max_concurrency else None
+                self._buckets[tool_name] = TokenBucket(limits.rate, limits.burst) if limits.rate else None
+                self._stats[tool_name] = _ToolStats()
+            return self._semaphores[tool_name], self._buckets[tool_name]
+
+    def call(self, tool_name: str, args: Dict[str, Any], execute: Callable[[], Any]) -> Any:
+        """Run ``execute()`` for a call of ``tool_name`` with ``args`` within the limits."""
+        semaphore, bucket = self._controls(tool_name)
+        stats = self._stats[tool_name]
+        key = call_key(tool_name, args)
+        start = time.perf_counter()
+        with self._lock:
+            stats.calls += 1
+            leader = key not in self._in_flight or not self.coalesce
+            if leader:
+                future = self._in_flight[key] = Future() if self.coalesce else None
+            else:
+                future = self._in_flight[key]
+                stats.coalesced += 1
+        if not leader:
+            return future.result()
+
+        acquired = []
+        try:
+            # per-tool slot and rate first, so a saturated tool does not hold global slots while it waits
+            if semaphore is not None:
+                semaphore.acquire()
+                acquired.append(semaphore)
+            if bucket is not None:
+                delay = bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+            if self._global is not None:
+                self._global.acquire()
+                acquired.append(self._global)
+            started = time.perf_counter()
+            with self._lock:
+                stats.queue_wait.append(started - start)
+                stats.in_flight += 1
+                stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+            try:
+                result = execute()
+            except BaseException as e:
+                with self._lock:
+                    stats.errors += 1
+                if future is not None:
+                    future.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    stats.in_flight -= 1
+                    stats.executions += 1
+                    stats.execution.append(time.perf_counter() - started)
+            if future is not None:
+                future.set_result(result)
+            return result
+        finally:
+            for limit in reversed(acquired):
+                limit.release()
+            if future is not None:
+                if not future.done():  # interrupted while queueing: do not leave coalesced callers waiting
+                    future.set_exception(RuntimeError(f"{tool_name} call was interrupted before it ran"))
+                with self._lock:
+                    self._in_flight.pop(key, None)
+
+    def wrap(self, tools: Sequence[BaseTool]) -> List["LimitedTool"]:
+        return [LimitedTool.wrap(tool, self) for tool in tools]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": s.calls, "executions": s.executions, "coalesced": s.coalesced, "errors": s.errors,
+                    "peak_in_flight": s.peak_in_flight,
+                    "queue_wait_mean_ms": sum(s.queue_wait) / max(len(s.queue_wait), 1) * 1000,
+                    "queue_wait_p95_ms": _percentile(s.queue_wait, 0.95) * 1000,
+                    "execution_mean_ms": sum(s.execution) / max(len(s.execution), 1) * 1000,
+                    "execution_p95_ms": _percentile(s.execution, 0.95) * 1000,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def report(self) -> str:
+        lines = [f"{'tool':<28} {'calls':>6} {'runs':>6} {'shared':>6} {'peak':>5} "
+                 f"{'wait ms':>8} {'wait p95':>9} {'exec ms':>8} {'exec p95':>9}"]
+        for name, s in self.stats().items():
+            lines.append(f"{name:<28} {s['calls']:>6} {s['executions']:>6} {s['coalesced']:>6} "
+                         f"{s['peak_in_flight']:>5} {s['queue_wait_mean_ms']:>8.1f} {s['queue_wait_p95_ms']:>9.1f} "
+                         f"{s['execution_mean_ms']:>8.1f} {s['execution_p95_ms']:>9.1f}")
+        return "\n".join(lines)
+
+
+class LimitedTool(BaseTool):
+    """A tool whose calls go through a :class:`ToolLimiter`; same name and schema as ``tool``."""
+
+    tool: BaseTool
+    limiter: Any
+    response_format: str = "content_and_artifact"
+
+    @classmethod
+    def wrap(cls, tool: BaseTool, limiter: ToolLimiter) -> "LimitedTool":
+        args_schema: Optional[Type[BaseModel]] = tool.get_input_schema()
+        return cls(name=tool.name, description=tool.description, args_schema=args_schema, tool=tool,
+                   limiter=limiter, return_direct=tool.return_direct)
+
+    def _run(self, *args: Any, run_manager=None, **kwargs: Any) -> Tuple[Any, Any]:
+        if args:  # plain string input for a single-argument tool
+            kwargs = {next(iter(self.args)): args[0], **kwargs}
+        config = {"callbacks": run_manager.get_child()} if run_manager else None
+
+        def execute():
+            # a tool call input makes the inner tool return its artifact too
+            return self.tool.invoke({"type": "tool_call", "name": self.tool.name, "args": kwargs,
+                                     "id": "limited"}, config)
+
+        message = self.limiter.call(self.tool.name, kwargs, execute)
+        return message.content, message.artifact